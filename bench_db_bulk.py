@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-row INSERT OR IGNORE into shills vs shillbot.db.insert_shills
+(staged rows, executemany in one explicit transaction), on 100k synthetic tweets
+in a temporary SQLite file. Also checks the inserted/ignored counts by
+re-inserting an overlapping batch.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from typing import List
+
+from bench_scoring import make_tweets
+from shillbot.db import DB, INSERT_SHILL_SQL, _shill_row, connect, init_db, insert_shills
+from shillbot.models import Tweet
+
+
+def _insert_per_row(db: DB, tweets: List[Tweet]) -> int:
+    """The old ingest loop: one execute per tweet, counting every row as stored."""
+    stored = 0
+    with connect(db) as conn:
+        for tweet in tweets:
+            conn.execute(INSERT_SHILL_SQL, _shill_row(tweet))
+            stored += 1
+    return stored
+
+
+def _fresh_db(tmp_dir: str, name: str) -> DB:
+    db = DB(os.path.join(tmp_dir, name))
+    init_db(db)
+    return db
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    tweets = make_tweets(n, n_handles=max(10, n // 20))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = _fresh_db(tmp_dir, "per_row.db")
+        t0 = time.perf_counter()
+        _insert_per_row(db, tweets)
+        t_row = time.perf_counter() - t0
+
+        db = _fresh_db(tmp_dir, "bulk.db")
+        t0 = time.perf_counter()
+        with connect(db) as conn:
+            first = insert_shills(conn, tweets)
+        t_bulk = time.perf_counter() - t0
+
+        # Second half again plus as many new tweets: half should be ignored
+        extra = make_tweets(n // 2, n_handles=10, seed=7)
+        extra = [replace(t, tweet_id=str(2 * 10**18 + i)) for i, t in enumerate(extra)]
+        with connect(db) as conn:
+            second = insert_shills(conn, tweets[n // 2:] + extra)
+            total = conn.execute("SELECT COUNT(*) FROM shills").fetchone()[0]
+
+    assert first.inserted == n and first.ignored == 0, first
+    assert second.inserted == len(extra) and second.ignored == n - n // 2, second
+    assert total == n + len(extra)
+
+    print(f"{n} tweets into shills")
+    print(f"  per-row execute : {t_row:.3f}s  ({n / t_row:,.0f} rows/s)")
+    print(f"  executemany     : {t_bulk:.3f}s  ({n / t_bulk:,.0f} rows/s)")
+    print(f"  speedup         : {t_row / t_bulk:.2f}x")
+    print(f"  re-insert       : inserted={second.inserted} ignored={second.ignored}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark for export-all (shillbot.export).
+Fills a temporary SQLite file with synthetic shills (default 500k) and exports
+the old way (SELECT * ... fetchall(), sqlite3.Row per row, is_insider per row
+in Python) and with export_all (fetchmany streaming, one read-only connection
+per table, 1 and 4 workers). Reports time and tracemalloc peak, and checks the
+CSV rows match. Also times --format parquet when pyarrow is installed, and
+export-all --incremental: a delta after 1% new and 1% rescored shills vs a
+full export, checking the reconstructed table matches.
+"""
+
+from __future__ import annotations
+
+import csv
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Iterator, Tuple
+
+from shillbot.config import INSIDER_HANDLES
+from shillbot.db import DB, connect, init_db, insert_shills
+from shillbot.export import INCREMENTAL_DIR, export_all, export_incremental, pa, read_rows, reconstruct_table
+from shillbot.models import Tweet
+
+
+def iter_tweets(n: int, n_handles: int, seed: int = 42, first_id: int = 0) -> Iterator[Tweet]:
+    rng = random.Random(seed)
+    for i in range(first_id, first_id + n):
+        day, second = divmod(i * 7, 86_400)
+        yield Tweet(
+            tweet_id=str(10**18 + i),
+            handle="ShooterCoinSol" if i % 1000 == 0 else f"user{rng.randrange(n_handles)}",
+            created_at_utc=f"2026-01-{10 + day % 20:02d}T{second // 3600:02d}:{(second // 60) % 60:02d}:{second % 60:02d}+00:00",
+            text="$SHOOTER to the moon " + "gm " * rng.randrange(40),
+            like_count=rng.randrange(200),
+            retweet_count=rng.randrange(50),
+            quote_count=rng.randrange(10),
+            reply_count=rng.randrange(30),
+            view_count=rng.randrange(20_000),
+            has_media=rng.random() < 0.3,
+            media_type="image",
+        )
+
+
+def legacy_export_shills(db: DB, out_dir: str) -> int:
+    """The pre-streaming export-all path for the shills table."""
+    with connect(db) as conn:
+        rows = conn.execute("SELECT * FROM shills ORDER BY created_at_utc ASC").fetchall()
+        columns = list(rows[0].keys()) + ["is_insider"]
+        with open(os.path.join(out_dir, "shills.csv"), "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for row in rows:
+                row_data = [row[col] for col in columns if col != "is_insider"]
+                row_data.append(1 if row["handle"].lower() in INSIDER_HANDLES else 0)
+                writer.writerow(row_data)
+        return len(rows)
+
+
+def measure(run: Callable[[], object]) -> Tuple[float, int]:
+    """(seconds, tracemalloc peak bytes) for one run."""
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def dir_bytes(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+
+
+def sorted_rows(path: str) -> list:
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        return [next(reader)] + sorted(reader)
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = DB(os.path.join(tmp_dir, "shills.db"))
+        init_db(db)
+        with connect(db) as conn:
+            insert_shills(conn, iter_tweets(n, max(10, n // 50)))
+        size = os.path.getsize(db.path)
+        print(f"{n} shills, database {size / 2**20:.0f} MB")
+        print(f"{'export':<22} {'seconds':>8} {'peak MB':>8}")
+
+        runs = [
+            ("legacy fetchall", "legacy", lambda d: legacy_export_shills(db, d)),
+            ("streaming, 1 worker", "w1", lambda d: export_all(db, d, workers=1)),
+            ("streaming, 4 workers", "w4", lambda d: export_all(db, d, workers=4)),
+        ]
+        if pa is not None:
+            runs.append(("parquet, 4 workers", "pq", lambda d: export_all(db, d, fmt="parquet", workers=4)))
+        for name, sub, run in runs:
+            out_dir = os.path.join(tmp_dir, sub)
+            os.makedirs(out_dir)
+            seconds, peak = measure(lambda: run(out_dir))
+            print(f"{name:<22} {seconds:>8.2f} {peak / 2**20:>8.1f}")
+
+        legacy = sorted_rows(os.path.join(tmp_dir, "legacy", "shills.csv"))
+        for sub in ("w1", "w4"):
+            assert sorted_rows(os.path.join(tmp_dir, sub, "shills.csv")) == legacy, sub
+        print("shills.csv rows match the legacy export")
+
+        exports_dir = os.path.join(tmp_dir, "exports")
+        incremental_dir = os.path.join(exports_dir, INCREMENTAL_DIR)
+        base = export_incremental(db, exports_dir)
+        with connect(db) as conn:
+            insert_shills(conn, iter_tweets(n // 100, max(10, n // 50), seed=7, first_id=n))
+            conn.execute("UPDATE shills SET score = like_count * 0.5 WHERE rowid % 100 = 0")
+        delta: dict = {}
+        seconds, peak = measure(lambda: delta.update(export_incremental(db, exports_dir)))
+        full_dir = os.path.join(tmp_dir, "after")
+        full_seconds, full_peak = measure(lambda: export_all(db, full_dir))
+        print(f"{'full after 2% changes':<22} {full_seconds:>8.2f} {full_peak / 2**20:>8.1f}"
+              f"  {dir_bytes(full_dir) / 2**20:.1f} MB written")
+        print(f"{'incremental delta':<22} {seconds:>8.2f} {peak / 2**20:>8.1f}"
+              f"  {dir_bytes(os.path.join(incremental_dir, delta['id'])) / 2**20:.1f} MB written,"
+              f" {delta['tables']['shills']['rows']} shills (base {base['tables']['shills']['rows']})")
+
+        header, rows = reconstruct_table(incremental_dir, "shills")
+        full_header, full_rows = read_rows(os.path.join(full_dir, "shills.csv"), "csv")
+        assert header == full_header and sorted(rows.values()) == sorted(full_rows)
+        print("base + delta reconstructs the full shills.csv")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark for shillbot.matching.ShillMatcher.
+Compares the per-call shill check (the pre-matcher XIngestor._is_shill_tweet),
+one combined case-insensitive regex, and ShillMatcher (match reasons and plain
+filter), plus the registration hashtag check, on synthetic tweet texts (default 1M).
+"""
+
+from __future__ import annotations
+
+import random
+import re
+import sys
+import time
+from typing import Callable, List, Optional
+
+from shillbot.matching import DEFAULT_TOKEN_MINT, ShillMatcher
+
+
+COIN_HANDLE = "shootercoinsol"
+WORDS = "gm wagmi moon pump sol the to of buy sell chart dev lfg ser ngmi send it early".split()
+KEYWORDS = [f"@{COIN_HANDLE.capitalize()}", "$SHOOTER", "$shooter", "$ShillBot", DEFAULT_TOKEN_MINT]
+
+
+def make_texts(n: int, seed: int = 42) -> List[str]:
+    rng = random.Random(seed)
+    texts: List[str] = []
+    for _ in range(n):
+        words = rng.choices(WORDS, k=rng.randint(5, 40))
+        # ~30% of texts carry one or more criteria, at a random position
+        for keyword in KEYWORDS:
+            if rng.random() < 0.08:
+                words.insert(rng.randrange(len(words) + 1), keyword)
+        texts.append(" ".join(words))
+    return texts
+
+
+def legacy_is_shill(text: str, coin_handle: str = COIN_HANDLE, token_mint: Optional[str] = None) -> bool:
+    """The pre-matcher check: lowercase and rebuild every keyword per call."""
+    text_lower = text.lower()
+    if f"@{coin_handle.lower()}" in text_lower:
+        return True
+    if "$shooter" in text_lower:
+        return True
+    if "$shillbot" in text_lower:
+        return True
+    token_mint_to_check = token_mint or DEFAULT_TOKEN_MINT
+    if token_mint_to_check.lower() in text_lower:
+        return True
+    return False
+
+
+def legacy_has_registration_hashtag(text: str, register_hashtag: str = "shillbotregister") -> bool:
+    """The pre-matcher check: re.compile (cache lookup) on every call."""
+    pattern = re.compile(rf"#{re.escape(register_hashtag)}\b", re.IGNORECASE)
+    return bool(pattern.search(text))
+
+
+def combined_regex() -> Callable[[str], tuple]:
+    pattern = re.compile(
+        "|".join(
+            f"(?P<{name}>{re.escape(keyword)})"
+            for name, keyword in [
+                ("mention", f"@{COIN_HANDLE}"),
+                ("cashtag", "$shooter"),
+                ("bot_cashtag", "$shillbot"),
+                ("mint", DEFAULT_TOKEN_MINT),
+            ]
+        ),
+        re.IGNORECASE,
+    )
+    return lambda text: tuple(sorted({m.lastgroup for m in pattern.finditer(text)}))
+
+
+def timed(fn: Callable[[str], object], texts: List[str]) -> tuple[float, int]:
+    t0 = time.perf_counter()
+    hits = sum(1 for text in texts if fn(text))
+    return time.perf_counter() - t0, hits
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    texts = make_texts(n)
+    matcher = ShillMatcher(COIN_HANDLE, None, "shillbotregister")
+
+    t_legacy, legacy_hits = timed(legacy_is_shill, texts)
+    t_regex, regex_hits = timed(combined_regex(), texts)
+    t_filter, filter_hits = timed(matcher.is_shill, texts)
+    t_reasons, reasons_hits = timed(matcher.match_reasons, texts)
+    t_reg_legacy, reg_legacy_hits = timed(legacy_has_registration_hashtag, texts)
+    t_reg, reg_hits = timed(matcher.has_registration_hashtag, texts)
+
+    assert legacy_hits == regex_hits == filter_hits == reasons_hits, "matchers disagree"
+    assert reg_legacy_hits == reg_hits, "registration matchers disagree"
+    for text in texts[:10_000]:
+        assert bool(matcher.match_reasons(text)) == legacy_is_shill(text)
+
+    print(f"{n} tweets, {legacy_hits} shills")
+    print(f"{'method':<28} {'seconds':>8} {'tweets/s':>12}")
+    for name, seconds in [
+        ("legacy _is_shill_tweet", t_legacy),
+        ("combined regex (reasons)", t_regex),
+        ("ShillMatcher.is_shill", t_filter),
+        ("ShillMatcher.match_reasons", t_reasons),
+        ("legacy registration hashtag", t_reg_legacy),
+        ("ShillMatcher registration", t_reg),
+    ]:
+        print(f"{name:<28} {seconds:>8.3f} {n / seconds:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark for shillbot.scoring.score_tweets.
+Compares the vectorized NumPy scorer against a pure-Python reference loop
+on synthetic tweets (10k / 100k / 1M).
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from shillbot.models import Tweet
+from shillbot.scoring import (
+    best_per_handle,
+    encode_handles,
+    score_columns,
+    score_tweet,
+    score_tweets,
+    tweets_to_columns,
+)
+
+
+SIZES = [10_000, 100_000, 1_000_000]
+
+
+def make_tweets(n: int, n_handles: int, seed: int = 42) -> List[Tweet]:
+    rng = random.Random(seed)
+    tweets: List[Tweet] = []
+    for i in range(n):
+        is_retweet = rng.random() < 0.1
+        tweets.append(
+            Tweet(
+                tweet_id=str(10**18 + i),
+                handle=f"user{rng.randrange(n_handles)}",
+                created_at_utc=f"2026-01-10T{(i // 3600) % 24:02d}:{(i // 60) % 60:02d}:{i % 60:02d}+00:00",
+                text="$SHOOTER to the moon",
+                like_count=rng.randrange(200),
+                retweet_count=rng.randrange(50),
+                quote_count=rng.randrange(10),
+                reply_count=rng.randrange(30),
+                view_count=rng.randrange(20_000),
+                has_media=rng.random() < 0.3,
+                media_type="image",
+                is_retweet=is_retweet,
+                is_quote=not is_retweet and rng.random() < 0.05,
+                has_original_text=rng.random() < 0.5,
+            )
+        )
+    return tweets
+
+
+def score_tweets_reference(tweets: List[Tweet]) -> Dict[str, Tuple[str, float]]:
+    """Pure-Python per-tweet loop (the pre-NumPy approach)."""
+    counts = Counter(t.handle for t in tweets)
+    best: Dict[str, Tuple[str, float]] = {}
+    for t in tweets:
+        score = score_tweet(t, counts[t.handle])
+        cur = best.get(t.handle)
+        if cur is None or score > cur[1]:
+            best[t.handle] = (t.tweet_id, score)
+    return best
+
+
+def main() -> None:
+    sizes = [int(a) for a in sys.argv[1:]] or SIZES
+    print(
+        f"{'tweets':>10} {'handles':>8} {'python (s)':>12} {'numpy (s)':>12} {'speedup':>8}"
+        f" {'load (s)':>10} {'kernel (s)':>11}"
+    )
+    for n in sizes:
+        tweets = make_tweets(n, n_handles=max(10, n // 20))
+
+        t0 = time.perf_counter()
+        ref = score_tweets_reference(tweets)
+        t_ref = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        best = score_tweets(tweets)
+        t_np = time.perf_counter() - t0
+
+        # Split the NumPy path into column load vs the batched scoring kernel
+        t0 = time.perf_counter()
+        _, codes = encode_handles(t.handle for t in tweets)
+        columns = tweets_to_columns(tweets)
+        t_load = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        best_per_handle(codes, score_columns(columns, codes))
+        t_kernel = time.perf_counter() - t0
+
+        assert best.keys() == ref.keys(), "handle sets differ"
+        for handle, (tweet_id, score) in ref.items():
+            assert abs(best[handle][1] - score) < 1e-9 * max(1.0, score), f"score mismatch for {handle}"
+
+        print(
+            f"{n:>10} {len(best):>8} {t_ref:>12.3f} {t_np:>12.3f} {t_ref / t_np:>7.1f}x"
+            f" {t_load:>10.3f} {t_kernel:>11.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Load benchmark: the old 'shillbot serve' (single-threaded socketserver.TCPServer
+with SimpleHTTPRequestHandler, latest.json?cachebust=...) vs shillbot.web.ReportServer
+(threaded, precompressed, ETag/304), each in its own process on a synthetic
+public/ dir. N keep-alive clients poll latest.json / history / index.html for a
+fixed time while one slow client trickles a request in. Reports throughput,
+latency percentiles and response bytes, with and without If-None-Match.
+"""
+
+from __future__ import annotations
+
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler
+from typing import Dict, List, Tuple
+
+from shillbot.web import ReportRequestHandler, ReportServer
+
+
+N_HISTORY = 60
+SLOW_CLIENT_STALL_S = 2.0
+
+
+class QuietLegacyHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+class QuietReportHandler(ReportRequestHandler):
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+def make_public(root: str, n_winners: int = 300) -> None:
+    rng = random.Random(1)
+    os.makedirs(os.path.join(root, "history"))
+    for i in range(N_HISTORY + 1):
+        report = {
+            "window_id": f"2026{i:04d}-2300",
+            "winners": [
+                {"rank": r + 1, "handle": f"user{rng.randrange(10**6)}", "score": rng.random() * 100,
+                 "tweet_id": str(10**18 + rng.randrange(10**12)), "wallet": "".join(rng.choices("ABCDEFGH123456789", k=44))}
+                for r in range(n_winners)
+            ],
+            "notes": ["After rate limiting: 12345 tweets"] * 5,
+        }
+        payload = json.dumps(report, indent=2, sort_keys=True)
+        name = "latest.json" if i == N_HISTORY else os.path.join("history", f"{report['window_id']}.json")
+        with open(os.path.join(root, name), "w", encoding="utf-8") as f:
+            f.write(payload)
+    with open(os.path.join(os.path.dirname(__file__), "public", "index.html"), "rb") as src:
+        with open(os.path.join(root, "index.html"), "wb") as dst:
+            dst.write(src.read())
+
+
+def run_server(kind: str, root: str, ready: "multiprocessing.Queue") -> None:
+    if kind == "legacy":
+        handler = lambda *args: QuietLegacyHandler(*args, directory=root)  # noqa: E731
+        httpd: socketserver.TCPServer = socketserver.TCPServer(("127.0.0.1", 0), handler)
+    else:
+        httpd = ReportServer(("127.0.0.1", 0), root, 30, handler=QuietReportHandler)
+        httpd.cache.warm(root)
+    ready.put(httpd.server_address[1])
+    httpd.serve_forever()
+
+
+def slow_client(port: int) -> None:
+    """Sends the request line, stalls, then finishes the request."""
+    sock = socket.create_connection(("127.0.0.1", port))
+    sock.sendall(b"GET /latest.json HTTP/1.1\r\n")
+    time.sleep(SLOW_CLIENT_STALL_S)
+    sock.sendall(b"Host: localhost\r\nConnection: close\r\n\r\n")
+    while sock.recv(65536):
+        pass
+    sock.close()
+
+
+def client(port: int, kind: str, deadline: float, seed: int, out: List[Tuple[float, int, int]]) -> None:
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    etags: Dict[str, str] = {}
+    while time.perf_counter() < deadline:
+        roll = rng.random()
+        if roll < 0.7:
+            path = f"/latest.json?cachebust={time.time_ns()}" if kind == "legacy" else "/latest.json"
+        elif roll < 0.9:
+            path = f"/history/2026{rng.randrange(N_HISTORY):04d}-2300.json"
+        else:
+            path = "/index.html"
+        headers = {"Accept-Encoding": "gzip, br"}
+        key = path.split("?")[0]
+        if key in etags and kind == "threaded":
+            headers["If-None-Match"] = etags[key]
+        t0 = time.perf_counter()
+        conn.request("GET", path, headers=headers)
+        resp = conn.getresponse()
+        body = resp.read()
+        out.append((time.perf_counter() - t0, resp.status, len(body)))
+        if resp.getheader("ETag"):
+            etags[key] = resp.getheader("ETag")
+    conn.close()
+
+
+def bench(kind: str, root: str, n_clients: int, seconds: float) -> None:
+    ready: "multiprocessing.Queue" = multiprocessing.Queue()
+    server = multiprocessing.Process(target=run_server, args=(kind, root, ready), daemon=True)
+    server.start()
+    port = ready.get(timeout=30)
+
+    results: List[List[Tuple[float, int, int]]] = [[] for _ in range(n_clients)]
+    deadline = time.perf_counter() + seconds
+    threads = [threading.Thread(target=client, args=(port, kind, deadline, i, results[i])) for i in range(n_clients)]
+    slow = threading.Thread(target=slow_client, args=(port,))
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(seconds / 4)
+    slow.start()
+    for t in threads + [slow]:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    server.terminate()
+
+    samples = sorted(s for r in results for s in r)
+    latencies = [s[0] for s in samples]
+    n = len(latencies)
+    not_modified = sum(1 for s in samples if s[1] == 304)
+    sent_mb = sum(s[2] for s in samples) / 2**20
+
+    def pct(p: float) -> float:
+        return latencies[min(n - 1, int(p * n))] * 1000
+
+    print(
+        f"{kind:<8} {n:>7} {n / elapsed:>8.0f} {pct(0.5):>7.2f} {pct(0.99):>8.2f} {latencies[-1] * 1000:>8.1f}"
+        f" {not_modified / n:>6.0%} {sent_mb:>8.1f} {sent_mb * 2**20 / n / 1024:>7.1f}"
+    )
+
+
+def main() -> None:
+    n_clients = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 8.0
+    with tempfile.TemporaryDirectory() as root:
+        make_public(root)
+        size = os.path.getsize(os.path.join(root, "latest.json"))
+        print(f"{n_clients} clients for {seconds:.0f}s, latest.json {size / 1024:.0f} KiB, "
+              f"one client stalling {SLOW_CLIENT_STALL_S:.0f}s mid-request")
+        print(f"{'server':<8} {'reqs':>7} {'req/s':>8} {'p50 ms':>7} {'p99 ms':>8} {'max ms':>8} {'304':>6} {'MB sent':>8} {'KiB/req':>7}")
+        # "no-304": threaded server, clients never revalidate (first visits, compression only)
+        for kind in ("legacy", "no-304", "threaded"):
+            bench(kind, root, n_clients, seconds)
+
+
+if __name__ == "__main__":
+    main()
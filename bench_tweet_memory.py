@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Memory harness for shillbot.tweet_batch.TweetBatch.
+Loads every shill from a temporary SQLite file (default 1M synthetic shills)
+the old cmd_score way (SELECT * -> sqlite3.Row -> Tweet list) and as a
+TweetBatch, and reports tracemalloc peak and retained bytes per tweet for each.
+Then checks both give the same rate limiting and scores.
+"""
+
+from __future__ import annotations
+
+import gc
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from typing import Callable, Iterator, List, Tuple, TypeVar
+
+from shillbot.db import DB, connect, init_db, insert_shills, iter_shill_batch_rows
+from shillbot.models import Tweet
+from shillbot.rate_limit import apply_rate_limit
+from shillbot.scoring import score_tweets
+from shillbot.tweet_batch import TweetBatch
+
+T = TypeVar("T")
+
+
+def iter_tweets(n: int, n_handles: int, seed: int = 42) -> Iterator[Tweet]:
+    """Synthetic shills (bench_scoring.make_tweets shape), generated lazily."""
+    rng = random.Random(seed)
+    for i in range(n):
+        day, second = divmod(i * 7, 86_400)
+        yield Tweet(
+            tweet_id=str(10**18 + i),
+            handle=f"user{rng.randrange(n_handles)}",
+            created_at_utc=f"2026-01-{10 + day % 20:02d}T{second // 3600:02d}:{(second // 60) % 60:02d}:{second % 60:02d}+00:00",
+            text="$SHOOTER to the moon " + "gm " * rng.randrange(40),
+            like_count=rng.randrange(200),
+            retweet_count=rng.randrange(50),
+            quote_count=rng.randrange(10),
+            reply_count=rng.randrange(30),
+            view_count=rng.randrange(20_000),
+            has_media=rng.random() < 0.3,
+            media_type="image",
+        )
+
+
+def load_tweets(conn: sqlite3.Connection) -> List[Tweet]:
+    """The pre-TweetBatch cmd_score load: every column, a Row and a Tweet per shill."""
+    rows = conn.execute("SELECT * FROM shills ORDER BY created_at_epoch DESC").fetchall()
+    return [
+        Tweet(
+            tweet_id=r["tweet_id"],
+            handle=r["handle"],
+            created_at_utc=r["created_at_utc"],
+            text=r["text"],
+            like_count=int(r["like_count"]),
+            retweet_count=int(r["retweet_count"]),
+            quote_count=int(r["quote_count"]),
+            reply_count=int(r["reply_count"]),
+            view_count=int(r["view_count"]),
+            has_media=bool(r["has_media"]),
+            media_type=r["media_type"],
+            created_at_epoch=int(r["created_at_epoch"] or 0),
+        )
+        for r in rows
+    ]
+
+
+def load_batch(conn: sqlite3.Connection) -> TweetBatch:
+    return TweetBatch.from_rows(iter_shill_batch_rows(conn, "ORDER BY created_at_epoch DESC"))
+
+
+def measure(load: Callable[[], T]) -> Tuple[T, int, int, float]:
+    """(result, peak bytes, retained bytes, seconds) for one load under tracemalloc."""
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = load()
+    seconds = time.perf_counter() - t0
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak, retained, seconds
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    n_handles = max(10, n // 50)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = DB(os.path.join(tmp_dir, "shills.db"))
+        init_db(db)
+        with connect(db) as conn:
+            insert_shills(conn, iter_tweets(n, n_handles))
+
+        with connect(db) as conn:
+            batch, batch_peak, batch_kept, t_batch = measure(lambda: load_batch(conn))
+            tweets, list_peak, list_kept, t_list = measure(lambda: load_tweets(conn))
+
+    assert len(tweets) == len(batch) == n
+
+    t0 = time.perf_counter()
+    limited = apply_rate_limit(tweets)
+    best = score_tweets(limited)
+    counts = Counter(t.handle for t in limited)
+    t_list_score = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    limited_batch = batch.rate_limit()
+    batch_best = limited_batch.score()
+    batch_counts = limited_batch.handle_counts()
+    t_batch_score = time.perf_counter() - t0
+
+    assert [t.tweet_id for t in limited] == [limited_batch.tweet_id(i) for i in range(len(limited_batch))]
+    assert counts == batch_counts
+    assert best.keys() == batch_best.keys()
+    for handle, (tweet_id, score) in best.items():
+        batch_id, batch_score = batch_best[handle]
+        assert tweet_id == batch_id and abs(score - batch_score) < 1e-9, handle
+
+    print(f"{n} shills, {n_handles} handles, {len(limited)} after rate limiting")
+    print(f"{'load':<18} {'peak MB':>9} {'kept MB':>9} {'B/tweet':>8} {'load s':>7} {'score s':>8}")
+    for name, peak, kept, t_load, t_score in [
+        ("Row -> Tweet list", list_peak, list_kept, t_list, t_list_score),
+        ("TweetBatch", batch_peak, batch_kept, t_batch, t_batch_score),
+    ]:
+        print(
+            f"{name:<18} {peak / 2**20:>9.1f} {kept / 2**20:>9.1f} {kept / n:>8.0f}"
+            f" {t_load:>7.2f} {t_score:>8.2f}"
+        )
+    print(f"retained memory: {list_kept / batch_kept:.1f}x smaller, peak: {list_peak / batch_peak:.1f}x smaller")
+
+
+if __name__ == "__main__":
+    main()
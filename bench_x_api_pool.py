@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-request requests.get vs XAPIClient's pooled keep-alive session.
+Runs against a local stub of /2/tweets/search/recent (no X API token needed).
+The stub is plain HTTP on localhost, so this only measures TCP setup; against
+the real API each avoided connection also saves a TLS handshake.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+from shillbot.x_api import XAPIClient
+
+
+PAGE_SIZE = 100
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True
+    pages = 10
+    connections = 0
+
+    def setup(self) -> None:
+        super().setup()
+        type(self).connections += 1
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        qs = parse_qs(urlparse(self.path).query)
+        page = int(qs.get("next_token", ["0"])[0])
+        tweets = [
+            {
+                "id": str(page * PAGE_SIZE + i),
+                "text": "@shootercoinsol $SHOOTER",
+                "created_at": "2026-01-10T12:00:00.000Z",
+                "author_id": "1",
+                "public_metrics": {"like_count": i},
+            }
+            for i in range(PAGE_SIZE)
+        ]
+        body = {"data": tweets, "includes": {"users": [{"id": "1", "username": "bench"}]}, "meta": {}}
+        if page + 1 < self.pages:
+            body["meta"]["next_token"] = str(page + 1)
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def _paginate_unpooled(base_url: str, pages: int) -> int:
+    """The old behaviour: module-level requests.get per page (new connection each time)."""
+    url = f"{base_url}/tweets/search/recent"
+    headers = {"Authorization": "Bearer bench"}
+    count = 0
+    next_token = None
+    for _ in range(pages):
+        params = {"query": "@shootercoinsol", "max_results": PAGE_SIZE}
+        if next_token:
+            params["next_token"] = next_token
+        data = requests.get(url, headers=headers, params=params, timeout=30).json()
+        count += len(data.get("data", []))
+        next_token = data.get("meta", {}).get("next_token")
+        if not next_token:
+            break
+    return count
+
+
+def main() -> None:
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    pages = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    _StubHandler.pages = pages
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/2"
+
+    try:
+        _StubHandler.connections = 0
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            _paginate_unpooled(base_url, pages)
+        t_unpooled = time.perf_counter() - t0
+        conns_unpooled = _StubHandler.connections
+
+        _StubHandler.connections = 0
+        with XAPIClient(bearer_token="bench", base_url=base_url) as client:
+            t0 = time.perf_counter()
+            for _ in range(rounds):
+                client.search_tweets("@shootercoinsol", max_results=pages * PAGE_SIZE)
+            t_pooled = time.perf_counter() - t0
+        conns_pooled = _StubHandler.connections
+    finally:
+        server.shutdown()
+
+    requests_made = rounds * pages
+    print(f"{rounds} searches x {pages} pages = {requests_made} requests")
+    print(f"  requests.get : {t_unpooled:.3f}s  ({t_unpooled / requests_made * 1000:.2f} ms/req, {conns_unpooled} connections)")
+    print(f"  pooled       : {t_pooled:.3f}s  ({t_pooled / requests_made * 1000:.2f} ms/req, {conns_pooled} connections)")
+    print(f"  speedup      : {t_unpooled / t_pooled:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
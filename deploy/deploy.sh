@@ -40,6 +40,7 @@ cp "$PROJECT_DIR/deploy/shillbot-close-2pm.service" "$SERVICE_DIR/"
 cp "$PROJECT_DIR/deploy/shillbot-close-2pm.timer" "$SERVICE_DIR/"
 cp "$PROJECT_DIR/deploy/shillbot-close-11pm.service" "$SERVICE_DIR/"
 cp "$PROJECT_DIR/deploy/shillbot-close-11pm.timer" "$SERVICE_DIR/"
+cp "$PROJECT_DIR/deploy/shillbot-run.service" "$SERVICE_DIR/"
 
 # Replace paths in service files
 echo -e "${YELLOW}Configuring service file paths...${NC}"
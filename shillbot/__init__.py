@@ -8,5 +8,13 @@
     "reporting",
     "solana_rpc",
     "x_api",
+    "x_async",
     "payouts",
+    "payout_executor",
+    "scheduler",
+    "matching",
+    "tweet_batch",
+    "web",
+    "leaderboard",
+    "export",
 ]
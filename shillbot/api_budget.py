@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import atexit
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Mapping, Optional, Set
+
+from shillbot.db import DB, connect
+
+
+# Changed budgets are written to the database at most this often, unless an endpoint
+# runs out (see RateLimitBudget.flush)
+FLUSH_INTERVAL_S = 30.0
+
+class RateLimitDeferred(RuntimeError):
+    """Raised instead of sleeping when an endpoint's budget won't refill soon enough."""
+
+    def __init__(self, endpoint: str, wait_s: float):
+        super().__init__(f"X API budget exhausted for {endpoint}, resets in {wait_s:.0f}s")
+        self.endpoint = endpoint
+        self.wait_s = wait_s
+
+
+@dataclass
+class EndpointBudget:
+    limit: int
+    remaining: int
+    reset_epoch: int
+
+
+class RateLimitBudget:
+    """
+    Per-endpoint request budget (token bucket refilled at x-rate-limit-reset),
+    fed from x-rate-limit-* response headers and persisted in the api_rate_limits
+    table so a new process starts from the last known state instead of blindly
+    hitting a 429.
+    Budgets are kept in memory; changed endpoints are written when one runs out
+    (a throttle or defer is coming), at most every flush_interval_s otherwise, and
+    on flush() (XAPIClient.close, process exit). Writes happen outside the budget
+    lock, so concurrent requests never wait on SQLite.
+    Thread-safe (the async client issues requests from worker threads).
+    """
+
+    def __init__(self, db: Optional[DB] = None, flush_interval_s: float = FLUSH_INTERVAL_S):
+        self.db = db
+        self.flush_interval_s = flush_interval_s
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # Serializes writers, so an older copy never lands last
+        self._budgets: Dict[str, EndpointBudget] = {}
+        self._dirty: Set[str] = set()
+        self._last_flush = time.monotonic()
+        if db is not None:
+            self._load()
+            atexit.register(self.flush)
+
+    def _load(self) -> None:
+        try:
+            with connect(self.db) as conn:
+                rows = conn.execute(
+                    "SELECT endpoint, limit_count, remaining, reset_epoch FROM api_rate_limits"
+                ).fetchall()
+        except sqlite3.OperationalError:
+            return  # Table not created yet (run init-db)
+        for r in rows:
+            self._budgets[r["endpoint"]] = EndpointBudget(
+                limit=int(r["limit_count"]), remaining=int(r["remaining"]), reset_epoch=int(r["reset_epoch"])
+            )
+
+    def flush(self, wait: bool = True) -> int:
+        """
+        Write changed endpoints to api_rate_limits. wait=False returns at once if
+        another thread is already writing (the changes stay queued).
+        Returns the number of endpoints written.
+        """
+        if self.db is None:
+            return 0
+        if not self._flush_lock.acquire(blocking=wait):
+            return 0
+        try:
+            with self._lock:
+                budgets = {e: self._budgets[e] for e in self._dirty if e in self._budgets}
+                rows = [(e, b.limit, b.remaining, b.reset_epoch) for e, b in budgets.items()]
+                self._dirty.clear()
+                self._last_flush = time.monotonic()
+            if not rows:
+                return 0
+            now_utc = datetime.now(timezone.utc).isoformat()
+            try:
+                with connect(self.db) as conn:
+                    conn.executemany(
+                        """INSERT OR REPLACE INTO api_rate_limits
+                           (endpoint, limit_count, remaining, reset_epoch, updated_at_utc)
+                           VALUES (?,?,?,?,?)""",
+                        [(*row, now_utc) for row in rows],
+                    )
+            except sqlite3.Error as e:
+                print(f"WARNING: Failed to persist rate limit budgets: {e}")
+                return 0
+            return len(rows)
+        finally:
+            self._flush_lock.release()
+
+    def _changed(self, endpoint: str, budget: EndpointBudget) -> bool:
+        """Record a new budget (caller holds _lock). True if it should be written now."""
+        self._budgets[endpoint] = budget
+        self._dirty.add(endpoint)
+        return budget.remaining <= 0 or time.monotonic() - self._last_flush >= self.flush_interval_s
+
+    def _refill(self, budget: EndpointBudget, now: float) -> None:
+        if now >= budget.reset_epoch and budget.remaining < budget.limit:
+            budget.remaining = budget.limit
+
+    def update_from_headers(self, endpoint: str, headers: Mapping[str, str]) -> None:
+        """Record x-rate-limit-limit/remaining/reset from a response (no-op if absent)."""
+        remaining = headers.get("x-rate-limit-remaining")
+        reset = headers.get("x-rate-limit-reset")
+        if remaining is None or reset is None:
+            return
+        try:
+            remaining_i = int(remaining)
+            reset_i = int(reset)
+            limit_i = int(headers.get("x-rate-limit-limit", max(remaining_i, 1)))
+        except ValueError:
+            return
+        with self._lock:
+            budget = EndpointBudget(limit=limit_i, remaining=remaining_i, reset_epoch=reset_i)
+            flush_now = self._changed(endpoint, budget)
+        if flush_now:
+            self.flush(wait=False)
+
+    def mark_exhausted(self, endpoint: str, wait_s: float, now: Optional[float] = None) -> None:
+        """Record a 429 without rate-limit headers (e.g. only Retry-After)."""
+        now = time.time() if now is None else now
+        with self._lock:
+            budget = self._budgets.get(endpoint)
+            limit = budget.limit if budget else 1
+            self._changed(endpoint, EndpointBudget(limit=limit, remaining=0, reset_epoch=int(now + wait_s)))
+        self.flush()
+
+    def wait_s(self, endpoint: str, now: Optional[float] = None) -> float:
+        """Seconds until a request may be issued (0 if budget left or unknown). Does not consume."""
+        now = time.time() if now is None else now
+        with self._lock:
+            budget = self._budgets.get(endpoint)
+            if budget is None:
+                return 0.0
+            self._refill(budget, now)
+            if budget.remaining > 0:
+                return 0.0
+            return max(0.0, budget.reset_epoch - now)
+
+    def acquire(self, endpoint: str, now: Optional[float] = None) -> float:
+        """
+        Take one request from the endpoint's budget.
+        Returns 0 when the request may go now, else seconds to wait (nothing consumed).
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            budget = self._budgets.get(endpoint)
+            if budget is None:
+                return 0.0
+            self._refill(budget, now)
+            if budget.remaining > 0:
+                budget.remaining -= 1
+                return 0.0
+            return max(0.0, budget.reset_epoch - now)
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, EndpointBudget]:
+        now = time.time() if now is None else now
+        with self._lock:
+            for budget in self._budgets.values():
+                self._refill(budget, now)
+            return {k: EndpointBudget(v.limit, v.remaining, v.reset_epoch) for k, v in self._budgets.items()}
@@ -1,23 +1,63 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import csv
 import os
+import sqlite3
+import threading
+import time
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import List, Optional, Tuple
 from zoneinfo import ZoneInfo
 
-from shillbot.config import load_settings, SOLANA_RPC_URL, validate_rpc_url
-from shillbot.db import DB, connect, init_db, get_last_window_end_balance, get_lifetime_total_fees_lamports, backfill_registration_status
-from shillbot.models import Payout, ScoredEntry, Tweet
+from shillbot.api_budget import RateLimitBudget, RateLimitDeferred
+from shillbot.config import Settings, load_settings, SOLANA_RPC_URL, validate_rpc_url
+from shillbot.db import (
+    DB,
+    HOT_QUERIES,
+    backfill_registration_status,
+    connect,
+    count_window_blacklisted,
+    explain_query_plan,
+    get_last_window_end_balance,
+    get_lifetime_total_fees_lamports,
+    get_ingest_cursor,
+    get_submitted_payouts,
+    get_max_shill_rowid,
+    get_unscored_handles,
+    init_db,
+    insert_shills,
+    iter_shill_batch_rows,
+    iter_shill_batch_rows_for_handles,
+    iter_window_candidate_rows,
+    window_excluded_tweet_ids,
+    mark_shills_scored,
+    plan_regressions,
+    set_ingest_cursor,
+    update_handle_best_scores,
+    upsert_registrations,
+)
+from shillbot.export import DEFAULT_EXPORT_WORKERS, EXPORT_FORMATS, INCREMENTAL_DIR, export_all, export_incremental
+from shillbot.leaderboard import Leaderboard
+from shillbot.models import IngestCursor, Payout, ScoredEntry
+from shillbot.payout_executor import RETRYABLE_STATUSES, submit_payouts, track_confirmations
 from shillbot.payouts import allocate_payouts, compute_payout_plan, lamports_to_sol, sol_to_lamports
-from shillbot.solana_payer import SolanaCLIPayer
-from shillbot.rate_limit import apply_rate_limit
+from shillbot.solana_payer import NativeSolanaPayer, SolanaCLIPayer
+from shillbot.rate_limit import apply_rate_limit, rate_limit_stream
 from shillbot.reporting import build_report, export_interim_scoring_csv, write_report
-from shillbot.scoring import score_tweets
+from shillbot.scheduler import ScheduledJob, Scheduler, daily_at, every
 from shillbot.solana_rpc import SolanaRPC
+from shillbot.tweet_batch import TweetBatch
+from shillbot.web import ReportServer
 from shillbot.x_api import XAPIClient
-from shillbot.x_ingest import XIngestor
+from shillbot.x_async import AsyncXAPIClient, ingest_cycle
+from shillbot.x_ingest import IngestProgress, XIngestor
+
+
+# Streaming ingest commits every N stored rows (one X API search page is at most 100 tweets)
+INGEST_COMMIT_ROWS = 100
 
 
 def _utc_iso(dt: datetime) -> str:
@@ -59,6 +99,13 @@ def _window_bounds(end_local: datetime, close_times: list[str]) -> tuple[datetim
     return end - timedelta(hours=12), end
 
 
+def _open_window(s: Settings) -> tuple[str, datetime, datetime]:
+    """(window_id, start, end) of the window in progress: last close time to the next one."""
+    now_local = _now_local(s.timezone)
+    end_local = daily_at(s.close_times, s.timezone)(now_local)
+    return _window_id(end_local), _most_recent_close(now_local, s.close_times), end_local
+
+
 def _get_mock_fees_lamports() -> int | None:
     v = os.getenv("SHILLBOT_MOCK_FEES_SOL", "").strip()
     if not v:
@@ -72,16 +119,51 @@ def _get_mock_fees_lamports() -> int | None:
     return sol_to_lamports(sol)
 
 
+@lru_cache(maxsize=None)
+def _x_client(bearer_token: str, pool_size: int, db_path: str, max_wait_s: float) -> XAPIClient:
+    """
+    Process-wide X API client, so the pooled keep-alive session and the
+    rate-limit budget are shared by registration and shill ingest (e.g.
+    close-once runs both). The budget is persisted in db_path.
+    """
+    return XAPIClient(
+        bearer_token=bearer_token,
+        timeout_s=30,
+        pool_size=pool_size,
+        budget=RateLimitBudget(DB(db_path)),
+        max_wait_s=max_wait_s,
+    )
+
+
+def _make_ingestor(s: Settings) -> XIngestor:
+    return XIngestor(
+        client=_x_client(s.x_api_bearer_token, s.x_api_pool_size, s.db_path, s.x_api_max_wait_s),
+        handle=s.handle,
+        coin_handle=s.coin_handle,
+        coin_ticker=s.coin_ticker,
+        token_mint=s.token_mint if s.token_mint else None,
+        register_hashtag=s.register_hashtag,
+        max_pages=s.x_api_max_pages,
+    )
+
+
+def _solana_rpc(s: Settings) -> SolanaRPC:
+    """SolanaRPC on the process-wide pooled transport (shared by every call in a run)."""
+    return SolanaRPC(url=s.rpc_url, timeout_s=20, fallback_urls=s.rpc_fallback_urls)
+
+
 def cmd_init_db() -> None:
     s = load_settings()
     init_db(DB(s.db_path))
     print(f"OK: initialized DB at {s.db_path}")
 
 
-def cmd_ingest_shills() -> None:
+def cmd_ingest_shills(full: bool = False) -> None:
     """
     Ingest shill tweets from X API.
     All shills go into shills table (cumulative, append-only).
+    Uses the persisted since_id cursor for the shill query so each run only
+    fetches tweets newer than the last one seen (full=True ignores the cursor).
     """
     s = load_settings()
     db = DB(s.db_path)
@@ -90,59 +172,138 @@ def cmd_ingest_shills() -> None:
         print("WARNING: SHILLBOT_X_API_BEARER_TOKEN not set, skipping ingest")
         return
 
-    client = XAPIClient(bearer_token=s.x_api_bearer_token, timeout_s=30)
-    ingestor = XIngestor(
-        client=client,
-        handle=s.handle,
-        coin_handle=s.coin_handle,
-        coin_ticker=s.coin_ticker,
-        token_mint=s.token_mint if s.token_mint else None,
-        register_hashtag=s.register_hashtag,
-    )
+    ingestor = _make_ingestor(s)
+    query = ingestor.shill_query()
+
+    with connect(db) as conn:
+        cursor = IngestCursor() if full else get_ingest_cursor(conn, query)
+
+    if cursor.until_id:
+        print(f"Collecting shill tweets older than {cursor.until_id} left by an earlier partial pull...")
+    elif cursor.since_id:
+        print(f"Collecting shill tweets newer than cursor {cursor.since_id}...")
+    else:
+        # No cursor yet: hard-limited to last 24 hours internally
+        print("Collecting shill tweets from last 24 hours (hard-limited)...")
+
+    # Streaming pipeline: fetch -> parse -> filter -> rate-limit -> store, committed
+    # every INGEST_COMMIT_ROWS rows, so memory stays flat regardless of page count
+    # and an interrupted pull keeps the pages already stored
+    progress = IngestProgress()
+    with connect(db) as conn:
+        try:
+            stored = insert_shills(
+                conn,
+                rate_limit_stream(ingestor.iter_shill_tweets(cursor, progress)),
+                batch_size=INGEST_COMMIT_ROWS,
+                commit_batches=True,
+            )
+        except RateLimitDeferred as e:
+            print(f"DEFERRED: {e}. Cursor unchanged, rerun after the reset.")
+            return
+        print(f"Found {progress.shills} tweets after filtering")
+        print(f"After rate limiting (1 per minute per user): {stored.inserted + stored.ignored} tweets")
+
+        # Advance cursor only after every tweet up to it is stored
+        new_cursor = progress.advance(cursor)
+        if new_cursor != cursor and (new_cursor.since_id or new_cursor.until_id):
+            set_ingest_cursor(conn, query, new_cursor, datetime.now(timezone.utc).isoformat())
+
+        # Backfill registration status for handles whose registration changed
+        marked = backfill_registration_status(conn)
+        
+        print(f"OK: Stored {stored.inserted} new tweets in shills table ({stored.ignored} already stored)")
+        print(f"OK: Updated is_registered status for {marked} shills")
+
+
+def cmd_ingest_all(concurrency: int = 4) -> None:
+    """
+    Combined ingest cycle: every shill query (mentions, cashtag, mint) and the
+    registration search run concurrently on one event loop, sharing the pooled
+    X API session and a concurrency limit. Each shill query keeps its own cursor.
+    """
+    s = load_settings()
+    db = DB(s.db_path)
+
+    if not s.x_api_bearer_token:
+        print("WARNING: SHILLBOT_X_API_BEARER_TOKEN not set, skipping ingest")
+        return
+
+    ingestor = _make_ingestor(s)
+    queries = ingestor.shill_queries()
+    with connect(db) as conn:
+        cursors = {q: get_ingest_cursor(conn, q) for q in queries}
 
-    # Collect shill tweets (hard-limited to last 24 hours internally)
-    print("Collecting shill tweets from last 24 hours (hard-limited)...")
-    tweets = ingestor.collect_shill_tweets()
-    print(f"Found {len(tweets)} tweets after filtering")
+    print(f"Running {len(queries)} shill queries + registrations (concurrency {concurrency})...")
+    started = time.perf_counter()
+    aclient = AsyncXAPIClient(client=ingestor.client, max_concurrency=concurrency)
+    result = asyncio.run(ingest_cycle(ingestor, aclient, cursors))
+    print(f"Ingest cycle finished in {time.perf_counter() - started:.1f}s")
+    for query, error in result.errors.items():
+        print(f"WARNING: {query} failed: {error}")
 
-    # Apply rate limiting
-    tweets = apply_rate_limit(tweets)
+    tweets = apply_rate_limit(result.tweets)
     print(f"After rate limiting (1 per minute per user): {len(tweets)} tweets")
 
-    # Store in shills table (cumulative, append-only)
     with connect(db) as conn:
-        stored = 0
-        for tweet in tweets:
-            try:
-                # INSERT OR IGNORE enforces uniqueness by tweet_id (cumulative, no duplicates)
-                conn.execute(
-                    """INSERT OR IGNORE INTO shills
-                    (tweet_id, handle, created_at_utc, text, like_count, retweet_count,
-                     quote_count, reply_count, view_count, has_media, media_type, is_registered)
-                    VALUES (?,?,?,?,?,?,?,?,?,?,?,0)""",
-                    (
-                        tweet.tweet_id,
-                        tweet.handle,
-                        tweet.created_at_utc,
-                        tweet.text,
-                        tweet.like_count,
-                        tweet.retweet_count,
-                        tweet.quote_count,
-                        tweet.reply_count,
-                        tweet.view_count,
-                        1 if tweet.has_media else 0,
-                        tweet.media_type,
-                    ),
-                )
-                stored += 1
-            except Exception as e:
-                print(f"WARNING: Failed to store tweet {tweet.tweet_id}: {e}")
+        stored = insert_shills(conn, tweets)
+        regs_stored = upsert_registrations(conn, result.registrations, _utc_iso(datetime.now(timezone.utc)))
+        now_utc = datetime.now(timezone.utc).isoformat()
+        for query, cursor in result.cursors.items():
+            set_ingest_cursor(conn, query, cursor, now_utc)
 
-        # Backfill registration status (retroactively marks all past tweets)
-        backfill_registration_status(conn)
-        
-        print(f"OK: Stored {stored} tweets in shills table")
-        print("OK: Updated is_registered status for all shills")
+        # Backfill registration status for handles whose registration changed
+        marked = backfill_registration_status(conn)
+
+        print(f"OK: Stored {stored.inserted} new tweets in shills table ({stored.ignored} already stored)")
+        print(
+            f"OK: Stored {regs_stored.inserted} new registrations, updated {regs_stored.updated}"
+            " (most recent per handle wins)"
+        )
+        print(f"OK: Updated is_registered status for {marked} shills")
+
+
+def cmd_refresh_metrics(hours: int = 24) -> None:
+    """
+    Refresh engagement metrics for shills created in the last `hours` hours.
+    Uses tweet ID lookup (100 tweets per request) instead of re-running searches.
+    Changed rows are picked up by 'score --incremental'.
+    """
+    s = load_settings()
+    db = DB(s.db_path)
+
+    if not s.x_api_bearer_token:
+        print("WARNING: SHILLBOT_X_API_BEARER_TOKEN not set, skipping metrics refresh")
+        return
+
+    ingestor = _make_ingestor(s)
+    cutoff = int((datetime.now(timezone.utc) - timedelta(hours=hours)).timestamp())
+
+    with connect(db) as conn:
+        rows = conn.execute(
+            "SELECT tweet_id FROM shills WHERE created_at_epoch >= ?", (cutoff,)
+        ).fetchall()
+        tweet_ids = [r["tweet_id"] for r in rows]
+        if not tweet_ids:
+            print(f"No shills from the last {hours} hours to refresh")
+            return
+
+        print(f"Refreshing metrics for {len(tweet_ids)} shills ({(len(tweet_ids) + 99) // 100} requests)...")
+        try:
+            refreshed = ingestor.refresh_metrics(tweet_ids)
+        except RateLimitDeferred as e:
+            print(f"DEFERRED: {e}. Rerun after the reset.")
+            return
+        conn.executemany(
+            """UPDATE shills
+               SET like_count = ?, retweet_count = ?, quote_count = ?, reply_count = ?, view_count = ?
+               WHERE tweet_id = ?""",
+            [
+                (t.like_count, t.retweet_count, t.quote_count, t.reply_count, t.view_count, t.tweet_id)
+                for t in refreshed
+            ],
+        )
+        print(f"OK: Refreshed metrics for {len(refreshed)} shills")
 
 
 def cmd_ingest(
@@ -169,40 +330,78 @@ def cmd_ingest_registrations() -> None:
         print("WARNING: SHILLBOT_X_API_BEARER_TOKEN not set, skipping registration ingest")
         return
 
-    client = XAPIClient(bearer_token=s.x_api_bearer_token, timeout_s=30)
-    ingestor = XIngestor(
-        client=client,
-        handle=s.handle,
-        coin_handle=s.coin_handle,
-        coin_ticker=s.coin_ticker,
-        token_mint=s.token_mint if s.token_mint else None,
-        register_hashtag=s.register_hashtag,
-    )
+    ingestor = _make_ingestor(s)
 
     print(f"Scraping registrations from #{s.register_hashtag} hashtag...")
-    registrations = ingestor.scrape_registrations()
-    print(f"Found {len(registrations)} registrations")
+    progress = IngestProgress()
+    registrations = ingestor.scrape_registrations(progress)
+    print(f"Found {len(registrations)} registrations in {progress.pages} pages")
+    if not progress.complete:
+        print(
+            "WARNING: Registration pull was partial, older registration tweets were not read"
+            " (raise SHILLBOT_X_API_MAX_PAGES if this repeats)"
+        )
 
     with connect(db) as conn:
-        stored = 0
-        now_utc = datetime.now(timezone.utc).isoformat()
-        for handle, wallet in registrations:
-            try:
-                # Always insert, even if wallet is "N/A"
-                conn.execute(
-                    "INSERT OR REPLACE INTO registrations (handle, wallet, registered_at_utc) VALUES (?,?,?)",
-                    (handle, wallet, now_utc),
-                )
-                stored += 1
-            except Exception as e:
-                # Never crash on malformed data
-                print(f"WARNING: Failed to store registration for {handle}: {e}")
+        stored = upsert_registrations(conn, registrations, _utc_iso(datetime.now(timezone.utc)))
 
-        # Backfill registration status (retroactively marks all past tweets)
-        backfill_registration_status(conn)
+        # Backfill registration status for handles whose registration changed
+        marked = backfill_registration_status(conn)
         
-        print(f"OK: Stored {stored} registrations (most recent per handle wins)")
-        print("OK: Updated is_registered status for all shills")
+        print(
+            f"OK: Stored {stored.inserted} new registrations, updated {stored.updated}"
+            " (most recent per handle wins)"
+        )
+        print(f"OK: Updated is_registered status for {marked} shills")
+
+
+def cmd_explain() -> None:
+    """
+    Print EXPLAIN QUERY PLAN for every hot query and fail if any of them
+    needs a full table scan or a temp sort (missing/unused index).
+    """
+    s = load_settings()
+    db = DB(s.db_path)
+    failed = []
+    missing = []
+    with connect(db) as conn:
+        for q in HOT_QUERIES:
+            try:
+                plan = explain_query_plan(conn, q.sql, q.params)
+            except sqlite3.OperationalError as e:
+                # No such table/column yet: the schema predates init-db (or a later migration)
+                print(f"MISSING: {q.name}")
+                print(f"    {e}")
+                missing.append(q.name)
+                continue
+            bad = plan_regressions(plan, q.allow_scan)
+            print(f"{'FAIL' if bad else 'OK'}: {q.name}")
+            for detail in plan:
+                print(f"    {detail}")
+            if bad:
+                failed.append(q.name)
+    errors = []
+    if failed:
+        errors.append(f"{len(failed)} hot queries regressed to a scan (run init-db to add indexes): {', '.join(failed)}")
+    if missing:
+        errors.append(f"{len(missing)} hot queries hit a missing schema (run init-db): {', '.join(missing)}")
+    if errors:
+        raise SystemExit("ERROR: " + "; ".join(errors))
+    print(f"OK: all {len(HOT_QUERIES)} hot queries use indexes")
+
+
+def cmd_rate_limits() -> None:
+    """Show the persisted X API rate-limit budget per endpoint."""
+    s = load_settings()
+    budget = RateLimitBudget(DB(s.db_path))
+    snapshot = budget.snapshot()
+    if not snapshot:
+        print("No rate-limit state recorded yet")
+        return
+    now = time.time()
+    for endpoint, b in sorted(snapshot.items()):
+        reset_in = max(0, int(b.reset_epoch - now))
+        print(f"{endpoint:35s} {b.remaining:>5d}/{b.limit:<5d} resets in {reset_in}s")
 
 
 def cmd_export_interim(csv_only: bool = True) -> None:
@@ -297,190 +496,125 @@ def cmd_export_interim(csv_only: bool = True) -> None:
         print(f"  - {registered_count} registered")
 
 
-def cmd_export_all() -> None:
+def cmd_export_all(fmt: str = "csv", workers: int = DEFAULT_EXPORT_WORKERS, incremental: bool = False) -> None:
     """
-    Export all core tables to CSV files in a timestamped folder.
-    Exports: registrations, interim_shills, shills, interim_scores, payout_plan, payout_transactions.
-    Creates one timestamped folder per run with stable filenames inside.
+    Export all core tables in a timestamped folder (one file per table, stable names).
+    Exports: registrations, shills (plus is_insider), payout_plan, payout_transactions.
+    Each table is streamed from its own read-only connection, `workers` tables at once.
+    fmt: csv (default), or parquet / arrow (Arrow IPC file; both need pyarrow).
+
+    With incremental=True, only rows added/changed (and keys deleted) since the last
+    incremental export are written, under exports/incremental/ with a manifest.json
+    chaining each delta to its base (see export.export_incremental).
     """
     s = load_settings()
     db = DB(s.db_path)
-    timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-    exports_base_dir = os.path.join(s.public_dir, "exports")
-    os.makedirs(exports_base_dir, exist_ok=True)
-    
-    # Create timestamped folder for this export run
-    snapshot_dir = os.path.join(exports_base_dir, timestamp)
-    os.makedirs(snapshot_dir, exist_ok=True)
+    exports_dir = os.path.join(s.public_dir, "exports")
 
-    with connect(db) as conn:
-        # Helper function to export a table
-        def export_table(table_name: str, filename: str, order_by: str = None, add_insider_column: bool = False) -> int:
-            """Export a table to CSV. Returns row_count."""
-            # Check if table exists
-            cursor = conn.execute(
-                "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
-                (table_name,)
-            )
-            if not cursor.fetchone():
-                # Table doesn't exist, create empty CSV with headers from schema
-                csv_path = os.path.join(snapshot_dir, filename)
-                with open(csv_path, "w", newline="", encoding="utf-8") as f:
-                    writer = csv.writer(f)
-                    # Try to get columns from schema, or use empty list
-                    try:
-                        cursor = conn.execute(f"PRAGMA table_info({table_name})")
-                        columns = [col[1] for col in cursor.fetchall()]
-                        if add_insider_column:
-                            columns.append("is_insider")
-                        if columns:
-                            writer.writerow(columns)
-                    except:
-                        pass  # Table doesn't exist, empty CSV
-                return 0
-            
-            query = f"SELECT * FROM {table_name}"
-            if order_by:
-                query += f" ORDER BY {order_by}"
-            rows = conn.execute(query).fetchall()
-            
-            if not rows:
-                # Get column names from table schema
-                cursor = conn.execute(f"PRAGMA table_info({table_name})")
-                columns = [col[1] for col in cursor.fetchall()]
-            else:
-                columns = list(rows[0].keys())
-            
-            # Add is_insider column if requested
-            if add_insider_column:
-                from shillbot.config import INSIDER_HANDLES
-                columns.append("is_insider")
-            
-            csv_path = os.path.join(snapshot_dir, filename)
-            with open(csv_path, "w", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                writer.writerow(columns)
-                for row in rows:
-                    if add_insider_column:
-                        # Build row data excluding is_insider column
-                        row_data = [row[col] for col in columns if col != "is_insider"]
-                        # Compute is_insider for this row
-                        handle = row["handle"] if "handle" in row.keys() else ""
-                        is_insider = 1 if handle.lower() in INSIDER_HANDLES else 0
-                        row_data.append(is_insider)
-                    else:
-                        row_data = [row[col] for col in columns]
-                    writer.writerow(row_data)
-            
-            return len(rows)
+    if incremental:
+        try:
+            entry = export_incremental(db, exports_dir, fmt=fmt, workers=workers)
+        except RuntimeError as e:
+            raise SystemExit(f"ERROR: {e}")
+        print(f"Export {entry['kind']}: {os.path.join(exports_dir, INCREMENTAL_DIR, entry['id'])}/")
+        for table_name, info in entry["tables"].items():
+            deleted = f", {info['deleted']} deleted" if entry["kind"] == "delta" else ""
+            print(f"  OK {table_name} ({info['rows']} rows{deleted})")
+        return
 
-        # Export canonical tables only (no interim tables)
-        results = []
-        
-        # 1. registrations
-        count = export_table("registrations", "registrations.csv", "registered_at_utc ASC")
-        results.append(("registrations", count))
-        
-        # 2. shills (includes is_registered, score, and is_insider columns)
-        count = export_table("shills", "shills.csv", "created_at_utc ASC", add_insider_column=True)
-        results.append(("shills", count))
-        
-        # 3. payout_plan
-        count = export_table("payout_plan", "payout_plan.csv", "window_id ASC, rank ASC")
-        results.append(("payout_plan", count))
-        
-        # 4. payout_transactions
-        count = export_table("payout_transactions", "payout_transactions.csv", "window_id ASC, sent_at_utc ASC")
-        results.append(("payout_transactions", count))
-        
-        # Print summary
-        print(f"Export snapshot: {snapshot_dir}/")
-        for table_name, count in results:
-            print(f"  OK {table_name} ({count} rows)")
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+    snapshot_dir = os.path.join(exports_dir, timestamp)
+    try:
+        results = export_all(db, snapshot_dir, fmt=fmt, workers=workers)
+    except RuntimeError as e:
+        raise SystemExit(f"ERROR: {e}")
+
+    print(f"Export snapshot: {snapshot_dir}/")
+    for table_name, count in results:
+        print(f"  OK {table_name} ({count} rows)")
 
 
-def cmd_score() -> None:
+def cmd_score(incremental: bool = False) -> None:
     """
     Score all shills in the shills table.
-    Updates score column in shills table for all tweets.
+    Updates score column in shills table (best tweet per handle) and the
+    handle_best_scores table.
     Scores ALL shills (no registration filter).
     Registration status is updated retroactively.
+
+    With incremental=True, only handles that have new or changed shills since the
+    last run (scored_at_utc IS NULL) are rescored. Rate limiting and volume
+    dampening are per-handle, so rescoring a whole handle gives the same result
+    as a full run.
     """
     s = load_settings()
     db = DB(s.db_path)
 
     with connect(db) as conn:
-        # Read all shills
-        rows = conn.execute("SELECT * FROM shills ORDER BY created_at_utc DESC").fetchall()
+        # Only rows that exist before the read below are marked scored at the end
+        max_rowid = get_max_shill_rowid(conn)
+        handles: Optional[List[str]] = None
+        if incremental:
+            handles = get_unscored_handles(conn)
+            if not handles:
+                print("No new or changed shills since last scoring run")
+                return
+            batch = TweetBatch.from_rows(iter_shill_batch_rows_for_handles(conn, handles))
+            print(f"Incremental: rescoring {len(handles)} handles ({len(batch)} shills)")
+        else:
+            # Read all shills
+            batch = TweetBatch.from_rows(iter_shill_batch_rows(conn, "ORDER BY created_at_epoch DESC"))
 
-        if not rows:
+        if not len(batch):
             print("No shills found")
             return
 
-        tweets: List[Tweet] = []
-        for r in rows:
-            tweets.append(
-                Tweet(
-                    tweet_id=r["tweet_id"],
-                    handle=r["handle"],
-                    created_at_utc=r["created_at_utc"],
-                    text=r["text"],
-                    like_count=int(r["like_count"]),
-                    retweet_count=int(r["retweet_count"]),
-                    quote_count=int(r["quote_count"]),
-                    reply_count=int(r["reply_count"]),
-                    view_count=int(r["view_count"]),
-                    has_media=bool(r["has_media"]),
-                    media_type=r["media_type"],
-                    # New fields default to False for backward compatibility with DB
-                    is_retweet=r.get("is_retweet", False) if "is_retweet" in r else False,
-                    is_quote=r.get("is_quote", False) if "is_quote" in r else False,
-                    has_original_text=r.get("has_original_text", False) if "has_original_text" in r else False,
-                )
-            )
-
         # Apply rate limiting (same as close-once)
-        tweets = apply_rate_limit(tweets)
-        print(f"After rate limiting (1 per minute per user): {len(tweets)} tweets")
+        batch = batch.rate_limit()
+        print(f"After rate limiting (1 per minute per user): {len(batch)} tweets")
 
         # Score ALL shills (no registration filter)
-        if not tweets:
+        if not len(batch):
             print("No tweets to score")
             return
 
         # Score tweets using same logic as close-once
-        best = score_tweets(tweets=tweets)
-
-        # Store scores in shills table
-        scored_count = 0
-        for handle, (tweet_id, score) in best.items():
-            conn.execute(
-                "UPDATE shills SET score = ? WHERE tweet_id = ?",
-                (float(score), tweet_id)
-            )
-            scored_count += 1
-
-        # Backfill registration status (retroactively marks all past tweets)
-        backfill_registration_status(conn)
-
-        print(f"OK: Scored {scored_count} shills")
-        print("OK: Updated is_registered status for all shills")
-
-        # Print ranked summary (top 10)
-        ranked = []
-        for handle, (tweet_id, score) in best.items():
-            ranked.append((handle, tweet_id, score))
-        ranked.sort(key=lambda x: x[2], reverse=True)
+        best = batch.score()
+
+        # Store scores in shills table and the materialized per-handle best table
+        scored_at_utc = datetime.now(timezone.utc).isoformat()
+        tweet_counts = batch.handle_counts()
+        moved = update_handle_best_scores(conn, best, tweet_counts, scored_at_utc)
+        scored_count = len(best)
+
+        # Advance the scoring watermark
+        mark_shills_scored(conn, scored_at_utc, max_rowid, handles)
+
+        # Backfill registration status for handles whose registration changed
+        marked = backfill_registration_status(conn)
+
+        print(f"OK: Scored {scored_count} shills ({moved} handles changed best tweet)")
+        print(f"OK: Updated is_registered status for {marked} shills")
+
+        # Print ranked summary (top 10) from the materialized table
+        ranked = conn.execute(
+            """SELECT b.handle, b.tweet_id, b.score, s.text
+               FROM handle_best_scores b
+               LEFT JOIN shills s ON s.tweet_id = b.tweet_id
+               ORDER BY b.score DESC
+               LIMIT 10"""
+        ).fetchall()
+        total_ranked = conn.execute("SELECT COUNT(*) AS n FROM handle_best_scores").fetchone()["n"]
 
         print("\n" + "=" * 80)
         print("TOP SHILLS (Ranked by Score)")
         print("=" * 80)
-        for i, (handle, tweet_id, score) in enumerate(ranked[:10], start=1):
-            tweet = next((t for t in tweets if t.tweet_id == tweet_id), None)
-            text_preview = tweet.text[:60] + "..." if tweet and len(tweet.text) > 60 else (tweet.text if tweet else "")
-            print(f"{i:2d}. @{handle:20s} | Score: {score:6.2f} | {text_preview}")
-        if len(ranked) > 10:
-            print(f"... and {len(ranked) - 10} more")
+        for i, row in enumerate(ranked, start=1):
+            text = row["text"] or ""
+            text_preview = text[:60] + "..." if len(text) > 60 else text
+            print(f"{i:2d}. @{row['handle']:20s} | Score: {row['score']:6.2f} | {text_preview}")
+        if total_ranked > 10:
+            print(f"... and {total_ranked - 10} more")
         print("=" * 80)
 
 
@@ -537,7 +671,7 @@ def cmd_compute_payouts() -> None:
         
         # Get current treasury balance via RPC
         try:
-            rpc = SolanaRPC(url=s.rpc_url, timeout_s=20)
+            rpc = _solana_rpc(s)
             treasury_balance = rpc.get_balance_lamports(s.treasury_pubkey)
         except Exception as e:
             raise SystemExit(f"ERROR: Failed to get treasury balance: {e}")
@@ -701,6 +835,9 @@ def cmd_execute_payouts(window_id: str = "CURRENT") -> None:
     Step 3: Execute planned payouts for a window.
     Reads from payout_plan, skips already-executed payouts, sends SOL transfers,
     and records in payout_transactions table.
+    Native payer: transfers are submitted up front and confirmed by batched status
+    polling; each row moves SUBMITTED -> CONFIRMED/FAILED/EXPIRED, and a rerun
+    resumes from the recorded signatures (FAILED/EXPIRED payouts are retried).
     """
     s = load_settings()
     db = DB(s.db_path)
@@ -720,10 +857,19 @@ def cmd_execute_payouts(window_id: str = "CURRENT") -> None:
             print("Run 'compute-payouts' first")
             return
 
-        # Check which payouts have already been executed
+        # Resume: resolve transactions left SUBMITTED by an earlier run before deciding
+        # what is still pending (their signatures were recorded before sending)
+        unresolved = get_submitted_payouts(conn, window_id) if s.payer_backend == "native" else {}
+        if unresolved:
+            print(f"Resolving {len(unresolved)} transactions from a previous run...")
+            track_confirmations(conn, window_id, _solana_rpc(s))
+
+        # Check which payouts have already been executed (or are in flight);
+        # FAILED/EXPIRED transactions never landed, so those payouts are sent again
         executed_rows = conn.execute(
-            "SELECT wallet FROM payout_transactions WHERE window_id=?",
-            (window_id,)
+            """SELECT wallet FROM payout_transactions
+               WHERE window_id=? AND (status IS NULL OR status NOT IN (?, ?))""",
+            (window_id, *RETRYABLE_STATUSES)
         ).fetchall()
         executed_wallets = {row["wallet"] for row in executed_rows}
 
@@ -745,6 +891,29 @@ def cmd_execute_payouts(window_id: str = "CURRENT") -> None:
         if not os.path.exists(s.treasury_keypair_path):
             raise RuntimeError(f"FATAL: treasury keypair not found at {s.treasury_keypair_path}")
 
+        if s.payer_backend == "native":
+            # Pipelined: sign and submit every transfer up front (batched transactions),
+            # then confirm them together with batched status polling
+            payer = NativeSolanaPayer(keypair_path=s.treasury_keypair_path, rpc=_solana_rpc(s))
+            started = time.perf_counter()
+            counts = submit_payouts(
+                conn, window_id, [(row["wallet"], int(row["amount_lamports"])) for row in pending], payer
+            )
+            print(f"Submitted {counts['submitted']} payouts in {counts['transactions']} transactions")
+            track_confirmations(conn, window_id, payer.rpc)
+
+            by_status = dict(conn.execute(
+                "SELECT COALESCE(status, 'SENT'), COUNT(*) FROM payout_transactions WHERE window_id=? GROUP BY 1",
+                (window_id,)
+            ).fetchall())
+            print(f"\nOK: Executed payouts for window {window_id} in {time.perf_counter() - started:.1f}s")
+            for status in ("CONFIRMED", "SUBMITTED", "FAILED", "EXPIRED", "SENT"):
+                if by_status.get(status):
+                    print(f"  - {status.capitalize()}: {by_status[status]}")
+            if by_status.get("SUBMITTED") or by_status.get("FAILED") or by_status.get("EXPIRED"):
+                print("  Rerun execute-payouts to resume (SUBMITTED) or retry (FAILED/EXPIRED)")
+            return
+
         payer = SolanaCLIPayer(
             keypair_path=s.treasury_keypair_path,
             rpc_url=s.rpc_url,
@@ -835,7 +1004,7 @@ def cmd_close_once(force: bool = False) -> None:
                 # First window: take snapshot now as start_balance (if treasury_pubkey is set)
                 if s.treasury_pubkey:
                     try:
-                        rpc = SolanaRPC(url=s.rpc_url, timeout_s=20)
+                        rpc = _solana_rpc(s)
                         start_balance = rpc.get_balance_lamports(s.treasury_pubkey)
                         notes.append(f"start_balance_sol={start_balance/1_000_000_000:.6f} (snapshot at window open)")
                     except Exception as e:
@@ -858,7 +1027,7 @@ def cmd_close_once(force: bool = False) -> None:
         # At window close: take snapshot for end_balance
         if s.treasury_pubkey:
             try:
-                rpc = SolanaRPC(url=s.rpc_url, timeout_s=20)
+                rpc = _solana_rpc(s)
                 end_balance = rpc.get_balance_lamports(s.treasury_pubkey)
                 notes.append(f"end_balance_sol={end_balance/1_000_000_000:.6f} (snapshot at window close)")
             except Exception as e:
@@ -906,56 +1075,28 @@ def cmd_close_once(force: bool = False) -> None:
             except Exception as e:
                 notes.append(f"WARNING: Failed to pull official shills: {e}")
 
-        rows = conn.execute(
-            "SELECT * FROM shills WHERE created_at_utc >= ? AND created_at_utc < ?",
-            (_utc_iso(start_utc), _utc_iso(end_utc)),
-        ).fetchall()
-
-        tweets: list[Tweet] = []
-        for r in rows:
-            tweets.append(
-                Tweet(
-                    tweet_id=r["tweet_id"],
-                    handle=r["handle"],
-                    created_at_utc=r["created_at_utc"],
-                    text=r["text"],
-                    like_count=int(r["like_count"]),
-                    retweet_count=int(r["retweet_count"]),
-                    quote_count=int(r["quote_count"]),
-                    reply_count=int(r["reply_count"]),
-                    view_count=int(r["view_count"]),
-                    has_media=bool(r["has_media"]),
-                    media_type=r["media_type"],
-                    # New fields default to False for backward compatibility with DB
-                    is_retweet=r.get("is_retweet", False) if "is_retweet" in r else False,
-                    is_quote=r.get("is_quote", False) if "is_quote" in r else False,
-                    has_original_text=r.get("has_original_text", False) if "has_original_text" in r else False,
-                )
-            )
+        # Window shills minus blacklisted handles, filtered in SQL (per handle, so
+        # dropping them before the per-handle rate limit gives the same result)
+        start_epoch, end_epoch = int(start_utc.timestamp()), int(end_utc.timestamp())
+        batch = TweetBatch.from_rows(iter_window_candidate_rows(conn, start_epoch, end_epoch))
+        blacklisted = count_window_blacklisted(conn, start_epoch, end_epoch)
+        if blacklisted:
+            notes.append(f"Excluded {blacklisted} tweets (blacklisted handles)")
 
         # Apply rate limiting (1 per minute per user)
-        tweets = apply_rate_limit(tweets)
-        notes.append(f"After rate limiting: {len(tweets)} tweets")
-
-        # Filter out excluded tweets
-        excluded_rows = conn.execute("SELECT tweet_id FROM excluded_tweets").fetchall()
-        excluded_tweet_ids = {r["tweet_id"] for r in excluded_rows}
-        tweets_before_exclude = len(tweets)
-        tweets = [t for t in tweets if t.tweet_id not in excluded_tweet_ids]
-        if tweets_before_exclude != len(tweets):
-            notes.append(f"Excluded {tweets_before_exclude - len(tweets)} tweets (excluded_tweets table)")
-
-        # Filter out blacklisted handles
-        blacklist_rows = conn.execute("SELECT handle FROM blacklist_handles").fetchall()
-        blacklisted_handles = {r["handle"] for r in blacklist_rows}
-        tweets_before_blacklist = len(tweets)
-        tweets = [t for t in tweets if t.handle not in blacklisted_handles]
-        if tweets_before_blacklist != len(tweets):
-            notes.append(f"Excluded {tweets_before_blacklist - len(tweets)} tweets (blacklisted handles)")
+        batch = batch.rate_limit()
+        notes.append(f"After rate limiting: {len(batch)} tweets")
+
+        # Filter out excluded tweets (after rate limiting: an excluded tweet still
+        # uses its handle's slot for that minute)
+        tweets_before_exclude = len(batch)
+        batch = batch.exclude(tweet_ids=window_excluded_tweet_ids(conn, start_epoch, end_epoch))
+        if tweets_before_exclude != len(batch):
+            notes.append(f"Excluded {tweets_before_exclude - len(batch)} tweets (excluded_tweets table)")
 
         # Score ALL shills (no registration filter)
         # Registration status is stored in is_registered column, used later for payouts
-        best = score_tweets(tweets=tweets)
+        best = batch.score()
         
         # Store scores in shills table
         for handle, (tweet_id, score) in best.items():
@@ -964,7 +1105,7 @@ def cmd_close_once(force: bool = False) -> None:
                 (float(score), tweet_id)
             )
         
-        # Backfill registration status (retroactively marks all past tweets)
+        # Backfill registration status for handles whose registration changed
         backfill_registration_status(conn)
         
         # Get wallet mappings for ranked list (only for registered users)
@@ -982,20 +1123,21 @@ def cmd_close_once(force: bool = False) -> None:
         # Filter out wallets that don't hold minimum token amount (if token verification is enabled)
         if s.token_mint and s.min_token_amount > 0:
             try:
-                rpc = SolanaRPC(url=s.rpc_url, timeout_s=20)
+                rpc = _solana_rpc(s)
                 ranked_before_token_check = len(ranked)
+                # One batched JSON-RPC round trip per 100 wallets
+                balances = rpc.get_token_balances([wallet for _, wallet, _, _ in ranked], s.token_mint)
                 ranked_filtered = []
                 for handle, wallet, score, tweet_id in ranked:
-                    try:
-                        token_balance = rpc.get_token_balance(wallet, s.token_mint)
-                        if token_balance >= s.min_token_amount:
-                            ranked_filtered.append((handle, wallet, score, tweet_id))
-                        else:
-                            notes.append(f"Excluded {handle} (wallet {wallet[:8]}...): token balance {token_balance} < min {s.min_token_amount}")
-                    except Exception as e:
+                    token_balance = balances.get(wallet)
+                    if not isinstance(token_balance, int):
                         # If token balance check fails, include the wallet (don't exclude on error)
-                        notes.append(f"WARNING: Token balance check failed for {handle} ({wallet[:8]}...): {e}, including anyway")
+                        notes.append(f"WARNING: Token balance check failed for {handle} ({wallet[:8]}...): {token_balance}, including anyway")
+                        ranked_filtered.append((handle, wallet, score, tweet_id))
+                    elif token_balance >= s.min_token_amount:
                         ranked_filtered.append((handle, wallet, score, tweet_id))
+                    else:
+                        notes.append(f"Excluded {handle} (wallet {wallet[:8]}...): token balance {token_balance} < min {s.min_token_amount}")
                 
                 ranked = ranked_filtered
                 if ranked_before_token_check != len(ranked):
@@ -1075,7 +1217,7 @@ def cmd_close_once(force: bool = False) -> None:
                 f"top_n={s.top_n}",
             ],
         )
-        latest_path = write_report(s.public_dir, win_id, report)
+        latest_path = write_report(s.public_dir, win_id, report, gzip_artifacts=s.publish_gzip)
 
     print(f"OK: closed window {win_id}")
     print(f"Report: {latest_path}")
@@ -1084,18 +1226,85 @@ def cmd_close_once(force: bool = False) -> None:
     print(f"  Run 'python -m shillbot execute-payouts' to send SOL")
 
 
-def cmd_serve() -> None:
+def cmd_run(concurrency: int = 4, serve: bool = False) -> None:
+    """
+    Daemon mode: one long-lived process runs ingest-all + score --incremental every
+    SHILLBOT_INGEST_INTERVAL_MIN minutes, refresh-metrics + score --incremental every
+    SHILLBOT_REFRESH_METRICS_INTERVAL_MIN minutes (0 = never) and close-once at each
+    SHILLBOT_CLOSE_TIMES, on a single event loop. The X API session, rate-limit budget and Solana RPC
+    transport are process-wide, so they stay warm between jobs.
+    Replaces the ingest/close systemd timers (see deploy/shillbot-run.service).
+
+    With serve=True it also serves public/ (like 'serve') plus the live leaderboard
+    for the open window (/api/leaderboard, SSE at /api/leaderboard/events). The
+    in-memory leaderboard is rescored after each ingest for the handles it touched.
+    """
     s = load_settings()
-    import http.server
-    import socketserver
+    db = DB(s.db_path)
+    init_db(db)
+    live = Leaderboard(top_n=s.top_n)
+
+    def refresh_live(full: bool) -> None:
+        win_id, start_local, end_local = _open_window(s)
+        with connect(db) as conn:
+            # Handles with shills stored/changed since the last score run (cleared by cmd_score)
+            handles = None if full else get_unscored_handles(conn)
+            if live.refresh(conn, win_id, int(start_local.timestamp()), int(end_local.timestamp()), handles):
+                print(f"Live leaderboard: window {win_id}, version {live.snapshot.version}")
+
+    def ingest_and_score() -> None:
+        cmd_ingest_all(concurrency=concurrency)
+        if serve:
+            refresh_live(full=False)
+        cmd_score(incremental=True)
+
+    def refresh_metrics_and_score() -> None:
+        # Changed metrics reset scored_at_utc, so the incremental score picks them up
+        cmd_refresh_metrics()
+        if serve:
+            refresh_live(full=False)
+        cmd_score(incremental=True)
+
+    def close() -> None:
+        cmd_close_once()
+        if serve:
+            refresh_live(full=True)
+
+    if serve:
+        refresh_live(full=True)
+        httpd = ReportServer(("", s.serve_port), s.public_dir, s.latest_max_age_s, leaderboard=live)
+        httpd.cache.warm(s.public_dir)
+        threading.Thread(target=httpd.serve_forever, name="serve", daemon=True).start()
+        print(f"Serving {s.public_dir} and the live leaderboard at http://localhost:{s.serve_port}")
+
+    jobs = [
+        ScheduledJob("ingest", ingest_and_score, every(s.ingest_interval_min * 60)),
+        ScheduledJob("close", close, daily_at(s.close_times, s.timezone)),
+    ]
+    refresh_desc = "metrics refresh off"
+    if s.refresh_metrics_interval_min:
+        jobs.append(
+            ScheduledJob("refresh-metrics", refresh_metrics_and_score, every(s.refresh_metrics_interval_min * 60))
+        )
+        refresh_desc = f"refresh metrics every {s.refresh_metrics_interval_min} min"
+    print(
+        f"Running scheduler: ingest every {s.ingest_interval_min} min, {refresh_desc}, "
+        f"close at {', '.join(s.close_times)} ({s.timezone})"
+    )
+    try:
+        asyncio.run(Scheduler(jobs).run())
+    except KeyboardInterrupt:
+        print("Scheduler stopped")
 
+
+def cmd_serve() -> None:
+    """Serve public/ (threaded, precompressed, ETag/304, Cache-Control; see shillbot.web)."""
+    s = load_settings()
     os.makedirs(s.public_dir, exist_ok=True)
-    os.chdir(s.public_dir)
 
-    port = 8000
-    handler = http.server.SimpleHTTPRequestHandler
-    with socketserver.TCPServer(("", port), handler) as httpd:
-        print(f"Serving {s.public_dir} at http://localhost:{port}")
+    with ReportServer(("", s.serve_port), s.public_dir, s.latest_max_age_s) as httpd:
+        cached = httpd.cache.warm(s.public_dir)
+        print(f"Serving {s.public_dir} at http://localhost:{s.serve_port} ({cached} files cached)")
         httpd.serve_forever()
 
 
@@ -1112,8 +1321,17 @@ def main() -> None:
     p_ingest.add_argument("--since", type=str, help="Start time for interim pulls (ISO format)")
     p_ingest.add_argument("--until", type=str, help="End time for interim pulls (ISO format)")
 
-    sub.add_parser("ingest-shills", help="Ingest shill tweets from X API (all go to shills table)")
+    p_ingest_shills = sub.add_parser("ingest-shills", help="Ingest shill tweets from X API (all go to shills table)")
+    p_ingest_shills.add_argument("--full", action="store_true", help="Ignore the since_id cursor and pull the last 24 hours")
+
+    p_ingest_all = sub.add_parser("ingest-all", help="Run all shill queries and registrations concurrently")
+    p_ingest_all.add_argument("--concurrency", type=int, default=4, help="Max concurrent X API requests (default: 4)")
+
+    p_refresh = sub.add_parser("refresh-metrics", help="Refresh engagement metrics for recent shills (tweet lookup)")
+    p_refresh.add_argument("--hours", type=int, default=24, help="Refresh shills created in the last N hours (default: 24)")
     sub.add_parser("ingest-registrations", help="Ingest registrations from X API")
+    sub.add_parser("rate-limits", help="Show persisted X API rate-limit budgets")
+    sub.add_parser("explain", help="Check hot queries use indexes (EXPLAIN QUERY PLAN), fail on a scan")
 
     p_close = sub.add_parser("close-once")
     p_close.add_argument("--force", action="store_true")
@@ -1121,10 +1339,22 @@ def main() -> None:
     p_export = sub.add_parser("export-interim")
     p_export.add_argument("--csv", action="store_true", default=True, help="Export to CSV (default)")
 
-    sub.add_parser("export-all", help="Export all data: registrations, interim shills, and official shills")
+    p_export_all = sub.add_parser("export-all", help="Export all data: registrations, shills, payout plan and transactions")
+    p_export_all.add_argument(
+        "--format", choices=EXPORT_FORMATS, default="csv", help="csv (default), parquet or arrow (need pyarrow)"
+    )
+    p_export_all.add_argument(
+        "--workers", type=int, default=DEFAULT_EXPORT_WORKERS,
+        help=f"Tables exported in parallel (default: {DEFAULT_EXPORT_WORKERS})",
+    )
+    p_export_all.add_argument(
+        "--incremental", action="store_true",
+        help="Only rows changed since the last incremental export (exports/incremental/, manifest.json)",
+    )
 
     p_score = sub.add_parser("score", help="Score all shills (updates score column in shills table)")
     p_score.add_argument("--interim", action="store_true", help="DEPRECATED: Use 'score' without flags")
+    p_score.add_argument("--incremental", action="store_true", help="Only rescore handles with new or changed shills")
 
     p_compute = sub.add_parser("compute-payouts", help="Compute payout plan from current scored shills (no window required)")
 
@@ -1137,6 +1367,12 @@ def main() -> None:
     p_execute = sub.add_parser("execute-payouts", help="Execute payout plan (defaults to CURRENT)")
     p_execute.add_argument("--window-id", type=str, default="CURRENT", help="Window ID (default: CURRENT)")
 
+    p_run = sub.add_parser("run", help="Daemon: scheduled ingest/score and window closes in one process")
+    p_run.add_argument("--concurrency", type=int, default=4, help="Max concurrent X API requests (default: 4)")
+    p_run.add_argument(
+        "--serve", action="store_true", help="Also serve public/ and the live leaderboard (SHILLBOT_SERVE_PORT)"
+    )
+
     sub.add_parser("serve")
 
     args = parser.parse_args()
@@ -1154,11 +1390,23 @@ def main() -> None:
         )
         return
     if args.cmd == "ingest-shills":
-        cmd_ingest_shills()
+        cmd_ingest_shills(full=bool(getattr(args, "full", False)))
+        return
+    if args.cmd == "ingest-all":
+        cmd_ingest_all(concurrency=int(args.concurrency))
+        return
+    if args.cmd == "refresh-metrics":
+        cmd_refresh_metrics(hours=int(args.hours))
         return
     if args.cmd == "ingest-registrations":
         cmd_ingest_registrations()
         return
+    if args.cmd == "explain":
+        cmd_explain()
+        return
+    if args.cmd == "rate-limits":
+        cmd_rate_limits()
+        return
     if args.cmd == "close-once":
         cmd_close_once(force=bool(args.force))
         return
@@ -1166,12 +1414,12 @@ def main() -> None:
         cmd_export_interim(csv_only=bool(getattr(args, "csv", True)))
         return
     if args.cmd == "export-all":
-        cmd_export_all()
+        cmd_export_all(fmt=str(args.format), workers=int(args.workers), incremental=bool(args.incremental))
         return
     if args.cmd == "score":
         if getattr(args, "interim", False):
             print("WARNING: --interim flag is deprecated. Scoring all shills.")
-        cmd_score()
+        cmd_score(incremental=bool(getattr(args, "incremental", False)))
         return
     if args.cmd == "compute-payouts":
         cmd_compute_payouts()
@@ -1185,6 +1433,9 @@ def main() -> None:
     if args.cmd == "execute-payouts":
         cmd_execute_payouts(window_id=str(args.window_id))
         return
+    if args.cmd == "run":
+        cmd_run(concurrency=int(args.concurrency), serve=bool(args.serve))
+        return
     if args.cmd == "serve":
         cmd_serve()
         return
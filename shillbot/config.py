@@ -71,10 +71,18 @@ class Settings:
     signup_tweet_id: str
     db_path: str
     public_dir: str
+    serve_port: int
+    latest_max_age_s: int
+    publish_gzip: bool
 
     x_api_bearer_token: str
+    x_api_pool_size: int
+    x_api_max_pages: int
+    x_api_max_wait_s: float
 
     close_times: List[str]
+    ingest_interval_min: int
+    refresh_metrics_interval_min: int  # 0 = `shillbot run` doesn't refresh metrics
 
     pot_share: float
     marketing_share: float
@@ -85,11 +93,13 @@ class Settings:
     payout_bins: List[Tuple[int, int, float]]
 
     rpc_url: str
+    rpc_fallback_urls: Tuple[str, ...]
     treasury_pubkey: str
     treasury_keypair_path: str
     marketing_wallet: str
     dev_wallet: str
     sweep_ops: bool
+    payer_backend: str
 
     token_mint: str
     min_token_amount: int
@@ -110,10 +120,26 @@ def load_settings() -> Settings:
     signup_tweet_id = _getenv("SHILLBOT_SIGNUP_TWEET_ID", "").strip()
     db_path = _getenv("SHILLBOT_DB_PATH", "shillbot.sqlite3")
     public_dir = _getenv("SHILLBOT_PUBLIC_DIR", "public")
+    serve_port = _getenv_int("SHILLBOT_SERVE_PORT", "8000")
+    # Cache-Control max-age for latest.json (history/ files are revalidated)
+    latest_max_age_s = _getenv_int("SHILLBOT_LATEST_MAX_AGE_S", "30")
+    # Also write minified+gzipped history/*.json.gz artifacts (for static hosting)
+    publish_gzip = _getenv_bool("SHILLBOT_PUBLISH_GZIP", "false")
 
     x_api_bearer_token = _getenv("SHILLBOT_X_API_BEARER_TOKEN", "").strip()
+    x_api_pool_size = _getenv_int("SHILLBOT_X_API_POOL_SIZE", "10")
+    x_api_max_pages = _getenv_int("SHILLBOT_X_API_MAX_PAGES", "10")
+    x_api_max_wait_s = _getenv_float("SHILLBOT_X_API_MAX_WAIT_S", "30")
 
     close_times = _parse_csv_times(_getenv("SHILLBOT_CLOSE_TIMES", "14:00,23:00"))
+    # `shillbot run` ingest + incremental score cadence
+    ingest_interval_min = _getenv_int("SHILLBOT_INGEST_INTERVAL_MIN", "60")
+    if ingest_interval_min < 1:
+        raise ValueError("SHILLBOT_INGEST_INTERVAL_MIN must be at least 1")
+    # `shillbot run` refresh-metrics (last 24 hours) + incremental score cadence
+    refresh_metrics_interval_min = _getenv_int("SHILLBOT_REFRESH_METRICS_INTERVAL_MIN", "360")
+    if refresh_metrics_interval_min < 0:
+        raise ValueError("SHILLBOT_REFRESH_METRICS_INTERVAL_MIN must be 0 (off) or more")
 
     pot_share = _getenv_float("SHILLBOT_POT_SHARE", "0.75")
     marketing_share = _getenv_float("SHILLBOT_MARKETING_SHARE", "0.15")
@@ -126,14 +152,23 @@ def load_settings() -> Settings:
     # Use mainnet RPC URL (with validation to prevent devnet)
     rpc_url = _getenv("SHILLBOT_RPC_URL", SOLANA_RPC_URL)
     
+    # Extra RPC endpoints (comma separated); the fastest healthy endpoint is used
+    rpc_fallback_urls = tuple(u.strip() for u in _getenv("SHILLBOT_RPC_FALLBACK_URLS", "").split(",") if u.strip())
+
     # Hard fail if devnet is detected
     validate_rpc_url(rpc_url)
+    for url in rpc_fallback_urls:
+        validate_rpc_url(url)
     treasury_pubkey = _getenv("SHILLBOT_TREASURY_PUBKEY", "").strip()
     treasury_keypair_path = "reward_wallet.json"
     print(f"using treasury keypair: {treasury_keypair_path}")
     marketing_wallet = _getenv("SHILLBOT_MARKETING_WALLET", "").strip()
     dev_wallet = _getenv("SHILLBOT_DEV_WALLET", "").strip()
     sweep_ops = _getenv_bool("SHILLBOT_SWEEP_OPS", "false")
+    # "native": batched multi-recipient transactions signed in-process; "cli": one `solana transfer` per payout
+    payer_backend = _getenv("SHILLBOT_PAYER", "cli").strip().lower()
+    if payer_backend not in {"native", "cli"}:
+        raise ValueError(f"SHILLBOT_PAYER must be 'native' or 'cli', got {payer_backend!r}")
 
     token_mint = _getenv("SHILLBOT_TOKEN_MINT", "").strip()
     min_token_amount = _getenv_int("SHILLBOT_MIN_TOKEN_AMOUNT", "0")
@@ -158,8 +193,16 @@ def load_settings() -> Settings:
         signup_tweet_id=signup_tweet_id,
         db_path=db_path,
         public_dir=public_dir,
+        serve_port=serve_port,
+        latest_max_age_s=latest_max_age_s,
+        publish_gzip=publish_gzip,
         x_api_bearer_token=x_api_bearer_token,
+        x_api_pool_size=x_api_pool_size,
+        x_api_max_pages=x_api_max_pages,
+        x_api_max_wait_s=x_api_max_wait_s,
         close_times=close_times,
+        ingest_interval_min=ingest_interval_min,
+        refresh_metrics_interval_min=refresh_metrics_interval_min,
         pot_share=pot_share,
         marketing_share=marketing_share,
         dev_share=dev_share,
@@ -167,11 +210,13 @@ def load_settings() -> Settings:
         top_n=top_n,
         payout_bins=payout_bins,
         rpc_url=rpc_url,
+        rpc_fallback_urls=rpc_fallback_urls,
         treasury_pubkey=treasury_pubkey,
         treasury_keypair_path=treasury_keypair_path,
         marketing_wallet=marketing_wallet,
         dev_wallet=dev_wallet,
         sweep_ops=sweep_ops,
+        payer_backend=payer_backend,
         token_mint=token_mint,
         min_token_amount=min_token_amount,
         dry_run=dry_run,
@@ -1,9 +1,14 @@
 ﻿from __future__ import annotations
 
+import itertools
 import sqlite3
 from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Iterator, Optional
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from shillbot.models import IngestCursor, Tweet
+from shillbot.utils import parse_epoch
 
 
 SCHEMA = """
@@ -28,7 +33,39 @@ CREATE TABLE IF NOT EXISTS shills (
   has_media INTEGER NOT NULL,
   media_type TEXT NOT NULL,
   is_registered INTEGER DEFAULT 0,
-  score REAL
+  score REAL,
+  scored_at_utc TEXT,
+  match_reasons TEXT,
+  created_at_epoch INTEGER
+);
+
+-- Handles whose registration changed since the last backfill (fed by triggers)
+CREATE TABLE IF NOT EXISTS registration_changes (
+  handle TEXT PRIMARY KEY
+);
+
+CREATE TABLE IF NOT EXISTS handle_best_scores (
+  handle TEXT PRIMARY KEY,
+  tweet_id TEXT NOT NULL,
+  score REAL NOT NULL,
+  tweet_count INTEGER NOT NULL,
+  updated_at_utc TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS ingest_cursors (
+  query TEXT PRIMARY KEY,
+  since_id TEXT NOT NULL,
+  updated_at_utc TEXT NOT NULL,
+  until_id TEXT,
+  pending_id TEXT
+);
+
+CREATE TABLE IF NOT EXISTS api_rate_limits (
+  endpoint TEXT PRIMARY KEY,
+  limit_count INTEGER NOT NULL,
+  remaining INTEGER NOT NULL,
+  reset_epoch INTEGER NOT NULL,
+  updated_at_utc TEXT NOT NULL
 );
 
 CREATE TABLE IF NOT EXISTS windows (
@@ -90,6 +127,7 @@ CREATE TABLE IF NOT EXISTS interim_shills (
   has_media INTEGER NOT NULL,
   media_type TEXT NOT NULL,
   pulled_at_utc TEXT NOT NULL,
+  created_at_epoch INTEGER,
   UNIQUE(tweet_id)
 );
 
@@ -119,11 +157,29 @@ CREATE TABLE IF NOT EXISTS payout_transactions (
   amount_lamports INTEGER,
   tx_signature TEXT,
   sent_at_utc TEXT,
+  status TEXT,
+  last_valid_block_height INTEGER,
+  error TEXT,
+  updated_at_utc TEXT,
   PRIMARY KEY (window_id, wallet)
 );
 """
  
 
+# Rows inserted/updated/deleted in exported tables, one entry per row key (latest change),
+# fed by triggers that 'export-all --incremental' installs (see enable_export_changes).
+# seq is the per-table high-water mark recorded in the export manifest.
+EXPORT_CHANGES_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS export_changes (
+      seq INTEGER PRIMARY KEY AUTOINCREMENT,
+      table_name TEXT NOT NULL,
+      row_key TEXT NOT NULL,
+      UNIQUE (table_name, row_key)
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_export_changes_seq ON export_changes(table_name, seq)",
+)
+
+
 @dataclass(frozen=True)
 class DB:
     path: str
@@ -140,6 +196,26 @@ def connect(db: DB) -> Iterator[sqlite3.Connection]:
         conn.close()
 
 
+@contextmanager
+def connect_readonly(db: DB) -> Iterator[sqlite3.Connection]:
+    """Read-only connection (plain tuple rows); safe to open one per thread alongside writers (WAL)."""
+    conn = sqlite3.connect(f"{Path(db.path).absolute().as_uri()}?mode=ro", uri=True)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+# SQL expression for created_at_epoch from an ISO 8601 created_at_utc ('Z' or offset)
+CREATED_AT_EPOCH_SQL = "CAST(strftime('%s', created_at_utc) AS INTEGER)"
+# Millisecond part (0-999) of created_at_utc, as utils.parse_millis ('%f' is SS.SSS)
+CREATED_AT_MS_SQL = "CAST(ROUND(strftime('%f', created_at_utc) * 1000) AS INTEGER) % 1000"
+
+# Columns read into a tweet_batch.TweetBatch, in TweetBatch.from_rows order
+SHILL_BATCH_COLUMNS = f"""tweet_id, handle, COALESCE(created_at_epoch, {CREATED_AT_EPOCH_SQL}, 0),
+    COALESCE({CREATED_AT_MS_SQL}, 0), like_count, retweet_count, quote_count, reply_count, view_count, has_media"""
+
+
 def init_db(db: DB) -> None:
     with connect(db) as conn:
         conn.executescript(SCHEMA)
@@ -200,6 +276,101 @@ def init_db(db: DB) -> None:
             conn.execute("ALTER TABLE shills ADD COLUMN score REAL")
         except sqlite3.OperationalError:
             pass  # Column already exists
+        # Migration: add scored_at_utc column (incremental scoring watermark)
+        try:
+            conn.execute("ALTER TABLE shills ADD COLUMN scored_at_utc TEXT")
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+        # Migration: add match_reasons column (which shill criteria matched, for auditing)
+        try:
+            conn.execute("ALTER TABLE shills ADD COLUMN match_reasons TEXT")
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+        # Migration: integer created_at_epoch (Unix seconds) for range filters and
+        # minute bucketing without parsing ISO strings. Filled at ingest; rows written
+        # without it (older rows, other writers) are backfilled here and by trigger.
+        for table in ("shills", "interim_shills"):
+            try:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN created_at_epoch INTEGER")
+            except sqlite3.OperationalError:
+                pass  # Column already exists
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_created_epoch ON {table}(created_at_epoch, tweet_id)")
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_created_epoch
+                AFTER INSERT ON {table}
+                WHEN NEW.created_at_epoch IS NULL
+                BEGIN
+                  UPDATE {table} SET created_at_epoch = {CREATED_AT_EPOCH_SQL} WHERE tweet_id = NEW.tweet_id;
+                END
+            """)
+            conn.execute(
+                f"UPDATE {table} SET created_at_epoch = {CREATED_AT_EPOCH_SQL} WHERE created_at_epoch IS NULL"
+            )
+        # Migration: resume state for ingest pulls cut short (see models.IngestCursor)
+        for column in ("until_id TEXT", "pending_id TEXT"):
+            try:
+                conn.execute(f"ALTER TABLE ingest_cursors ADD COLUMN {column}")
+            except sqlite3.OperationalError:
+                pass  # Column already exists
+        # Incremental scoring: partial index over rows that still need scoring,
+        # and a trigger that marks a row dirty again when its metrics change
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_shills_unscored ON shills(handle) WHERE scored_at_utc IS NULL"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_shills_handle ON shills(handle)")
+        # Hot-query indexes (checked by 'shillbot explain', see HOT_QUERIES):
+        # window/recency range filters on created_at_epoch (idx_shills_created_epoch above,
+        # covers the tweet_id-only lookup; replaces the ISO-string index),
+        # and the payout ranking (registered + scored, by score DESC) as a covering partial index
+        conn.execute("DROP INDEX IF EXISTS idx_shills_created_at")
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_shills_payout_rank
+            ON shills(score DESC, handle, tweet_id, is_registered)
+            WHERE is_registered = 1 AND score IS NOT NULL
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_shills_metrics_changed
+            AFTER UPDATE OF like_count, retweet_count, quote_count, reply_count, view_count, has_media ON shills
+            WHEN OLD.like_count IS NOT NEW.like_count
+              OR OLD.retweet_count IS NOT NEW.retweet_count
+              OR OLD.quote_count IS NOT NEW.quote_count
+              OR OLD.reply_count IS NOT NEW.reply_count
+              OR OLD.view_count IS NOT NEW.view_count
+              OR OLD.has_media IS NOT NEW.has_media
+            BEGIN
+              UPDATE shills SET scored_at_utc = NULL WHERE tweet_id = NEW.tweet_id;
+            END
+        """)
+        # Incremental registration backfill: queue handles whose registration
+        # row is inserted/replaced, deleted (deregistration) or renamed
+        triggers_existed = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_registrations_insert'"
+        ).fetchone() is not None
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_registrations_insert AFTER INSERT ON registrations
+            BEGIN
+              INSERT OR IGNORE INTO registration_changes(handle) VALUES (NEW.handle);
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_registrations_delete AFTER DELETE ON registrations
+            BEGIN
+              INSERT OR IGNORE INTO registration_changes(handle) VALUES (OLD.handle);
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_registrations_update AFTER UPDATE OF handle ON registrations
+            BEGIN
+              INSERT OR IGNORE INTO registration_changes(handle) VALUES (OLD.handle);
+              INSERT OR IGNORE INTO registration_changes(handle) VALUES (NEW.handle);
+            END
+        """)
+        if not triggers_existed:
+            # Changes made before the triggers existed are not queued: reconcile once
+            backfill_registration_status(conn, full=True)
+        # export-all --incremental change queue (its triggers are installed on first use)
+        for statement in EXPORT_CHANGES_SCHEMA:
+            conn.execute(statement)
         # Migration: create payout_plan table if it doesn't exist
         try:
             conn.execute("""
@@ -231,6 +402,16 @@ def init_db(db: DB) -> None:
             """)
         except sqlite3.OperationalError:
             pass  # Table already exists
+        # Migration: payout status tracking (SUBMITTED -> CONFIRMED/FAILED/EXPIRED).
+        # Rows from before this have status NULL and count as executed.
+        for column in ("status TEXT", "last_valid_block_height INTEGER", "error TEXT", "updated_at_utc TEXT"):
+            try:
+                conn.execute(f"ALTER TABLE payout_transactions ADD COLUMN {column}")
+            except sqlite3.OperationalError:
+                pass  # Column already exists
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_payout_transactions_status ON payout_transactions(status, tx_signature)"
+        )
 
 
 def get_last_snapshot_lamports(conn: sqlite3.Connection) -> Optional[int]:
@@ -256,14 +437,558 @@ def get_last_window_end_balance(conn: sqlite3.Connection) -> Optional[int]:
     return int(row["end_balance_lamports"]) if row and row["end_balance_lamports"] is not None else None
 
 
-def backfill_registration_status(conn: sqlite3.Connection) -> None:
+def get_ingest_cursor(conn: sqlite3.Connection, query: str) -> IngestCursor:
+    """Ingest state for a search query (empty if never ingested)."""
+    row = conn.execute(
+        "SELECT since_id, until_id, pending_id FROM ingest_cursors WHERE query = ?", (query,)
+    ).fetchone()
+    if not row:
+        return IngestCursor()
+    # since_id is stored as '' while a window pull's gap is being read
+    return IngestCursor(since_id=row["since_id"] or None, until_id=row["until_id"], pending_id=row["pending_id"])
+
+
+def set_ingest_cursor(conn: sqlite3.Connection, query: str, cursor: IngestCursor, updated_at_utc: str) -> None:
+    conn.execute(
+        """INSERT OR REPLACE INTO ingest_cursors (query, since_id, until_id, pending_id, updated_at_utc)
+        VALUES (?,?,?,?,?)""",
+        (query, cursor.since_id or "", cursor.until_id, cursor.pending_id, updated_at_utc),
+    )
+
+
+@dataclass(frozen=True)
+class BulkWriteResult:
+    inserted: int  # New rows written
+    ignored: int  # Rows that created no new row (existing key or duplicate within the batch)
+    skipped: int = 0  # Rows dropped while staging (malformed)
+    updated: int = 0  # Existing rows changed by an upsert (counted in ignored)
+
+
+# New shills take their is_registered flag from registrations at insert time (?2 is the handle)
+INSERT_SHILL_SQL = """INSERT OR IGNORE INTO shills
+    (tweet_id, handle, created_at_utc, text, like_count, retweet_count,
+     quote_count, reply_count, view_count, has_media, media_type, match_reasons, created_at_epoch,
+     is_registered)
+    VALUES (?1,?2,?3,?4,?5,?6,?7,?8,?9,?10,?11,?12,?13,
+            EXISTS (SELECT 1 FROM registrations WHERE handle = ?2))"""
+
+# A re-scraped registration with an unchanged wallet is a no-op, so it doesn't fire the
+# registrations / export change triggers
+UPSERT_REGISTRATION_SQL = """INSERT INTO registrations (handle, wallet, registered_at_utc) VALUES (?,?,?)
+    ON CONFLICT(handle) DO UPDATE SET wallet = excluded.wallet, registered_at_utc = excluded.registered_at_utc
+    WHERE wallet IS NOT excluded.wallet"""
+
+
+def _begin(conn: sqlite3.Connection) -> None:
+    # Open the caller's transaction explicitly so every batch below lands in it
+    # (committed by connect() on exit, together with e.g. the ingest cursor)
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+
+
+def _executemany_batch(conn: sqlite3.Connection, sql: str, rows: Sequence[Tuple[Any, ...]]) -> int:
+    """
+    Write rows with one executemany inside a savepoint (all or nothing for the batch).
+    Returns the number of rows changed.
+    """
+    _begin(conn)
+    conn.execute("SAVEPOINT bulk_write")
+    try:
+        changed = conn.executemany(sql, rows).rowcount
+    except sqlite3.Error:
+        conn.execute("ROLLBACK TO bulk_write")
+        conn.execute("RELEASE bulk_write")
+        raise
+    conn.execute("RELEASE bulk_write")
+    return max(changed, 0)
+
+
+def _shill_row(tweet: Tweet) -> Tuple[Any, ...]:
+    return (
+        str(tweet.tweet_id),
+        str(tweet.handle),
+        str(tweet.created_at_utc),
+        str(tweet.text),
+        int(tweet.like_count),
+        int(tweet.retweet_count),
+        int(tweet.quote_count),
+        int(tweet.reply_count),
+        int(tweet.view_count),
+        1 if tweet.has_media else 0,
+        str(tweet.media_type),
+        tweet.match_reasons or None,
+        tweet.created_at_epoch or parse_epoch(tweet.created_at_utc),
+    )
+
+
+def insert_shills(
+    conn: sqlite3.Connection,
+    tweets: Iterable[Tweet],
+    batch_size: int = 10_000,
+    commit_batches: bool = False,
+) -> BulkWriteResult:
+    """
+    Bulk INSERT OR IGNORE tweets into shills (tweet_id is unique, table is append-only).
+    Rows are staged in Python (malformed tweets are skipped with a warning) and
+    written with executemany in batches of batch_size.
+    tweets may be a lazy stream: only one batch is held in memory. With
+    commit_batches=True each batch is committed as soon as it is written, so an
+    interrupted stream keeps the rows already stored.
+    """
+    inserted = staged = skipped = 0
+    batch: List[Tuple[Any, ...]] = []
+
+    def flush() -> None:
+        nonlocal inserted, staged, batch
+        inserted += _executemany_batch(conn, INSERT_SHILL_SQL, batch)
+        staged += len(batch)
+        batch = []
+        if commit_batches:
+            conn.commit()
+
+    for tweet in tweets:
+        try:
+            batch.append(_shill_row(tweet))
+        except (TypeError, ValueError, AttributeError) as e:
+            print(f"WARNING: Failed to store tweet {getattr(tweet, 'tweet_id', '?')}: {e}")
+            skipped += 1
+            continue
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return BulkWriteResult(inserted=inserted, ignored=staged - inserted, skipped=skipped)
+
+
+def upsert_registrations(
+    conn: sqlite3.Connection,
+    registrations: Iterable[Tuple[str, str]],
+    registered_at_utc: str,
+) -> BulkWriteResult:
+    """
+    Bulk upsert (handle, wallet) registrations; the most recent per handle wins.
+    inserted counts new handles, ignored the rows for existing handles, of which
+    updated changed the wallet (an unchanged registration is left untouched).
+    """
+    rows: List[Tuple[str, str, str]] = []
+    skipped = 0
+    for reg in registrations:
+        try:
+            handle, wallet = reg
+            rows.append((str(handle), str(wallet), registered_at_utc))
+        except (TypeError, ValueError) as e:
+            # Never crash on malformed data
+            print(f"WARNING: Failed to store registration {reg!r}: {e}")
+            skipped += 1
+    if not rows:
+        return BulkWriteResult(inserted=0, ignored=0, skipped=skipped)
+    # The upsert reports inserts and updates alike, so count new handles from the table size
+    before = conn.execute("SELECT COUNT(*) FROM registrations").fetchone()[0]
+    changed = _executemany_batch(conn, UPSERT_REGISTRATION_SQL, rows)
+    after = conn.execute("SELECT COUNT(*) FROM registrations").fetchone()[0]
+    inserted = after - before
+    return BulkWriteResult(
+        inserted=inserted, ignored=len(rows) - inserted, skipped=skipped, updated=changed - inserted
+    )
+
+
+BACKFILL_CHANGED_SQL = """UPDATE shills
+    SET is_registered = EXISTS (SELECT 1 FROM registrations r WHERE r.handle = shills.handle)
+    WHERE handle IN (SELECT handle FROM registration_changes)
+      AND is_registered IS NOT EXISTS (SELECT 1 FROM registrations r WHERE r.handle = shills.handle)"""
+
+# close-once window candidates: shills in [start, end) epoch whose handle is not
+# blacklisted (anti-join on the blacklist_handles primary key). The blacklist is per
+# handle, so dropping it before the per-handle rate limit changes nothing; excluded
+# tweets are only dropped after rate limiting (an excluded tweet still takes its
+# handle's slot for that minute), see WINDOW_EXCLUDED_IDS_SQL.
+WINDOW_CANDIDATES_SQL = f"""SELECT {SHILL_BATCH_COLUMNS}
+    FROM shills s
+    WHERE s.created_at_epoch >= ? AND s.created_at_epoch < ?
+      AND NOT EXISTS (SELECT 1 FROM blacklist_handles b WHERE b.handle = s.handle)"""
+
+# Excluded tweets in the window, and window shills of blacklisted handles. Index joins;
+# the planner may instead scan the small lookup table and probe shills by primary key / handle.
+WINDOW_EXCLUDED_IDS_SQL = """SELECT e.tweet_id
+    FROM excluded_tweets e JOIN shills s ON s.tweet_id = e.tweet_id
+    WHERE s.created_at_epoch >= ? AND s.created_at_epoch < ?"""
+# Counts only the first tweet of each (handle, minute) bucket: rate limiting keeps one
+# per bucket, so this is the number of blacklisted tweets that would have survived it.
+WINDOW_BLACKLISTED_COUNT_SQL = """SELECT COUNT(*)
+    FROM blacklist_handles b JOIN shills s ON s.handle = b.handle
+    WHERE s.created_at_epoch >= ?1 AND s.created_at_epoch < ?2
+      AND NOT EXISTS (
+        SELECT 1 FROM shills e
+        WHERE e.handle = s.handle
+          AND e.created_at_epoch >= MAX(?1, s.created_at_epoch / 60 * 60)
+          AND (e.created_at_epoch < s.created_at_epoch
+               OR (e.created_at_epoch = s.created_at_epoch AND e.tweet_id < s.tweet_id)))"""
+
+
+@dataclass(frozen=True)
+class HotQuery:
+    name: str
+    sql: str
+    params: Tuple[Any, ...] = ()
+    # Tables this query is expected to read in full (e.g. a small lookup table)
+    allow_scan: Tuple[str, ...] = ()
+
+
+# Queries on the ingest/close/payout paths that must stay index-backed as shills grows.
+# Keep the SQL in sync with the call sites noted in each name.
+HOT_QUERIES: Tuple[HotQuery, ...] = (
+    HotQuery(
+        "close-once: window candidates",
+        WINDOW_CANDIDATES_SQL,
+        (1_767_225_600, 1_767_312_000),
+    ),
+    HotQuery(
+        "close-once, run --serve: excluded tweets in window",
+        WINDOW_EXCLUDED_IDS_SQL,
+        (1_767_225_600, 1_767_312_000),
+        allow_scan=("e",),
+    ),
+    HotQuery(
+        "close-once: blacklisted tweets in window",
+        WINDOW_BLACKLISTED_COUNT_SQL,
+        (1_767_225_600, 1_767_312_000),
+        allow_scan=("b",),
+    ),
+    HotQuery(
+        "run --serve: live leaderboard candidates for handles",
+        f"{WINDOW_CANDIDATES_SQL} AND s.handle IN (?)",
+        (1_767_225_600, 1_767_312_000, "handle"),
+    ),
+    HotQuery(
+        "export-all --incremental: changed shills",
+        """SELECT t.* FROM export_changes c
+            JOIN shills t ON t.tweet_id = json_extract(c.row_key, '$[0]')
+            WHERE c.table_name = ? AND c.seq > ?""",
+        ("shills", 0),
+    ),
+    HotQuery(
+        "refresh-metrics: recent shills",
+        "SELECT tweet_id FROM shills WHERE created_at_epoch >= ?",
+        (1_767_225_600,),
+    ),
+    HotQuery(
+        "compute-payouts: registered ranking",
+        """SELECT handle, score, tweet_id
+           FROM shills
+           WHERE is_registered = 1 AND score IS NOT NULL
+           ORDER BY score DESC""",
+    ),
+    HotQuery(
+        "backfill_registration_status",
+        BACKFILL_CHANGED_SQL,
+        allow_scan=("registration_changes",),
+    ),
+    HotQuery(
+        "score --incremental: pending handles",
+        "SELECT DISTINCT handle FROM shills WHERE scored_at_utc IS NULL",
+    ),
+    HotQuery(
+        "score --incremental: shills for handles",
+        f"SELECT {SHILL_BATCH_COLUMNS} FROM shills WHERE handle IN (?)",
+        ("handle",),
+    ),
+)
+
+
+def explain_query_plan(conn: sqlite3.Connection, sql: str, params: Sequence[Any] = ()) -> List[str]:
+    """EXPLAIN QUERY PLAN detail lines for a statement (the statement itself is not run)."""
+    return [r["detail"] for r in conn.execute(f"EXPLAIN QUERY PLAN {sql}", tuple(params)).fetchall()]
+
+
+def plan_regressions(plan: Sequence[str], allow_scan: Sequence[str] = ()) -> List[str]:
+    """
+    Plan steps that read a whole table or sort without an index: a bare
+    'SCAN <table>' (no index) or a temp B-tree for ORDER BY / DISTINCT.
+    Scanning a (partial) index in order is fine.
+    """
+    bad: List[str] = []
+    for detail in plan:
+        words = detail.split()
+        if words[:1] == ["SCAN"] and len(words) >= 2 and "USING" not in words:
+            if words[1] not in allow_scan:
+                bad.append(detail)
+        elif detail.startswith("USE TEMP B-TREE"):
+            bad.append(detail)
+    return bad
+
+
+def record_payout_transaction(
+    conn: sqlite3.Connection,
+    window_id: str,
+    wallet: str,
+    amount_lamports: int,
+    tx_signature: Optional[str],
+    status: Optional[str],
+    updated_at_utc: str,
+    last_valid_block_height: Optional[int] = None,
+    error: Optional[str] = None,
+) -> None:
+    """Insert or replace the payout_transactions row for (window_id, wallet)."""
+    conn.execute(
+        """INSERT OR REPLACE INTO payout_transactions
+           (window_id, wallet, amount_lamports, tx_signature, sent_at_utc,
+            status, last_valid_block_height, error, updated_at_utc)
+           VALUES (?,?,?,?,?,?,?,?,?)""",
+        (window_id, wallet, amount_lamports, tx_signature, updated_at_utc,
+         status, last_valid_block_height, error, updated_at_utc),
+    )
+
+
+def set_payout_status(
+    conn: sqlite3.Connection,
+    tx_signature: str,
+    status: str,
+    updated_at_utc: str,
+    error: Optional[str] = None,
+) -> int:
+    """Move every payout carried by a transaction to a new status. Returns rows updated."""
+    return conn.execute(
+        "UPDATE payout_transactions SET status = ?, error = ?, updated_at_utc = ? WHERE tx_signature = ?",
+        (status, error, updated_at_utc, tx_signature),
+    ).rowcount
+
+
+def get_submitted_payouts(conn: sqlite3.Connection, window_id: str) -> Dict[str, int]:
+    """Unresolved transactions of a window: tx_signature -> last_valid_block_height."""
+    rows = conn.execute(
+        """SELECT tx_signature, MAX(last_valid_block_height) AS last_valid_block_height
+           FROM payout_transactions
+           WHERE status = 'SUBMITTED' AND window_id = ? AND tx_signature IS NOT NULL
+           GROUP BY tx_signature""",
+        (window_id,),
+    ).fetchall()
+    return {r["tx_signature"]: int(r["last_valid_block_height"] or 0) for r in rows}
+
+
+def backfill_registration_status(conn: sqlite3.Connection, full: bool = False) -> int:
     """
-    Update is_registered column in shills table based on current registrations.
+    Sync shills.is_registered with registrations.
     Runs whenever registrations are ingested or shills are scored.
-    Retroactively marks all past tweets when users register.
+    Retroactively marks all past tweets when users register, and unmarks them
+    when a registration is deleted.
+    By default only handles queued in registration_changes (by the registrations
+    triggers) are touched, so the work is O(changed registrations); full=True
+    reconciles the whole table.
+    Returns number of shills rows changed.
+    """
+    if full:
+        changed = conn.execute("""
+            UPDATE shills
+            SET is_registered = (handle IN (SELECT handle FROM registrations))
+            WHERE is_registered IS NOT (handle IN (SELECT handle FROM registrations))
+        """).rowcount
+    else:
+        changed = conn.execute(BACKFILL_CHANGED_SQL).rowcount
+    conn.execute("DELETE FROM registration_changes")
+    return changed
+
+
+def export_key_sql(prefix: str, key: Sequence[str]) -> str:
+    """export_changes.row_key for a row: JSON array of its primary key values."""
+    return f"json_array({', '.join(f'{prefix}.{k}' for k in key)})"
+
+
+def enable_export_changes(conn: sqlite3.Connection, tables: Sequence[Tuple[str, Sequence[str]]]) -> bool:
+    """
+    (Re)create the triggers that queue (table, primary key) into export_changes
+    on insert, delete and any column change, for each (table, key columns).
+    Recreated every time, so columns added by later migrations are covered.
+    Only installed once incremental exports are used: each tracked write also
+    upserts export_changes (bulk shill inserts ~1.5x slower, see bench_export.py).
+    True if some table wasn't tracked yet (its earlier changes were not recorded).
+    """
+    existing = {
+        r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_export_%'")
+    }
+    for statement in EXPORT_CHANGES_SCHEMA:
+        conn.execute(statement)
+    untracked = False
+    for table, key in tables:
+        columns = [r[1] for r in conn.execute(f"PRAGMA table_info({table})").fetchall()]
+        if not columns:
+            continue
+        names = [f"trg_export_{table}_{op}" for op in ("insert", "update", "delete")]
+        untracked = untracked or any(name not in existing for name in names)
+        for name in names:
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        queue = "INSERT OR REPLACE INTO export_changes(table_name, row_key)"
+        conn.execute(f"""
+            CREATE TRIGGER trg_export_{table}_insert AFTER INSERT ON {table}
+            BEGIN
+              {queue} VALUES ('{table}', {export_key_sql("NEW", key)});
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER trg_export_{table}_update AFTER UPDATE ON {table}
+            WHEN {" OR ".join(f"OLD.{c} IS NOT NEW.{c}" for c in columns)}
+            BEGIN
+              {queue} SELECT '{table}', {export_key_sql("OLD", key)}
+                WHERE {" OR ".join(f"OLD.{k} IS NOT NEW.{k}" for k in key)};
+              {queue} VALUES ('{table}', {export_key_sql("NEW", key)});
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER trg_export_{table}_delete AFTER DELETE ON {table}
+            BEGIN
+              {queue} VALUES ('{table}', {export_key_sql("OLD", key)});
+            END
+        """)
+    return untracked
+
+
+def get_export_watermark(conn: sqlite3.Connection, table: str) -> int:
+    """Latest export_changes seq for table (0 if none)."""
+    row = conn.execute("SELECT MAX(seq) FROM export_changes WHERE table_name = ?", (table,)).fetchone()
+    return int(row[0] or 0)
+
+
+def prune_export_changes(conn: sqlite3.Connection, watermarks: Dict[str, int]) -> int:
+    """Drop queued changes already covered by an export (seq <= the table's watermark)."""
+    deleted = 0
+    for table, seq in watermarks.items():
+        deleted += conn.execute("DELETE FROM export_changes WHERE table_name = ? AND seq <= ?", (table, seq)).rowcount
+    return deleted
+
+
+def get_registered_wallets(conn: sqlite3.Connection) -> Dict[str, str]:
+    """handle -> wallet for every registration."""
+    return {r["handle"]: r["wallet"] for r in conn.execute("SELECT handle, wallet FROM registrations")}
+
+
+def get_unscored_handles(conn: sqlite3.Connection) -> List[str]:
+    """
+    Handles with at least one new or changed shill since the last scoring run.
+    Uses the partial index over scored_at_utc IS NULL (O(delta), not O(table)).
+    """
+    rows = conn.execute(
+        "SELECT DISTINCT handle FROM shills WHERE scored_at_utc IS NULL"
+    ).fetchall()
+    return [r["handle"] for r in rows]
+
+
+def _chunks(items: Sequence[str], size: int = 500) -> Iterator[Sequence[str]]:
+    # Stay under SQLite's bound-parameter limit for IN (...) lists
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _iter_tuples(
+    conn: sqlite3.Connection, sql: str, params: Sequence[Any] = (), fetch_size: int = 10_000
+) -> Iterator[Tuple[Any, ...]]:
+    """Result rows as plain tuples (no sqlite3.Row per row), fetched fetch_size at a time."""
+    cur = conn.cursor()
+    cur.row_factory = None
+    cur.execute(sql, tuple(params))
+    while True:
+        rows = cur.fetchmany(fetch_size)
+        if not rows:
+            return
+        yield from rows
+
+
+def iter_shill_batch_rows(
+    conn: sqlite3.Connection, where: str = "", params: Sequence[Any] = ()
+) -> Iterator[Tuple[Any, ...]]:
+    """SHILL_BATCH_COLUMNS rows from shills as plain tuples; where is appended to the SELECT as-is."""
+    return _iter_tuples(conn, f"SELECT {SHILL_BATCH_COLUMNS} FROM shills {where}", params)
+
+
+def iter_window_candidate_rows(
+    conn: sqlite3.Connection, start_epoch: int, end_epoch: int, handles: Optional[Sequence[str]] = None
+) -> Iterator[Tuple[Any, ...]]:
+    """
+    SHILL_BATCH_COLUMNS rows (plain tuples) for the close-once window, blacklisted
+    handles already dropped (excluded tweets are not: drop window_excluded_tweet_ids
+    after rate limiting); only the given handles' rows when handles is not None.
+    """
+    if handles is None:
+        return _iter_tuples(conn, WINDOW_CANDIDATES_SQL, (start_epoch, end_epoch))
+    return itertools.chain.from_iterable(
+        _iter_tuples(
+            conn,
+            f"{WINDOW_CANDIDATES_SQL} AND s.handle IN ({','.join('?' * len(chunk))})",
+            (start_epoch, end_epoch, *chunk),
+        )
+        for chunk in _chunks(handles)
+    )
+
+
+def window_excluded_tweet_ids(conn: sqlite3.Connection, start_epoch: int, end_epoch: int) -> Set[str]:
+    """IDs of the window's shills listed in excluded_tweets."""
+    return {r[0] for r in conn.execute(WINDOW_EXCLUDED_IDS_SQL, (start_epoch, end_epoch))}
+
+
+def count_window_blacklisted(conn: sqlite3.Connection, start_epoch: int, end_epoch: int) -> int:
+    """Window shills of blacklisted handles that would have survived rate limiting (one per handle per minute)."""
+    return conn.execute(WINDOW_BLACKLISTED_COUNT_SQL, (start_epoch, end_epoch)).fetchone()[0]
+
+
+def iter_shill_batch_rows_for_handles(conn: sqlite3.Connection, handles: Sequence[str]) -> Iterator[Tuple[Any, ...]]:
+    """SHILL_BATCH_COLUMNS rows for the given handles (uses idx_shills_handle)."""
+    for chunk in _chunks(handles):
+        placeholders = ",".join("?" * len(chunk))
+        yield from iter_shill_batch_rows(conn, f"WHERE handle IN ({placeholders})", chunk)
+
+
+def get_max_shill_rowid(conn: sqlite3.Connection) -> int:
+    """Highest shills rowid (0 if empty); rows stored later get a higher one."""
+    return conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM shills").fetchone()[0]
+
+
+def mark_shills_scored(
+    conn: sqlite3.Connection, scored_at_utc: str, max_rowid: int, handles: Optional[Sequence[str]] = None
+) -> None:
+    """
+    Advance the scoring watermark for the pending rows a scoring pass read: rows up to
+    max_rowid (taken before the pass read shills), of the given handles or all handles.
+    Shills stored while the pass ran stay pending for the next run.
+    """
+    if handles is None:
+        conn.execute(
+            "UPDATE shills SET scored_at_utc = ? WHERE scored_at_utc IS NULL AND rowid <= ?",
+            (scored_at_utc, max_rowid),
+        )
+        return
+    for chunk in _chunks(handles):
+        placeholders = ",".join("?" * len(chunk))
+        conn.execute(
+            f"""UPDATE shills SET scored_at_utc = ?
+                WHERE scored_at_utc IS NULL AND rowid <= ? AND handle IN ({placeholders})""",
+            (scored_at_utc, max_rowid, *chunk),
+        )
+
+
+def update_handle_best_scores(
+    conn: sqlite3.Connection,
+    best: Dict[str, Tuple[str, float]],
+    tweet_counts: Dict[str, int],
+    updated_at_utc: str,
+) -> int:
+    """
+    Write per-handle best scores into shills.score and the handle_best_scores table
+    (one row per handle). If a handle's best tweet moved, the previous best tweet's
+    score is cleared. close-once also writes its window best into shills.score, so
+    shills can still hold more than one scored tweet for a handle.
+    Returns number of handles whose best tweet changed.
     """
-    conn.execute("""
-        UPDATE shills
-        SET is_registered = 1
-        WHERE handle IN (SELECT handle FROM registrations)
-    """)
+    moved = 0
+    for handle, (tweet_id, score) in best.items():
+        prev = conn.execute(
+            "SELECT tweet_id FROM handle_best_scores WHERE handle = ?", (handle,)
+        ).fetchone()
+        if prev and prev["tweet_id"] != tweet_id:
+            conn.execute("UPDATE shills SET score = NULL WHERE tweet_id = ?", (prev["tweet_id"],))
+            moved += 1
+        conn.execute("UPDATE shills SET score = ? WHERE tweet_id = ?", (float(score), tweet_id))
+        conn.execute(
+            """INSERT OR REPLACE INTO handle_best_scores
+               (handle, tweet_id, score, tweet_count, updated_at_utc)
+               VALUES (?,?,?,?,?)""",
+            (handle, tweet_id, float(score), int(tweet_counts.get(handle, 0)), updated_at_utc),
+        )
+    return moved
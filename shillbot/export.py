@@ -0,0 +1,398 @@
+from __future__ import annotations
+
+import csv
+import json
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from shillbot.config import INSIDER_HANDLES
+from shillbot.db import (
+    DB,
+    connect,
+    connect_readonly,
+    enable_export_changes,
+    get_export_watermark,
+    prune_export_changes,
+)
+from shillbot.reporting import utc_now_iso, write_atomic
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # Optional: only needed for --format parquet/arrow
+    pa = None
+
+
+# Rows fetched from SQLite (and written) per step; bounds memory per table
+EXPORT_FETCH_SIZE = 10_000
+# Write buffer per CSV file
+CSV_BUFFER_BYTES = 1024 * 1024
+# Tables exported concurrently, each on its own read-only connection
+DEFAULT_EXPORT_WORKERS = 4
+
+EXPORT_FORMATS = ("csv", "parquet", "arrow")
+_EXTENSIONS = {"csv": "csv", "parquet": "parquet", "arrow": "arrow"}
+
+# export-all --incremental: public/exports/incremental/<id>/ plus a manifest chaining them
+INCREMENTAL_DIR = "incremental"
+MANIFEST = "manifest.json"
+
+
+@dataclass(frozen=True)
+class ExportSpec:
+    table: str
+    order_by: str
+    key: Tuple[str, ...]  # primary key: identifies a row across incremental exports
+    insider_column: bool = False  # append is_insider (handle in config.INSIDER_HANDLES)
+
+
+# Canonical tables only (no interim tables), in export-all's summary order
+EXPORT_TABLES: Tuple[ExportSpec, ...] = (
+    ExportSpec("registrations", "registered_at_utc ASC", ("handle",)),
+    # created_at_epoch follows created_at_utc; ordering by it streams from
+    # idx_shills_created_epoch instead of sorting the whole table first
+    ExportSpec("shills", "created_at_epoch ASC, tweet_id ASC", ("tweet_id",), insider_column=True),
+    ExportSpec("payout_plan", "window_id ASC, rank ASC", ("window_id", "rank")),
+    ExportSpec("payout_transactions", "window_id ASC, sent_at_utc ASC", ("window_id", "wallet")),
+)
+
+
+@dataclass(frozen=True)
+class TableExport:
+    table: str
+    rows: int
+    file: Optional[str]  # None if the table doesn't exist
+    deleted: int = 0  # incremental deltas: keys deleted since the previous export
+    deleted_file: Optional[str] = None
+    watermark: int = 0  # export_changes seq this export is consistent with
+
+
+def table_columns(conn: sqlite3.Connection, table: str) -> List[Tuple[str, str]]:
+    """(name, declared type) per column; empty if the table doesn't exist."""
+    return [(r[1], r[2]) for r in conn.execute(f"PRAGMA table_info({table})").fetchall()]
+
+
+def _key_join(key: Sequence[str]) -> str:
+    """Match table rows (t) to export_changes entries (c) on the JSON row_key."""
+    return " AND ".join(f"t.{k} = json_extract(c.row_key, '$[{i}]')" for i, k in enumerate(key))
+
+
+def export_query(
+    spec: ExportSpec, columns: Sequence[str], since_seq: Optional[int] = None
+) -> Tuple[str, Tuple[Any, ...]]:
+    """
+    SELECT for a table export: every row, or with since_seq only rows changed
+    after that export_changes seq. is_insider is computed by SQLite, not per row
+    in Python.
+    """
+    select = ", ".join(f"t.{c}" for c in columns)
+    params: Tuple[Any, ...] = ()
+    if spec.insider_column:
+        insiders = tuple(sorted(INSIDER_HANDLES))
+        if insiders:
+            select += f", CASE WHEN lower(t.handle) IN ({', '.join('?' * len(insiders))}) THEN 1 ELSE 0 END"
+            params = insiders
+        else:
+            select += ", 0"
+    if since_seq is None:
+        return f"SELECT {select} FROM {spec.table} t ORDER BY {spec.order_by}", params
+    return (
+        f"""SELECT {select} FROM export_changes c JOIN {spec.table} t ON {_key_join(spec.key)}
+            WHERE c.table_name = ? AND c.seq > ? ORDER BY c.seq""",
+        params + (spec.table, since_seq),
+    )
+
+
+def deleted_keys_query(spec: ExportSpec, since_seq: int) -> Tuple[str, Tuple[Any, ...]]:
+    """Keys changed after since_seq that no longer exist (deleted or renamed)."""
+    return (
+        f"""SELECT c.row_key FROM export_changes c
+            WHERE c.table_name = ? AND c.seq > ?
+              AND NOT EXISTS (SELECT 1 FROM {spec.table} t WHERE {_key_join(spec.key)})
+            ORDER BY c.seq""",
+        (spec.table, since_seq),
+    )
+
+
+def iter_chunks(
+    conn: sqlite3.Connection, sql: str, params: Sequence[Any] = (), fetch_size: int = EXPORT_FETCH_SIZE
+) -> Iterator[List[Tuple[Any, ...]]]:
+    """Result rows as lists of plain tuples, fetch_size at a time."""
+    cur = conn.cursor()
+    cur.row_factory = None
+    cur.execute(sql, tuple(params))
+    while True:
+        rows = cur.fetchmany(fetch_size)
+        if not rows:
+            return
+        yield rows
+
+
+def write_csv(path: str, header: Sequence[str], chunks: Iterable[List[Tuple[Any, ...]]]) -> int:
+    """Header (if any) then every chunk; returns the row count."""
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8", buffering=CSV_BUFFER_BYTES) as f:
+        writer = csv.writer(f)
+        if header:
+            writer.writerow(header)
+        for rows in chunks:
+            writer.writerows(rows)
+            count += len(rows)
+    return count
+
+
+def _arrow_type(declared: str) -> "pa.DataType":
+    """SQLite type affinity -> Arrow type (INTEGER/REAL, everything else as text)."""
+    declared = declared.upper()
+    if "INT" in declared:
+        return pa.int64()
+    if any(t in declared for t in ("REAL", "FLOA", "DOUB")):
+        return pa.float64()
+    return pa.string()
+
+
+def write_columnar(
+    path: str, fmt: str, columns: Sequence[Tuple[str, str]], chunks: Iterable[List[Tuple[Any, ...]]]
+) -> int:
+    """
+    Parquet or Arrow IPC file with a schema from the declared column types, one
+    record batch (row group) per chunk; returns the row count.
+    """
+    if pa is None:
+        raise RuntimeError(f"export-all --format {fmt} requires pyarrow (pip install pyarrow)")
+    schema = pa.schema([(name, _arrow_type(declared)) for name, declared in columns])
+    text_columns = [i for i, field in enumerate(schema) if field.type == pa.string()]
+    if fmt == "parquet":
+        writer = pyarrow.parquet.ParquetWriter(path, schema)
+    else:
+        writer = pyarrow.ipc.new_file(path, schema)
+    count = 0
+    try:
+        for rows in chunks:
+            values = [list(col) for col in zip(*rows)]
+            # SQLite columns are dynamically typed: stringify stray numbers in TEXT columns
+            for i in text_columns:
+                values[i] = [v if v is None or isinstance(v, str) else str(v) for v in values[i]]
+            writer.write_batch(pa.RecordBatch.from_arrays(
+                [pa.array(v, type=field.type) for v, field in zip(values, schema)], schema=schema
+            ))
+            count += len(rows)
+    finally:
+        writer.close()
+    return count
+
+
+def write_rows(
+    path: str, fmt: str, columns: Sequence[Tuple[str, str]], chunks: Iterable[List[Tuple[Any, ...]]]
+) -> int:
+    if fmt == "csv":
+        return write_csv(path, [name for name, _ in columns], chunks)
+    return write_columnar(path, fmt, columns, chunks)
+
+
+def export_table(
+    db: DB,
+    spec: ExportSpec,
+    out_dir: str,
+    fmt: str = "csv",
+    since_seq: Optional[int] = None,
+    tracked: bool = False,
+) -> TableExport:
+    """
+    Stream one table to out_dir/<table>.<ext> on its own read-only connection:
+    every row, or with since_seq the rows changed after it plus the deleted keys
+    in <table>.deleted.<ext>. tracked (export_changes in use): also read the
+    watermark, from the same snapshot as the rows.
+    A missing table gives an empty CSV (no columnar file).
+    """
+    path = os.path.join(out_dir, f"{spec.table}.{_EXTENSIONS[fmt]}")
+    with connect_readonly(db) as conn:
+        conn.execute("BEGIN")
+        columns = table_columns(conn, spec.table)
+        if not columns:
+            if fmt == "csv":
+                write_csv(path, (), ())
+                return TableExport(spec.table, 0, path)
+            return TableExport(spec.table, 0, None)
+        watermark = 0
+        if tracked or since_seq is not None:
+            # Changes up to the previous watermark were pruned: never move it backwards
+            watermark = max(get_export_watermark(conn, spec.table), since_seq or 0)
+        types = dict(columns)
+        sql, params = export_query(spec, [name for name, _ in columns], since_seq)
+        if spec.insider_column:
+            columns.append(("is_insider", "INTEGER"))
+        rows = write_rows(path, fmt, columns, iter_chunks(conn, sql, params))
+        if since_seq is None:
+            return TableExport(spec.table, rows, path, watermark=watermark)
+
+        deleted_path = os.path.join(out_dir, f"{spec.table}.deleted.{_EXTENSIONS[fmt]}")
+        sql, params = deleted_keys_query(spec, since_seq)
+        keys = ([tuple(json.loads(r[0])) for r in chunk] for chunk in iter_chunks(conn, sql, params))
+        deleted = write_rows(deleted_path, fmt, [(k, types[k]) for k in spec.key], keys)
+        return TableExport(spec.table, rows, path, deleted, deleted_path, watermark)
+
+
+def _check_format(fmt: str) -> None:
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r} (expected one of {', '.join(EXPORT_FORMATS)})")
+    if fmt != "csv" and pa is None:
+        raise RuntimeError(f"export-all --format {fmt} requires pyarrow (pip install pyarrow)")
+
+
+def export_all(
+    db: DB,
+    out_dir: str,
+    fmt: str = "csv",
+    workers: int = DEFAULT_EXPORT_WORKERS,
+    specs: Sequence[ExportSpec] = EXPORT_TABLES,
+) -> List[Tuple[str, int]]:
+    """Export every table in specs to out_dir, up to `workers` at once; (table, rows) in specs order."""
+    _check_format(fmt)
+    os.makedirs(out_dir, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(specs)))) as pool:
+        return [(r.table, r.rows) for r in pool.map(lambda spec: export_table(db, spec, out_dir, fmt), specs)]
+
+
+def load_manifest(incremental_dir: str) -> Dict[str, Any]:
+    try:
+        with open(os.path.join(incremental_dir, MANIFEST), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"exports": []}
+
+
+def export_chain(manifest: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The latest export and its parents back to their base, base first."""
+    by_id = {e["id"]: e for e in manifest["exports"]}
+    chain: List[Dict[str, Any]] = []
+    entry = manifest["exports"][-1] if manifest["exports"] else None
+    while entry is not None:
+        chain.append(entry)
+        entry = by_id[entry["parent"]] if entry["parent"] else None
+    return chain[::-1]
+
+
+def export_incremental(
+    db: DB,
+    exports_dir: str,
+    fmt: str = "csv",
+    workers: int = DEFAULT_EXPORT_WORKERS,
+    specs: Sequence[ExportSpec] = EXPORT_TABLES,
+) -> Dict[str, Any]:
+    """
+    export-all --incremental: write only rows inserted/updated (and keys deleted)
+    since the previous incremental export, to exports_dir/incremental/<id>/, and
+    append an entry chaining it to its parent in incremental/manifest.json.
+    The first run (or one after the format or a table's columns changed, or
+    with change tracking newly enabled) writes a full base instead.
+    Returns the new manifest entry.
+    """
+    _check_format(fmt)
+    incremental_dir = os.path.join(exports_dir, INCREMENTAL_DIR)
+    manifest = load_manifest(incremental_dir)
+    with connect(db) as conn:
+        untracked = enable_export_changes(conn, [(spec.table, spec.key) for spec in specs])
+        columns = {
+            spec.table: [name for name, _ in table_columns(conn, spec.table)]
+            + (["is_insider"] if spec.insider_column else [])
+            for spec in specs
+        }
+
+    parent = manifest["exports"][-1] if manifest["exports"] else None
+    is_base = (
+        parent is None
+        or untracked
+        or parent["format"] != fmt
+        or {table: info["columns"] for table, info in parent["tables"].items()} != columns
+    )
+    export_id = f"{len(manifest['exports']) + 1:06d}_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}"
+    out_dir = os.path.join(incremental_dir, export_id)
+    # exist_ok: a run that failed before updating the manifest may have left this id's folder
+    os.makedirs(out_dir, exist_ok=True)
+
+    def run(spec: ExportSpec) -> TableExport:
+        since_seq = None if is_base else parent["tables"][spec.table]["watermark"]
+        return export_table(db, spec, out_dir, fmt, since_seq, tracked=True)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(specs)))) as pool:
+        results = list(pool.map(run, specs))
+
+    def relative(path: Optional[str]) -> Optional[str]:
+        return os.path.relpath(path, incremental_dir).replace(os.sep, "/") if path else None
+
+    entry = {
+        "id": export_id,
+        "kind": "base" if is_base else "delta",
+        "parent": None if is_base else parent["id"],
+        "created_at_utc": utc_now_iso(),
+        "format": fmt,
+        "tables": {
+            spec.table: {
+                "columns": columns[spec.table],
+                "key": list(spec.key),
+                "file": relative(r.file),
+                "rows": r.rows,
+                "deleted_file": relative(r.deleted_file),
+                "deleted": r.deleted,
+                "watermark": r.watermark,
+            }
+            for spec, r in zip(specs, results)
+        },
+    }
+    manifest["exports"].append(entry)
+    write_atomic(os.path.join(incremental_dir, MANIFEST), json.dumps(manifest, indent=2).encode("utf-8"))
+
+    # Exported changes are no longer needed (a crash before this only leaves them queued)
+    with connect(db) as conn:
+        prune_export_changes(conn, {r.table: r.watermark for r in results})
+    return entry
+
+
+def read_rows(path: str, fmt: str) -> Tuple[List[str], Iterator[List[Any]]]:
+    """(header, rows) of an exported file; CSV values come back as strings."""
+    if fmt == "csv":
+        f = open(path, newline="", encoding="utf-8")
+        reader = csv.reader(f)
+        header = next(reader, [])
+
+        def rows() -> Iterator[List[Any]]:
+            with f:
+                yield from reader
+
+        return header, rows()
+    if pa is None:
+        raise RuntimeError(f"reading {fmt} exports requires pyarrow (pip install pyarrow)")
+    if fmt == "parquet":
+        table = pyarrow.parquet.read_table(path)
+    else:
+        with pyarrow.ipc.open_file(path) as reader:
+            table = reader.read_all()
+    return table.column_names, (list(row.values()) for row in table.to_pylist())
+
+
+def reconstruct_table(incremental_dir: str, table: str) -> Tuple[List[str], Dict[Tuple[Any, ...], List[Any]]]:
+    """
+    A table as of the latest incremental export: the base, then each delta's
+    deleted keys removed and its rows upserted by primary key.
+    Returns (header, key -> row).
+    """
+    header: List[str] = []
+    rows: Dict[Tuple[Any, ...], List[Any]] = {}
+    for entry in export_chain(load_manifest(incremental_dir)):
+        info = entry["tables"][table]
+        if info["deleted_file"]:
+            _, deleted = read_rows(os.path.join(incremental_dir, info["deleted_file"]), entry["format"])
+            for key in deleted:
+                rows.pop(tuple(key), None)
+        if info["file"]:
+            header, changed = read_rows(os.path.join(incremental_dir, info["file"]), entry["format"])
+            key_idx = [header.index(k) for k in info["key"]]
+            for row in changed:
+                rows[tuple(row[i] for i in key_idx)] = row
+    return header, rows
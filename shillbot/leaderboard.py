@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from shillbot.db import get_registered_wallets, iter_window_candidate_rows, window_excluded_tweet_ids
+from shillbot.reporting import utc_now_iso
+from shillbot.tweet_batch import TweetBatch
+
+
+@dataclass(frozen=True)
+class Standing:
+    handle: str
+    tweet_id: str
+    score: float
+    tweet_count: int  # after rate limiting
+
+
+@dataclass(frozen=True)
+class LeaderboardSnapshot:
+    version: int  # increases on every published change, across windows
+    window_id: str
+    entries: Tuple[Dict[str, Any], ...]  # ranked, top_n
+    payload: bytes  # single-line JSON, shared by every HTTP/SSE client
+
+
+def compute_standings(
+    conn: sqlite3.Connection, start_epoch: int, end_epoch: int, handles: Optional[Sequence[str]] = None
+) -> Dict[str, Standing]:
+    """Best tweet per handle in the window, scored like close-once (all handles, or just the given ones)."""
+    batch = (
+        TweetBatch.from_rows(iter_window_candidate_rows(conn, start_epoch, end_epoch, handles))
+        .rate_limit()
+        .exclude(tweet_ids=window_excluded_tweet_ids(conn, start_epoch, end_epoch))
+    )
+    counts = batch.handle_counts()
+    return {
+        handle: Standing(handle, tweet_id, score, counts[handle])
+        for handle, (tweet_id, score) in batch.score().items()
+    }
+
+
+def rank_entries(standings: Dict[str, Standing], wallets: Dict[str, str], top_n: int) -> Tuple[Dict[str, Any], ...]:
+    """close-once's ranked list: registered handles by score, top_n."""
+    ranked = sorted((st for st in standings.values() if st.handle in wallets), key=lambda st: (-st.score, st.handle))
+    return tuple(
+        {
+            "rank": rank,
+            "handle": st.handle,
+            "score": round(st.score, 4),
+            "tweet_id": st.tweet_id,
+            "tweet_count": st.tweet_count,
+            "wallet": wallets[st.handle],
+        }
+        for rank, st in enumerate(ranked[:top_n], start=1)
+    )
+
+
+def rank_changes(old: Sequence[Dict[str, Any]], new: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Handles whose rank moved, entered or left (rank None = not ranked)."""
+    old_ranks = {e["handle"]: e["rank"] for e in old}
+    new_ranks = {e["handle"]: e["rank"] for e in new}
+    return [
+        {"handle": handle, "from": old_ranks.get(handle), "to": new_ranks.get(handle)}
+        for handle in sorted(old_ranks.keys() | new_ranks.keys(), key=lambda h: (new_ranks.get(h) or 1_000_000, h))
+        if old_ranks.get(handle) != new_ranks.get(handle)
+    ]
+
+
+@dataclass
+class Leaderboard:
+    """
+    In-memory standings for the open window, owned by the 'shillbot run' daemon.
+    refresh() (daemon job thread) rescores only the handles an ingest touched,
+    or the whole window when it rolls over, and publishes an immutable snapshot
+    when the ranking changes. HTTP threads only read the snapshot / wait on it,
+    so dashboard traffic never reaches SQLite or the X API.
+    Exclusions and blacklist entries added mid-window apply to a handle on its
+    next rescore (or at the next window).
+    """
+
+    top_n: int
+    window_id: str = ""
+    start_epoch: int = 0
+    end_epoch: int = 0
+    standings: Dict[str, Standing] = field(default_factory=dict)
+    snapshot: LeaderboardSnapshot = field(default_factory=lambda: LeaderboardSnapshot(0, "", (), b"{}"))
+    _changed: threading.Condition = field(default_factory=threading.Condition, repr=False, compare=False)
+
+    def refresh(
+        self,
+        conn: sqlite3.Connection,
+        window_id: str,
+        start_epoch: int,
+        end_epoch: int,
+        handles: Optional[Sequence[str]] = None,
+    ) -> bool:
+        """
+        Rescore handles (None: every handle) in the given window; a new window
+        always reloads in full. True if a new snapshot was published.
+        """
+        if window_id != self.window_id:
+            self.window_id, self.start_epoch, self.end_epoch = window_id, start_epoch, end_epoch
+            self.standings = compute_standings(conn, start_epoch, end_epoch)
+        elif handles is None:
+            self.standings = compute_standings(conn, start_epoch, end_epoch)
+        elif handles:
+            rescored = compute_standings(conn, start_epoch, end_epoch, handles)
+            standings = dict(self.standings)
+            for handle in handles:
+                standings.pop(handle, None)
+            standings.update(rescored)
+            self.standings = standings
+
+        old = self.snapshot
+        entries = rank_entries(self.standings, get_registered_wallets(conn), self.top_n)
+        if entries == old.entries and window_id == old.window_id:
+            return False
+        version = old.version + 1
+        changes = rank_changes(old.entries if window_id == old.window_id else (), entries)
+        payload = json.dumps(
+            {
+                "window_id": window_id,
+                "version": version,
+                "updated_at_utc": utc_now_iso(),
+                "leaderboard": list(entries),
+                "changes": changes,
+            },
+            separators=(",", ":"),
+        ).encode("utf-8")
+        with self._changed:
+            self.snapshot = LeaderboardSnapshot(version, window_id, entries, payload)
+            self._changed.notify_all()
+        return True
+
+    def wait_for_change(self, seen_version: int, timeout_s: float) -> Optional[LeaderboardSnapshot]:
+        """The current snapshot once its version differs from seen_version; None after timeout_s."""
+        with self._changed:
+            if self._changed.wait_for(lambda: self.snapshot.version != seen_version, timeout=timeout_s):
+                return self.snapshot
+        return None
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Optional, Tuple
+
+
+# Token mint used when SHILLBOT_TOKEN_MINT is not configured
+DEFAULT_TOKEN_MINT = "6iWeEmh5G7u8ERXBPn2y3CgKttDoDm7GDCc1368Upump"
+
+# Match reasons, stored comma-separated in shills.match_reasons
+MENTION = "mention"  # @coin_handle
+CASHTAG = "cashtag"  # $shooter
+BOT_CASHTAG = "bot_cashtag"  # $shillbot
+MINT = "mint"  # token mint address
+
+
+@dataclass(frozen=True)
+class ShillMatcher:
+    """
+    Shill criteria and registration hashtag, compiled once per ingestor.
+    Each tweet is lowercased once and checked against precomputed lowercase
+    keywords (CPython's substring search beats one combined regex for a handful
+    of literals; see bench_matching.py).
+    """
+
+    coin_handle: str
+    token_mint: Optional[str]
+    register_hashtag: str
+
+    _keywords: Tuple[Tuple[str, str], ...] = field(init=False, repr=False, compare=False)
+    _registration_re: re.Pattern = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        keywords = (
+            (MENTION, f"@{self.coin_handle}".lower()),
+            (CASHTAG, "$shooter"),
+            (BOT_CASHTAG, "$shillbot"),
+            (MINT, (self.token_mint or DEFAULT_TOKEN_MINT).lower()),
+        )
+        object.__setattr__(self, "_keywords", keywords)
+        object.__setattr__(
+            self, "_registration_re", re.compile(rf"#{re.escape(self.register_hashtag)}\b", re.IGNORECASE)
+        )
+
+    def match_reasons(self, text: str) -> Tuple[str, ...]:
+        """Every shill criterion the text matches (case-insensitive substring), in criteria order."""
+        text_lower = text.lower()
+        return tuple([reason for reason, keyword in self._keywords if keyword in text_lower])
+
+    def is_shill(self, text: str) -> bool:
+        text_lower = text.lower()
+        for _, keyword in self._keywords:
+            if keyword in text_lower:
+                return True
+        return False
+
+    def has_registration_hashtag(self, text: str) -> bool:
+        return self._registration_re.search(text) is not None
@@ -1,7 +1,7 @@
 ﻿from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, Optional
 
 
 @dataclass(frozen=True)
@@ -20,6 +20,8 @@ class Tweet:
     is_retweet: bool = False
     is_quote: bool = False
     has_original_text: bool = False
+    match_reasons: str = ""  # comma-separated shill criteria matched at ingest (see matching.py)
+    created_at_epoch: int = 0  # Unix seconds of created_at_utc (0 = not known, parsed on demand)
 
 
 @dataclass(frozen=True)
@@ -37,3 +39,23 @@ class Payout:
     lamports: int
     status: str
     signature: Optional[str]
+
+
+@dataclass(frozen=True)
+class IngestCursor:
+    """
+    Persisted ingest state for one search query (an ingest_cursors row).
+    Every tweet up to since_id is stored. While until_id is set, a pull that stopped
+    early (page budget or failure) left the tweets between since_id and until_id
+    unread; newer ones up to pending_id are stored, and pending_id becomes since_id
+    once that gap is closed. since_id is None after a 24h window pull (no cursor yet).
+    """
+
+    since_id: Optional[str] = None
+    until_id: Optional[str] = None
+    pending_id: Optional[str] = None
+
+    def search_kwargs(self) -> Dict[str, str]:
+        """since_id / until_id search arguments (only those that are set)."""
+        kwargs = {"since_id": self.since_id, "until_id": self.until_id}
+        return {k: v for k, v in kwargs.items() if v}
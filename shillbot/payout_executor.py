@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Sequence, Tuple
+
+from shillbot.db import get_submitted_payouts, record_payout_transaction, set_payout_status
+from shillbot.solana_payer import NativeSolanaPayer
+from shillbot.solana_rpc import SolanaRPC, SolanaRPCError
+
+
+# payout_transactions.status values
+SUBMITTED = "SUBMITTED"
+CONFIRMED = "CONFIRMED"
+FAILED = "FAILED"
+EXPIRED = "EXPIRED"
+
+# Final statuses after which the transaction can no longer land, so the payout may be sent again
+RETRYABLE_STATUSES = (FAILED, EXPIRED)
+
+# Preflight rejections that don't prove the transaction won't land (already processed, or a
+# node behind on blockhashes): left SUBMITTED for track_confirmations to resolve, never FAILED
+UNRESOLVED_REJECTIONS = ("alreadyprocessed", "already been processed", "blockhashnotfound", "blockhash not found")
+
+# Confirmation polling: a blockhash is valid for ~150 blocks (~60-90s)
+POLL_INTERVAL_S = 2.0
+CONFIRM_TIMEOUT_S = 120.0
+
+
+def _now_utc() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def is_unresolved_rejection(error: str) -> bool:
+    """True if a sendTransaction rejection may still mean the transaction landed or can land."""
+    error = error.lower()
+    return any(marker in error for marker in UNRESOLVED_REJECTIONS)
+
+
+def submit_payouts(
+    conn: sqlite3.Connection,
+    window_id: str,
+    transfers: Sequence[Tuple[str, int]],
+    payer: NativeSolanaPayer,
+) -> Dict[str, int]:
+    """
+    Sign every pending (wallet, lamports) transfer up front, record each payout as
+    SUBMITTED with its transaction signature, then send all transactions without
+    waiting for confirmation (see track_confirmations).
+    Signatures are committed before anything is sent, so after a crash every
+    possibly-sent payout can be resolved from payout_transactions.
+    Returns counts: {"transactions", "submitted", "failed"}.
+    """
+    counts = {"transactions": 0, "submitted": 0, "failed": 0}
+    valid, rejected = payer.validate_transfers(transfers)
+    for result in rejected:
+        for wallet, lamports in result.transfers:
+            record_payout_transaction(conn, window_id, wallet, int(lamports), None, FAILED, _now_utc(), error=result.error)
+            print(f"ERROR: Payout to {wallet} rejected: {result.error}")
+            counts["failed"] += 1
+
+    prepared = payer.prepare_transactions(valid)
+    for tx in prepared:
+        for wallet, lamports in tx.transfers:
+            record_payout_transaction(
+                conn, window_id, wallet, lamports, tx.signature, SUBMITTED, _now_utc(),
+                last_valid_block_height=tx.last_valid_block_height,
+            )
+    conn.commit()
+
+    for tx in prepared:
+        counts["transactions"] += 1
+        try:
+            payer.rpc.send_transaction(tx.tx_bytes)
+            counts["submitted"] += len(tx.transfers)
+            print(f"Submitted {len(tx.transfers)} transfers - sig: {tx.signature}")
+        except SolanaRPCError as e:
+            if is_unresolved_rejection(str(e)):
+                # Stays SUBMITTED: confirms, or expires after last_valid_block_height
+                counts["submitted"] += len(tx.transfers)
+                print(f"WARNING: Transaction {tx.signature} rejected as {e}; tracking it until it confirms or expires")
+                conn.commit()
+                continue
+            # Rejected by the only node it was sent to (e.g. preflight failure): it will never land
+            set_payout_status(conn, tx.signature, FAILED, _now_utc(), error=str(e))
+            counts["failed"] += len(tx.transfers)
+            print(f"ERROR: Transaction {tx.signature} rejected: {e}")
+        except RuntimeError as e:
+            # Delivery unknown: stays SUBMITTED until it confirms or its blockhash expires
+            counts["submitted"] += len(tx.transfers)
+            print(f"WARNING: Transaction {tx.signature} may not have been delivered: {e}")
+        conn.commit()
+    return counts
+
+
+def track_confirmations(
+    conn: sqlite3.Connection,
+    window_id: str,
+    rpc: SolanaRPC,
+    poll_interval_s: float = POLL_INTERVAL_S,
+    timeout_s: float = CONFIRM_TIMEOUT_S,
+) -> Dict[str, str]:
+    """
+    Poll getSignatureStatuses (batched) for the window's SUBMITTED transactions and
+    record each transition as it is observed:
+    CONFIRMED (confirmed/finalized), FAILED (executed with an error) or EXPIRED
+    (unknown to the cluster after its blockhash's last valid block height).
+    Returns tx_signature -> status for every transaction seen (SUBMITTED if still
+    unresolved at timeout; a later run resumes from the recorded signatures).
+    """
+    final: Dict[str, str] = {}
+    deadline = time.monotonic() + timeout_s
+    while True:
+        pending = get_submitted_payouts(conn, window_id)
+        for sig in pending:
+            final[sig] = SUBMITTED
+        if not pending:
+            break
+
+        try:
+            # Height first: a transaction landing between the two reads then shows up as a
+            # status. The reads may hit different endpoints, so a None status only counts
+            # (toward EXPIRED) from a node at least as far ahead as the height reading.
+            block_height, height_slot = rpc.get_block_height_and_slot()
+            statuses, status_slot = rpc.get_signature_statuses(list(pending))
+            if status_slot < height_slot:
+                block_height = 0
+        except RuntimeError as e:
+            print(f"WARNING: Failed to poll signature statuses: {e}")
+            statuses, block_height = {}, 0
+
+        resolved: List[str] = []
+        for sig, last_valid_block_height in pending.items():
+            if sig not in statuses:
+                continue
+            status = statuses[sig]
+            error = None
+            if status is None:
+                if not block_height or block_height <= last_valid_block_height:
+                    continue
+                new_status = EXPIRED
+                error = f"not found by block height {block_height} (valid until {last_valid_block_height})"
+            elif status.get("err") is not None:
+                new_status = FAILED
+                error = str(status["err"])
+            elif status.get("confirmationStatus") in ("confirmed", "finalized"):
+                new_status = CONFIRMED
+            else:
+                continue
+            set_payout_status(conn, sig, new_status, _now_utc(), error=error)
+            final[sig] = new_status
+            resolved.append(sig)
+            print(f"{new_status}: {sig}" + (f" ({error})" if error else ""))
+        conn.commit()
+
+        if len(resolved) == len(pending):
+            break
+        if time.monotonic() >= deadline:
+            print(f"WARNING: {len(pending) - len(resolved)} transactions still unconfirmed, rerun to resume")
+            break
+        time.sleep(poll_interval_s)
+    return final
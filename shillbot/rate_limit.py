@@ -1,30 +1,30 @@
 from __future__ import annotations
 
-from collections import defaultdict
-from datetime import datetime, timezone
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 from shillbot.models import Tweet
+from shillbot.utils import parse_epoch
 
 
-def truncate_to_minute(iso_str: str) -> str:
-    """
-    Truncate ISO datetime string to minute precision.
-    Example: '2026-01-10T14:23:45.123456+00:00' -> '2026-01-10T14:23:00+00:00'
-    """
-    try:
-        dt = datetime.fromisoformat(iso_str.replace("Z", "+00:00"))
-        truncated = dt.replace(second=0, microsecond=0)
-        return truncated.isoformat()
-    except (ValueError, AttributeError):
-        # If parsing fails, return original (shouldn't happen with valid ISO strings)
-        return iso_str
+def tweet_epoch(tweet: Tweet) -> Optional[int]:
+    """Unix seconds of created_at (stored at ingest, else parsed once and cached)."""
+    return tweet.created_at_epoch or parse_epoch(tweet.created_at_utc)
+
+
+def _earlier(tweet: Tweet, epoch: Optional[int], current: Tweet, current_epoch: Optional[int]) -> bool:
+    # Integer compare; the ISO string only breaks ties within a second (sub-second
+    # precision) or stands in when unparsable. Equal: keep the first seen.
+    if epoch is not None and current_epoch is not None and epoch != current_epoch:
+        return epoch < current_epoch
+    return tweet.created_at_utc < current.created_at_utc
 
 
 def apply_rate_limit(tweets: List[Tweet]) -> List[Tweet]:
     """
     Apply rate limiting: only 1 shill per minute per user.
     For multiple tweets in the same minute, keep the first one chronologically.
+    Single pass: tweets are bucketed by (handle, epoch // 60), keeping the
+    earliest per bucket (no per-group sort).
     
     Args:
         tweets: List of tweets to filter
@@ -35,18 +35,43 @@ def apply_rate_limit(tweets: List[Tweet]) -> List[Tweet]:
     if not tweets:
         return []
 
-    # Group by (handle, minute_truncated(created_at_utc))
-    groups: dict[tuple[str, str], List[Tweet]] = defaultdict(list)
-
+    # (handle, minute bucket) -> (epoch, earliest tweet); unparsable times bucket by their raw string
+    best: Dict[Tuple[str, Union[int, str]], Tuple[Optional[int], Tweet]] = {}
     for tweet in tweets:
-        minute_key = truncate_to_minute(tweet.created_at_utc)
-        groups[(tweet.handle, minute_key)].append(tweet)
+        epoch = tweet_epoch(tweet)
+        key = (tweet.handle, epoch // 60 if epoch is not None else tweet.created_at_utc)
+        current = best.get(key)
+        if current is None or _earlier(tweet, epoch, current[1], current[0]):
+            best[key] = (epoch, tweet)
 
-    # For each group, sort chronologically and take first
-    filtered: List[Tweet] = []
-    for (handle, minute), group_tweets in groups.items():
-        # Sort by created_at_utc (ascending = oldest first)
-        sorted_group = sorted(group_tweets, key=lambda t: t.created_at_utc)
-        filtered.append(sorted_group[0])
+    return [tweet for _, tweet in best.values()]
 
-    return filtered
+
+def rate_limit_stream(tweets: Iterable[Tweet]) -> Iterator[Tweet]:
+    """
+    Streaming apply_rate_limit for newest-first input (X search result order):
+    same result, but only the tweets of the minute currently being read are held.
+    Once a tweet from an older minute arrives, every buffered minute is final
+    (its earliest tweet per handle has been seen) and is emitted.
+    A tweet arriving out of order (newer than the buffered minutes) is buffered
+    too; it is only compared against tweets still in the buffer.
+    A tweet with an unparsable timestamp can't be bucketed and passes through.
+    """
+    pending: Dict[Tuple[str, int], Tuple[int, Tweet]] = {}
+    oldest_minute: Optional[int] = None
+    for tweet in tweets:
+        epoch = tweet_epoch(tweet)
+        if epoch is None:
+            yield tweet
+            continue
+        minute = epoch // 60
+        if oldest_minute is not None and minute < oldest_minute:
+            yield from (t for _, t in pending.values())
+            pending.clear()
+        if not pending or minute < oldest_minute:
+            oldest_minute = minute
+        key = (tweet.handle, minute)
+        current = pending.get(key)
+        if current is None or _earlier(tweet, epoch, current[1], current[0]):
+            pending[key] = (epoch, tweet)
+    yield from (t for _, t in pending.values())
@@ -1,8 +1,10 @@
 ﻿from __future__ import annotations
 
 import csv
+import gzip
 import json
 import os
+import tempfile
 from dataclasses import asdict
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Tuple
@@ -18,19 +20,102 @@ def ensure_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
 
-def write_report(public_dir: str, window_id: str, report: Dict[str, Any]) -> str:
-    ensure_dir(public_dir)
-    ensure_dir(os.path.join(public_dir, "history"))
+# Compact per-window summaries for the public site, oldest first
+HISTORY_INDEX = "index.json"
 
-    latest_path = os.path.join(public_dir, "latest.json")
-    hist_path = os.path.join(public_dir, "history", f"{window_id}.json")
 
-    payload = json.dumps(report, indent=2, sort_keys=True)
-    with open(latest_path, "w", encoding="utf-8") as f:
-        f.write(payload)
-    with open(hist_path, "w", encoding="utf-8") as f:
-        f.write(payload)
+def write_atomic(path: str, data: bytes) -> None:
+    """
+    Replace path with data in one step (temp file in the same dir + fsync + rename),
+    so a concurrent reader sees the old file or the new one, never a partial write.
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates 0600; published files must be world-readable like open(..., "w") gave
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def history_entry(report: Dict[str, Any]) -> Dict[str, Any]:
+    """One window's line in history/index.json."""
+    winners = report.get("winners") or []
+    return {
+        "window_id": report["window_id"],
+        "generated_at_utc": report.get("generated_at_utc"),
+        "fees_in_sol": report.get("fees_in_sol"),
+        "winners": len(winners),
+        "top_handle": winners[0]["handle"] if winners else None,
+        "path": f"history/{report['window_id']}.json",
+    }
+
 
+def load_history_index(history_dir: str) -> List[Dict[str, Any]]:
+    """
+    Entries from history/index.json; rebuilt from the history files (once) if the
+    index is missing or unreadable.
+    """
+    try:
+        with open(os.path.join(history_dir, HISTORY_INDEX), "r", encoding="utf-8") as f:
+            return list(json.load(f)["windows"])
+    except (FileNotFoundError, ValueError, KeyError, TypeError):
+        pass
+    entries: List[Dict[str, Any]] = []
+    for name in sorted(os.listdir(history_dir)):
+        if not name.endswith(".json") or name == HISTORY_INDEX:
+            continue
+        try:
+            with open(os.path.join(history_dir, name), "r", encoding="utf-8") as f:
+                entries.append(history_entry(json.load(f)))
+        except (ValueError, KeyError, OSError) as e:
+            print(f"WARNING: skipping {name} in history index: {e}")
+    return entries
+
+
+def _minified(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(",", ":"), sort_keys=True).encode("utf-8")
+
+
+def write_report(public_dir: str, window_id: str, report: Dict[str, Any], gzip_artifacts: bool = False) -> str:
+    """
+    Publish a window report: history/{window_id}.json, its history/index.json entry
+    (added, or replaced on a re-close), then latest.json, each written atomically.
+    With gzip_artifacts, also minified+gzipped history/{window_id}.json.gz and
+    history/index.json.gz for static hosting.
+    """
+    history_dir = os.path.join(public_dir, "history")
+    ensure_dir(public_dir)
+    ensure_dir(history_dir)
+
+    latest_path = os.path.join(public_dir, "latest.json")
+    hist_path = os.path.join(history_dir, f"{window_id}.json")
+
+    payload = json.dumps(report, indent=2, sort_keys=True).encode("utf-8")
+    write_atomic(hist_path, payload)
+    if gzip_artifacts:
+        write_atomic(f"{hist_path}.gz", gzip.compress(_minified(report), mtime=0))
+
+    entries = [e for e in load_history_index(history_dir) if e.get("window_id") != window_id]
+    entries.append(history_entry(report))
+    entries.sort(key=lambda e: e["window_id"])
+    index = {"windows": entries}
+    index_path = os.path.join(history_dir, HISTORY_INDEX)
+    write_atomic(index_path, _minified(index))
+    if gzip_artifacts:
+        write_atomic(f"{index_path}.gz", gzip.compress(_minified(index), mtime=0))
+
+    # Last, so latest.json never points at a window that isn't in history yet
+    write_atomic(latest_path, payload)
     return latest_path
 
 
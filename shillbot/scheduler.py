@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+import traceback
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Sequence
+from zoneinfo import ZoneInfo
+
+# Longest single sleep: wall-clock targets are re-checked at least this often,
+# so a suspended host or a clock adjustment can't make a job fire far off schedule
+MAX_SLEEP_S = 60.0
+
+
+def every(interval_s: float) -> Callable[[datetime], datetime]:
+    """Schedule: fixed interval after the previous fire (first fire immediately)."""
+    state: Dict[str, datetime] = {}
+
+    def next_run(now: datetime) -> datetime:
+        last = state.get("last")
+        target = now if last is None else max(now, last + timedelta(seconds=interval_s))
+        state["last"] = target
+        return target
+
+    return next_run
+
+
+def daily_at(times: Sequence[str], tz_name: str) -> Callable[[datetime], datetime]:
+    """Schedule: the next HH:MM in times (local to tz_name) strictly after now."""
+    tz = ZoneInfo(tz_name)
+    hhmm = [(int(t[0:2]), int(t[3:5])) for t in times]
+
+    def next_run(now: datetime) -> datetime:
+        now_local = now.astimezone(tz)
+        candidates: List[datetime] = []
+        for days in (0, 1):
+            day = now_local + timedelta(days=days)
+            for hh, mm in hhmm:
+                candidates.append(day.replace(hour=hh, minute=mm, second=0, microsecond=0))
+        return min(c for c in candidates if c > now_local)
+
+    return next_run
+
+
+@dataclass(frozen=True)
+class ScheduledJob:
+    name: str
+    func: Callable[[], None]  # blocking; runs in a worker thread
+    next_run: Callable[[datetime], datetime]  # aware now -> aware fire time
+
+
+@dataclass(frozen=True)
+class Scheduler:
+    """
+    Run blocking jobs on their schedules from one event loop, in one long-lived
+    process, so connection pools and caches stay warm between runs.
+    Overlap protection: a job that is still running when it fires again is
+    skipped, and jobs never run concurrently with each other (they share the
+    SQLite database), so a close waits for an in-flight ingest to finish.
+    Create one instance per event loop.
+    """
+
+    jobs: Sequence[ScheduledJob]
+
+    _running: Dict[str, bool] = field(init=False, repr=False, compare=False)
+    _exclusive: asyncio.Lock = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_running", {job.name: False for job in self.jobs})
+        object.__setattr__(self, "_exclusive", asyncio.Lock())
+
+    async def run_job(self, job: ScheduledJob) -> bool:
+        """Run job once now (after any other job finishes). False if skipped as overlapping."""
+        if self._running[job.name]:
+            print(f"SKIP: {job.name} still running, not starting another run")
+            return False
+        self._running[job.name] = True
+        try:
+            async with self._exclusive:
+                started = datetime.now().astimezone()
+                print(f"[{started.isoformat(timespec='seconds')}] {job.name}: start")
+                try:
+                    await asyncio.to_thread(job.func)
+                except (Exception, SystemExit) as e:
+                    # A failed run must not stop the daemon; the next fire retries
+                    traceback.print_exc()
+                    print(f"ERROR: {job.name} failed: {e}")
+                elapsed = (datetime.now().astimezone() - started).total_seconds()
+                print(f"{job.name}: done in {elapsed:.1f}s")
+        finally:
+            self._running[job.name] = False
+        return True
+
+    async def _sleep_until(self, target: datetime) -> None:
+        while True:
+            remaining = (target - datetime.now(target.tzinfo)).total_seconds()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(min(remaining, MAX_SLEEP_S))
+
+    async def _job_loop(self, job: ScheduledJob) -> None:
+        tasks: set[asyncio.Task] = set()
+        while True:
+            target = job.next_run(datetime.now().astimezone())
+            print(f"{job.name}: next run at {target.isoformat(timespec='seconds')}")
+            await self._sleep_until(target)
+            # Don't await: a long run must not push back the job's next fire time
+            task = asyncio.create_task(self.run_job(job))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+    async def run(self) -> None:
+        """Run every job on its schedule until cancelled."""
+        await asyncio.gather(*(self._job_loop(job) for job in self.jobs))
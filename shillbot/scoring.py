@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import math
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from shillbot.models import Tweet
+
+
+# Engagement weights (likes/reposts/quotes/replies/views)
+LIKE_WEIGHT = 1.0
+RETWEET_WEIGHT = 2.0
+QUOTE_WEIGHT = 3.0
+REPLY_WEIGHT = 1.5
+VIEW_WEIGHT = 0.01
+
+# Media bonus: image/gif/video boosts the tweet score
+MEDIA_BONUS = 1.25
+
+# Originality: pure retweets/quotes with no added text are heavily penalized
+UNORIGINAL_FACTOR = 0.1
+
+
+def volume_dampening(tweet_count: int) -> float:
+    """
+    Dampening factor for a handle that posted tweet_count shills in the batch.
+    1 tweet -> 1.0, grows slowly smaller as volume increases.
+    """
+    return 1.0 / (1.0 + math.log(max(tweet_count, 1)))
+
+
+def score_tweet(tweet: Tweet, tweet_count: int = 1) -> float:
+    """
+    Score a single tweet (scalar reference for score_columns).
+    tweet_count is the number of tweets the same handle has in the batch.
+    """
+    engagement = (
+        LIKE_WEIGHT * tweet.like_count
+        + RETWEET_WEIGHT * tweet.retweet_count
+        + QUOTE_WEIGHT * tweet.quote_count
+        + REPLY_WEIGHT * tweet.reply_count
+        + VIEW_WEIGHT * tweet.view_count
+    )
+    score = 1.0 + engagement
+    if tweet.has_media:
+        score *= MEDIA_BONUS
+    if (tweet.is_retweet or tweet.is_quote) and not tweet.has_original_text:
+        score *= UNORIGINAL_FACTOR
+    return score * volume_dampening(tweet_count)
+
+
+def encode_handles(handles: Iterable[str]) -> Tuple[List[str], np.ndarray]:
+    """
+    Map handles to dense integer codes (first-seen order).
+    Returns (unique_handles, codes) where unique_handles[codes[i]] is the i-th handle.
+    """
+    index: Dict[str, int] = {}
+    codes = np.fromiter((index.setdefault(h, len(index)) for h in handles), dtype=np.int64)
+    return list(index), codes
+
+
+def tweets_to_columns(tweets: Sequence[Tweet]) -> Dict[str, np.ndarray]:
+    """
+    Load the scoring columns of a tweet list into NumPy arrays.
+    Returns a dict of equal-length arrays keyed by column name.
+    """
+    n = len(tweets)
+    return {
+        "like_count": np.fromiter((t.like_count for t in tweets), dtype=np.int64, count=n),
+        "retweet_count": np.fromiter((t.retweet_count for t in tweets), dtype=np.int64, count=n),
+        "quote_count": np.fromiter((t.quote_count for t in tweets), dtype=np.int64, count=n),
+        "reply_count": np.fromiter((t.reply_count for t in tweets), dtype=np.int64, count=n),
+        "view_count": np.fromiter((t.view_count for t in tweets), dtype=np.int64, count=n),
+        "has_media": np.fromiter((t.has_media for t in tweets), dtype=np.bool_, count=n),
+        "is_retweet": np.fromiter((t.is_retweet for t in tweets), dtype=np.bool_, count=n),
+        "is_quote": np.fromiter((t.is_quote for t in tweets), dtype=np.bool_, count=n),
+        "has_original_text": np.fromiter((t.has_original_text for t in tweets), dtype=np.bool_, count=n),
+    }
+
+
+def score_columns(columns: Dict[str, np.ndarray], handle_codes: np.ndarray) -> np.ndarray:
+    """
+    Score every tweet in one batched pass.
+    handle_codes maps each tweet to a dense integer handle id (0..n_handles-1),
+    used for per-handle volume dampening.
+    """
+    engagement = (
+        LIKE_WEIGHT * columns["like_count"]
+        + RETWEET_WEIGHT * columns["retweet_count"]
+        + QUOTE_WEIGHT * columns["quote_count"]
+        + REPLY_WEIGHT * columns["reply_count"]
+        + VIEW_WEIGHT * columns["view_count"]
+    )
+    scores = 1.0 + engagement.astype(np.float64)
+    scores *= np.where(columns["has_media"], MEDIA_BONUS, 1.0)
+
+    unoriginal = (columns["is_retweet"] | columns["is_quote"]) & ~columns["has_original_text"]
+    scores *= np.where(unoriginal, UNORIGINAL_FACTOR, 1.0)
+
+    counts = np.bincount(handle_codes)
+    dampening = 1.0 / (1.0 + np.log(np.maximum(counts, 1)))
+    scores *= dampening[handle_codes]
+    return scores
+
+
+def best_per_handle(handle_codes: np.ndarray, scores: np.ndarray) -> np.ndarray:
+    """
+    Grouped argmax: index of the best-scoring tweet for each handle code.
+    Ties keep the earliest tweet in input order. Result is indexed by handle code.
+    """
+    if len(scores) == 0:
+        return np.empty(0, dtype=np.int64)
+    positions = np.arange(len(scores))
+    # Sort by handle, then score descending, then input position
+    order = np.lexsort((positions, -scores, handle_codes))
+    sorted_codes = handle_codes[order]
+    first = np.ones(len(order), dtype=np.bool_)
+    first[1:] = sorted_codes[1:] != sorted_codes[:-1]
+    return order[first]
+
+
+def score_tweets(tweets: Sequence[Tweet]) -> Dict[str, Tuple[str, float]]:
+    """
+    Score tweets and keep the best tweet per handle.
+    Returns dict mapping handle -> (tweet_id, score).
+    """
+    if not tweets:
+        return {}
+
+    handles, handle_codes = encode_handles(t.handle for t in tweets)
+    scores = score_columns(tweets_to_columns(tweets), handle_codes)
+    best_idx = best_per_handle(handle_codes, scores)
+
+    best: Dict[str, Tuple[str, float]] = {}
+    for code, idx in enumerate(best_idx.tolist()):
+        best[handles[code]] = (tweets[idx].tweet_id, float(scores[idx]))
+    return best
+
@@ -1,8 +1,26 @@
 from __future__ import annotations
 
+import json
+import struct
 import subprocess
-from dataclasses import dataclass
-from typing import Optional, Tuple
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Sequence, Tuple
+
+from shillbot.solana_rpc import SolanaRPC
+
+try:
+    import base58
+    from nacl.signing import SigningKey
+except ImportError:  # Optional: only needed by NativeSolanaPayer
+    base58 = None
+    SigningKey = None
+
+
+# Max serialized transaction size (IPv6 min MTU minus headers)
+PACKET_DATA_SIZE = 1232
+SYSTEM_PROGRAM_ID = "11111111111111111111111111111111"
+# SystemInstruction::Transfer discriminant
+_SYSTEM_TRANSFER = 2
 
 
 @dataclass(frozen=True)
@@ -54,3 +72,179 @@ class SolanaCLIPayer:
             return ("SENT", tx_signature)
         else:
             return ("FAILED", None)
+
+
+def _compact_u16(n: int) -> bytes:
+    """Solana short-vec length prefix."""
+    out = bytearray()
+    while True:
+        byte = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _decode_pubkey(pubkey: str) -> bytes:
+    try:
+        raw = base58.b58decode(pubkey)
+    except ValueError as e:
+        raise ValueError(f"Invalid Solana address {pubkey!r}: {e}") from e
+    if len(raw) != 32:
+        raise ValueError(f"Invalid Solana address {pubkey!r}: {len(raw)} bytes, expected 32")
+    return raw
+
+
+def transfer_tx_size(n_recipients: int) -> int:
+    """Serialized size of a one-signer transaction with n_recipients transfers to distinct wallets."""
+    n_keys = n_recipients + 2  # payer + recipients + system program
+    instruction_size = 1 + len(_compact_u16(2)) + 2 + len(_compact_u16(12)) + 12
+    return (
+        len(_compact_u16(1)) + 64  # signatures
+        + 3  # message header
+        + len(_compact_u16(n_keys)) + 32 * n_keys
+        + 32  # recent blockhash
+        + len(_compact_u16(n_recipients)) + n_recipients * instruction_size
+    )
+
+
+@dataclass(frozen=True)
+class BatchTransferResult:
+    transfers: Tuple[Tuple[str, int], ...]  # (wallet, lamports) in this transaction
+    status: str  # "FAILED" (rejected before signing, see validate_transfers)
+    signature: Optional[str]
+    error: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class PreparedTransaction:
+    transfers: Tuple[Tuple[str, int], ...]  # (wallet, lamports) in this transaction
+    signature: str  # base58, also the transaction id
+    tx_bytes: bytes  # signed wire format
+    last_valid_block_height: int  # the blockhash expires after this height
+
+
+@dataclass(frozen=True)
+class NativeSolanaPayer:
+    """
+    Execute SOL transfers natively: several SystemProgram.transfer instructions per
+    transaction (packed up to the packet size limit), signed in-process with the
+    treasury keypair. Sending and confirmation tracking live in payout_executor
+    (submit_payouts / track_confirmations), which records each signature first.
+    Works against any RPC URL (mainnet, a local test validator, or a mock server).
+    """
+
+    keypair_path: str
+    rpc: SolanaRPC
+
+    _signing_key: Any = field(init=False, repr=False, compare=False)
+    _payer: bytes = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if SigningKey is None or base58 is None:
+            raise RuntimeError("NativeSolanaPayer requires PyNaCl and base58 (pip install -r requirements.txt)")
+        # Solana CLI keypair file: JSON array of 64 bytes (32-byte seed + 32-byte public key)
+        with open(self.keypair_path, "r", encoding="utf-8") as f:
+            secret = bytes(json.load(f))
+        if len(secret) != 64:
+            raise RuntimeError(f"Invalid keypair file {self.keypair_path}: expected 64 bytes, got {len(secret)}")
+        signing_key = SigningKey(secret[:32])
+        payer = bytes(signing_key.verify_key)
+        if payer != secret[32:]:
+            raise RuntimeError(f"Invalid keypair file {self.keypair_path}: public key does not match secret key")
+        object.__setattr__(self, "_signing_key", signing_key)
+        object.__setattr__(self, "_payer", payer)
+
+    @property
+    def pubkey(self) -> str:
+        return base58.b58encode(self._payer).decode("ascii")
+
+    def pack_transfers(self, transfers: Sequence[Tuple[str, int]]) -> List[List[Tuple[str, int]]]:
+        """Split (wallet, lamports) transfers into as few transactions as fit PACKET_DATA_SIZE."""
+        batches: List[List[Tuple[str, int]]] = []
+        current: List[Tuple[str, int]] = []
+        for transfer in transfers:
+            if current and transfer_tx_size(len(current) + 1) > PACKET_DATA_SIZE:
+                batches.append(current)
+                current = []
+            current.append(transfer)
+        if current:
+            batches.append(current)
+        return batches
+
+    def _message(self, transfers: Sequence[Tuple[str, int]], recent_blockhash: bytes) -> bytes:
+        # Account order: writable signer (payer), writable recipients, read-only system program
+        keys: List[bytes] = [self._payer]
+        index = {self._payer: 0}
+        instructions: List[Tuple[int, int]] = []
+        for wallet, lamports in transfers:
+            if int(lamports) <= 0:
+                raise ValueError(f"Transfer amount must be positive, got {lamports} for {wallet}")
+            recipient = _decode_pubkey(wallet)
+            if recipient not in index:
+                index[recipient] = len(keys)
+                keys.append(recipient)
+            instructions.append((index[recipient], int(lamports)))
+        system_index = len(keys)
+        keys.append(_decode_pubkey(SYSTEM_PROGRAM_ID))
+
+        out = bytearray([1, 0, 1])  # 1 signer, 0 read-only signed, 1 read-only unsigned
+        out += _compact_u16(len(keys))
+        for key in keys:
+            out += key
+        out += recent_blockhash
+        out += _compact_u16(len(instructions))
+        for recipient_index, lamports in instructions:
+            data = struct.pack("<IQ", _SYSTEM_TRANSFER, lamports)
+            out.append(system_index)
+            out += _compact_u16(2) + bytes([0, recipient_index])
+            out += _compact_u16(len(data)) + data
+        return bytes(out)
+
+    def build_transaction(self, transfers: Sequence[Tuple[str, int]], recent_blockhash: str) -> bytes:
+        """Signed wire-format transaction paying every (wallet, lamports) in transfers."""
+        message = self._message(transfers, _decode_pubkey(recent_blockhash))
+        signature = self._signing_key.sign(message).signature
+        tx = _compact_u16(1) + signature + message
+        if len(tx) > PACKET_DATA_SIZE:
+            raise ValueError(f"Transaction too large ({len(tx)} > {PACKET_DATA_SIZE} bytes), use pack_transfers")
+        return tx
+
+    def validate_transfers(
+        self, transfers: Sequence[Tuple[str, int]]
+    ) -> Tuple[List[Tuple[str, int]], List[BatchTransferResult]]:
+        """
+        Split transfers into (valid, rejected). A bad address or amount is rejected
+        on its own so it can't sink the other transfers packed into its transaction.
+        """
+        valid: List[Tuple[str, int]] = []
+        rejected: List[BatchTransferResult] = []
+        for wallet, lamports in transfers:
+            try:
+                _decode_pubkey(wallet)
+                if int(lamports) <= 0:
+                    raise ValueError(f"Transfer amount must be positive, got {lamports} for {wallet}")
+            except ValueError as e:
+                rejected.append(BatchTransferResult(((wallet, lamports),), "FAILED", None, str(e)))
+                continue
+            valid.append((wallet, int(lamports)))
+        return valid, rejected
+
+    def prepare_transactions(self, transfers: Sequence[Tuple[str, int]]) -> List[PreparedTransaction]:
+        """
+        Pack and sign (valid) transfers against one recent blockhash, without sending.
+        The signature is known before submission, so callers can record it first.
+        """
+        batches = self.pack_transfers(transfers)
+        if not batches:
+            return []
+        blockhash, last_valid_block_height = self.rpc.get_latest_blockhash()
+        prepared: List[PreparedTransaction] = []
+        for batch in batches:
+            tx = self.build_transaction(batch, blockhash)
+            # Wire format: short-vec signature count (1 byte here), then the payer signature
+            signature = base58.b58encode(tx[1:65]).decode("ascii")
+            prepared.append(PreparedTransaction(tuple(batch), signature, tx, last_valid_block_height))
+        return prepared
@@ -1,15 +1,152 @@
 ﻿from __future__ import annotations
 
-import json
-import urllib.request
+import base64
+import itertools
+import threading
+import time
 from dataclasses import dataclass
-from typing import Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Requests per JSON-RPC batch (public RPC providers commonly cap batches at 100)
+RPC_BATCH_SIZE = 100
+
+# Max signatures per getSignatureStatuses call
+SIGNATURE_STATUS_BATCH = 256
+
+# Added to an endpoint's latency estimate when a request to it fails
+FAILURE_PENALTY_S = 10.0
+# Weight of the newest sample in the per-endpoint latency average
+LATENCY_EWMA_ALPHA = 0.3
+
+
+class SolanaRPCError(RuntimeError):
+    """The node answered with a JSON-RPC error (the request was received and rejected)."""
+
+
+class RPCTransport:
+    """
+    Pooled keep-alive JSON-RPC transport, shared by every SolanaRPC in the process
+    (see get_transport).
+    Requests go to the endpoint with the lowest measured latency (moving average,
+    endpoints are probed with getHealth on first use) and fail over to the next
+    one on connection errors, 429 or 5xx. Request IDs come from one
+    process-wide sequence. gzip-compressed responses are requested and decoded
+    unless gzip=False.
+    """
+
+    def __init__(self, urls: Sequence[str], pool_size: int = 4, gzip: bool = True):
+        if not urls:
+            raise ValueError("RPCTransport needs at least one endpoint URL")
+        self.urls: Tuple[str, ...] = tuple(dict.fromkeys(urls))
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(self.urls), pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({
+            "Content-Type": "application/json",
+            "Accept-Encoding": "gzip" if gzip else "identity",
+        })
+        self._session = session
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._latency_s: Dict[str, float] = {}
+        self._probed = len(self.urls) == 1
+
+    def close(self) -> None:
+        self._session.close()
+
+    def next_ids(self, n: int = 1) -> List[int]:
+        """Reserve n consecutive JSON-RPC request IDs."""
+        with self._lock:
+            return [next(self._ids) for _ in range(n)]
+
+    def latencies(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._latency_s)
+
+    def _record(self, url: str, elapsed_s: float) -> None:
+        with self._lock:
+            prev = self._latency_s.get(url)
+            self._latency_s[url] = (
+                elapsed_s if prev is None else LATENCY_EWMA_ALPHA * elapsed_s + (1 - LATENCY_EWMA_ALPHA) * prev
+            )
+
+    def _penalize(self, url: str) -> None:
+        with self._lock:
+            self._latency_s[url] = self._latency_s.get(url, 0.0) + FAILURE_PENALTY_S
+
+    def probe(self, timeout_s: float = 5.0) -> Dict[str, float]:
+        """Measure every endpoint with a getHealth call. Returns url -> latency estimate."""
+        for url in self.urls:
+            try:
+                self._send(url, {"jsonrpc": "2.0", "id": self.next_ids()[0], "method": "getHealth"}, timeout_s)
+            except RuntimeError:
+                pass  # Already penalized
+        self._probed = True
+        return self.latencies()
+
+    def ranked_urls(self) -> List[str]:
+        """Endpoints by latency estimate (configured order breaks ties and ranks unmeasured ones)."""
+        latencies = self.latencies()
+        order = {url: i for i, url in enumerate(self.urls)}
+        return sorted(self.urls, key=lambda u: (latencies.get(u, 0.0), order[u]))
+
+    def _send(self, url: str, payload: Any, timeout_s: float) -> Any:
+        started = time.perf_counter()
+        try:
+            resp = self._session.post(url, json=payload, timeout=timeout_s)
+        except requests.exceptions.RequestException as e:
+            self._penalize(url)
+            raise RuntimeError(f"Solana RPC request failed ({url}): {e}") from e
+        if resp.status_code == 429 or resp.status_code >= 500:
+            self._penalize(url)
+            raise RuntimeError(f"Solana RPC request failed ({url}): HTTP {resp.status_code}")
+        try:
+            data = resp.json()
+        except ValueError as e:
+            self._penalize(url)
+            raise RuntimeError(f"Solana RPC invalid JSON response ({url}): {e}") from e
+        # 4xx with a JSON body is a JSON-RPC error object: hand it to the caller
+        self._record(url, time.perf_counter() - started)
+        return data
+
+    def post(self, payload: Any, timeout_s: float, failover: bool = True) -> Any:
+        """
+        Send one JSON-RPC request or batch array, failing over across endpoints
+        (failover=False: fastest endpoint only, for requests that aren't safe to repeat).
+        """
+        if not self._probed:
+            self.probe(timeout_s=min(timeout_s, 5.0))
+        urls = self.ranked_urls()
+        errors: List[str] = []
+        for url in urls if failover else urls[:1]:
+            try:
+                return self._send(url, payload, timeout_s)
+            except RuntimeError as e:
+                errors.append(str(e))
+        raise RuntimeError("; ".join(errors))
+
+
+@lru_cache(maxsize=None)
+def get_transport(urls: Tuple[str, ...]) -> RPCTransport:
+    """Process-wide transport per endpoint set, so connections and latency stats are reused."""
+    return RPCTransport(urls)
 
 
 @dataclass(frozen=True)
 class SolanaRPC:
     url: str
     timeout_s: int = 20
+    # Extra endpoints; requests go to the fastest healthy one
+    fallback_urls: Tuple[str, ...] = ()
+
+    @property
+    def transport(self) -> RPCTransport:
+        return get_transport((self.url, *self.fallback_urls))
 
     def get_balance_lamports(self, pubkey: str) -> int:
         """
@@ -18,42 +155,92 @@ class SolanaRPC:
         """
         payload = {
             "jsonrpc": "2.0",
-            "id": 1,
+            "id": self.transport.next_ids()[0],
             "method": "getBalance",
             "params": [pubkey],
         }
-        data = json.dumps(payload).encode("utf-8")
-        req = urllib.request.Request(
-            self.url,
-            data=data,
-            headers={"Content-Type": "application/json"},
-        )
-        try:
-            with urllib.request.urlopen(req, timeout=self.timeout_s) as resp:
-                result = json.loads(resp.read().decode("utf-8"))
-                if "error" in result:
-                    raise RuntimeError(f"Solana RPC error: {result['error']}")
-                if "result" not in result:
-                    raise RuntimeError(f"Solana RPC missing result: {result}")
-                balance = result["result"].get("value")
-                if balance is None:
-                    raise RuntimeError(f"Solana RPC missing balance value: {result['result']}")
-                return int(balance)
-        except urllib.error.URLError as e:
-            raise RuntimeError(f"Solana RPC request failed: {e}") from e
-        except json.JSONDecodeError as e:
-            raise RuntimeError(f"Solana RPC invalid JSON response: {e}") from e
+        result = self._post(payload)
+        if "error" in result:
+            raise RuntimeError(f"Solana RPC error: {result['error']}")
+        if "result" not in result:
+            raise RuntimeError(f"Solana RPC missing result: {result}")
+        balance = result["result"].get("value")
+        if balance is None:
+            raise RuntimeError(f"Solana RPC missing balance value: {result['result']}")
+        return int(balance)
 
-    def get_token_balance(self, wallet_pubkey: str, token_mint: str) -> int:
+    def _post(self, payload: Any, failover: bool = True) -> Any:
+        """POST a JSON-RPC request (object or batch array) over the shared transport."""
+        response = self.transport.post(payload, self.timeout_s, failover=failover)
+        if isinstance(payload, dict) and isinstance(response, dict) and response.get("id") not in (payload["id"], None):
+            raise RuntimeError(f"Solana RPC response id {response.get('id')} != request id {payload['id']}")
+        return response
+
+    def _call(self, method: str, params: Optional[List[Any]] = None, failover: bool = True) -> Any:
+        """Single JSON-RPC call. Returns the result field, raises RuntimeError on an RPC error."""
+        payload: Dict[str, Any] = {"jsonrpc": "2.0", "id": self.transport.next_ids()[0], "method": method}
+        if params is not None:
+            payload["params"] = params
+        result = self._post(payload, failover=failover)
+        if "error" in result:
+            raise SolanaRPCError(f"Solana RPC error: {result['error']}")
+        if "result" not in result:
+            raise RuntimeError(f"Solana RPC missing result: {result}")
+        return result["result"]
+
+    def get_latest_blockhash(self, commitment: str = "confirmed") -> Tuple[str, int]:
+        """Returns (blockhash, last_valid_block_height) for signing new transactions."""
+        value = self._call("getLatestBlockhash", [{"commitment": commitment}])["value"]
+        return value["blockhash"], int(value["lastValidBlockHeight"])
+
+    def get_block_height_and_slot(self, commitment: str = "confirmed") -> Tuple[int, int]:
+        """Returns (block_height, slot) read together from one node (getEpochInfo)."""
+        info = self._call("getEpochInfo", [{"commitment": commitment}])
+        return int(info["blockHeight"]), int(info["absoluteSlot"])
+
+    def get_signature_statuses(
+        self, signatures: Sequence[str]
+    ) -> Tuple[Dict[str, Optional[Dict[str, Any]]], int]:
         """
-        Get SPL token balance for a wallet and token mint.
-        Returns token balance in token's native units (not lamports).
-        Returns 0 if wallet doesn't hold the token.
-        Raises RuntimeError if RPC call fails.
+        Status per transaction signature (None if the node has not seen it), in
+        batches of SIGNATURE_STATUS_BATCH, and the lowest context slot the answering
+        nodes reported: a None status only means "not landed" up to that slot.
+        A status has "err" (None on success) and "confirmationStatus"
+        ("processed", "confirmed" or "finalized").
         """
-        payload = {
+        statuses: Dict[str, Optional[Dict[str, Any]]] = {}
+        context_slot: Optional[int] = None
+        sigs = list(dict.fromkeys(signatures))
+        for start in range(0, len(sigs), SIGNATURE_STATUS_BATCH):
+            chunk = sigs[start:start + SIGNATURE_STATUS_BATCH]
+            result = self._call("getSignatureStatuses", [chunk, {"searchTransactionHistory": True}])
+            statuses.update(zip(chunk, result["value"]))
+            slot = int(result.get("context", {}).get("slot", 0))
+            context_slot = slot if context_slot is None else min(context_slot, slot)
+        return statuses, context_slot or 0
+
+    def send_transaction(self, tx_bytes: bytes, skip_preflight: bool = False) -> str:
+        """
+        Submit a signed wire-format transaction. Returns its signature (base58).
+        Raises SolanaRPCError if the node rejected it (e.g. failed preflight),
+        RuntimeError if delivery is unknown (transport failure).
+        Never fails over: a node that timed out may still have forwarded the
+        transaction, and a second node's rejection would then be misleading.
+        """
+        return self._call(
+            "sendTransaction",
+            [
+                base64.b64encode(tx_bytes).decode("ascii"),
+                {"encoding": "base64", "skipPreflight": skip_preflight, "preflightCommitment": "confirmed"},
+            ],
+            failover=False,
+        )
+
+    @staticmethod
+    def _token_accounts_request(request_id: int, wallet_pubkey: str, token_mint: str) -> Dict[str, Any]:
+        return {
             "jsonrpc": "2.0",
-            "id": 1,
+            "id": request_id,
             "method": "getTokenAccountsByOwner",
             "params": [
                 wallet_pubkey,
@@ -61,36 +248,85 @@ class SolanaRPC:
                 {"encoding": "jsonParsed"}
             ],
         }
-        data = json.dumps(payload).encode("utf-8")
-        req = urllib.request.Request(
-            self.url,
-            data=data,
-            headers={"Content-Type": "application/json"},
-        )
+
+    @staticmethod
+    def _token_amount(result: Dict[str, Any]) -> int:
+        """Token balance from one getTokenAccountsByOwner response (0 if the wallet doesn't hold the token)."""
+        if "error" in result:
+            raise RuntimeError(f"Solana RPC error: {result['error']}")
+        if "result" not in result:
+            raise RuntimeError(f"Solana RPC missing result: {result}")
         try:
-            with urllib.request.urlopen(req, timeout=self.timeout_s) as resp:
-                result = json.loads(resp.read().decode("utf-8"))
-                if "error" in result:
-                    raise RuntimeError(f"Solana RPC error: {result['error']}")
-                if "result" not in result:
-                    raise RuntimeError(f"Solana RPC missing result: {result}")
-                
-                accounts = result["result"].get("value", [])
-                if not accounts:
-                    # Wallet doesn't hold this token
-                    return 0
-                
-                # Get balance from first account (there should only be one per mint per wallet)
-                account_data = accounts[0].get("account", {}).get("data", {})
-                parsed = account_data.get("parsed", {})
-                info = parsed.get("info", {})
-                token_amount = info.get("tokenAmount", {})
-                amount_str = token_amount.get("amount", "0")
-                
-                return int(amount_str)
-        except urllib.error.URLError as e:
-            raise RuntimeError(f"Solana RPC request failed: {e}") from e
-        except json.JSONDecodeError as e:
-            raise RuntimeError(f"Solana RPC invalid JSON response: {e}") from e
-        except (KeyError, ValueError, TypeError) as e:
+            accounts = result["result"].get("value", [])
+            if not accounts:
+                # Wallet doesn't hold this token
+                return 0
+
+            # Get balance from first account (there should only be one per mint per wallet)
+            account_data = accounts[0].get("account", {}).get("data", {})
+            parsed = account_data.get("parsed", {})
+            info = parsed.get("info", {})
+            token_amount = info.get("tokenAmount", {})
+            amount_str = token_amount.get("amount", "0")
+
+            return int(amount_str)
+        except (KeyError, ValueError, TypeError, AttributeError) as e:
             raise RuntimeError(f"Solana RPC invalid response format: {e}") from e
+
+    def get_token_balance(self, wallet_pubkey: str, token_mint: str) -> int:
+        """
+        Get SPL token balance for a wallet and token mint.
+        Returns token balance in token's native units (not lamports).
+        Returns 0 if wallet doesn't hold the token.
+        Raises RuntimeError if RPC call fails.
+        """
+        request_id = self.transport.next_ids()[0]
+        return self._token_amount(self._post(self._token_accounts_request(request_id, wallet_pubkey, token_mint)))
+
+    def get_token_balances(
+        self,
+        wallet_pubkeys: Sequence[str],
+        token_mint: str,
+        batch_size: int = RPC_BATCH_SIZE,
+    ) -> Dict[str, Union[int, RuntimeError]]:
+        """
+        Token balances for many wallets using JSON-RPC batch requests
+        (one HTTP round trip per batch_size wallets).
+        Returns dict mapping wallet -> balance, or the RuntimeError for that wallet,
+        so callers keep per-wallet failure handling. If the endpoint rejects batch
+        requests, that batch falls back to one request per wallet.
+        """
+        wallets: List[str] = list(dict.fromkeys(wallet_pubkeys))
+        balances: Dict[str, Union[int, RuntimeError]] = {}
+        for start in range(0, len(wallets), batch_size):
+            chunk = wallets[start:start + batch_size]
+            ids = self.transport.next_ids(len(chunk))
+            payload = [self._token_accounts_request(i, w, token_mint) for i, w in zip(ids, chunk)]
+            try:
+                responses = self._post(payload)
+            except RuntimeError as e:
+                for wallet in chunk:
+                    balances[wallet] = e
+                continue
+
+            if not isinstance(responses, list):
+                # Batching not supported (single error object back)
+                for wallet in chunk:
+                    try:
+                        balances[wallet] = self.get_token_balance(wallet, token_mint)
+                    except RuntimeError as e:
+                        balances[wallet] = e
+                continue
+
+            # Batch responses may come back in any order: match them by id
+            by_id = {r.get("id"): r for r in responses if isinstance(r, dict)}
+            for i, wallet in zip(ids, chunk):
+                response = by_id.get(i)
+                if response is None:
+                    balances[wallet] = RuntimeError("Solana RPC batch response missing entry")
+                    continue
+                try:
+                    balances[wallet] = self._token_amount(response)
+                except RuntimeError as e:
+                    balances[wallet] = e
+        return balances
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from itertools import islice
+from typing import Any, Collection, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from shillbot.models import Tweet
+from shillbot.rate_limit import tweet_epoch
+from shillbot.utils import parse_millis
+from shillbot.scoring import best_per_handle, score_columns
+
+
+# Rows converted to arrays per step while building a batch
+BUILD_CHUNK = 10_000
+
+_COUNT_COLUMNS = ("like_count", "retweet_count", "quote_count", "reply_count", "view_count")
+_FLAG_COLUMNS = ("has_media", "is_retweet", "is_quote", "has_original_text")
+
+
+def _ids_array(ids: Sequence[str]) -> np.ndarray:
+    """Snowflake IDs as int64 (8 bytes each), or an object array of str if any isn't numeric."""
+    try:
+        return np.array(ids, dtype=np.int64)
+    except (ValueError, OverflowError):
+        return np.array([str(i) for i in ids], dtype=object)
+
+
+@dataclass(frozen=True)
+class TweetBatch:
+    """
+    Columnar tweets for scoring runs: one typed NumPy array per scoring field and
+    interned handles (dense int32 codes into `handles`), instead of a Tweet object
+    (plus a sqlite3.Row) per tweet. About 70 bytes per tweet; text and other
+    report-only fields are not kept (see bench_tweet_memory.py).
+    Rate limiting, exclusion filtering and scoring all run on the arrays.
+    """
+
+    tweet_ids: np.ndarray  # int64, or object (str) when an ID isn't numeric
+    handles: List[str]  # handles[handle_codes[i]] is tweet i's handle
+    handle_codes: np.ndarray  # int32
+    created_at_epoch: np.ndarray  # int64 Unix seconds
+    created_at_ms: np.ndarray  # int16 millisecond part, breaks same-second ties in rate_limit
+    like_count: np.ndarray  # int64
+    retweet_count: np.ndarray
+    quote_count: np.ndarray
+    reply_count: np.ndarray
+    view_count: np.ndarray
+    has_media: np.ndarray  # bool
+    is_retweet: np.ndarray
+    is_quote: np.ndarray
+    has_original_text: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.handle_codes)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[Any, ...]]) -> "TweetBatch":
+        """
+        Build from plain row tuples in SHILL_BATCH_COLUMNS order (see db.iter_shill_batch_rows),
+        BUILD_CHUNK rows at a time; the flags missing from the shills table default to False.
+        """
+        index: Dict[str, int] = {}
+        parts: Dict[str, List[np.ndarray]] = {
+            name: []
+            for name in ("tweet_ids", "handle_codes", "created_at_epoch", "created_at_ms", *_COUNT_COLUMNS, "has_media")
+        }
+        it = iter(rows)
+        while True:
+            chunk = list(islice(it, BUILD_CHUNK))
+            if not chunk:
+                break
+            ids, handles, epochs, millis, likes, retweets, quotes, replies, views, media = zip(*chunk)
+            n = len(chunk)
+            parts["tweet_ids"].append(_ids_array(ids))
+            parts["handle_codes"].append(
+                np.fromiter((index.setdefault(h, len(index)) for h in handles), dtype=np.int32, count=n)
+            )
+            parts["created_at_epoch"].append(np.array(epochs, dtype=np.int64))
+            parts["created_at_ms"].append(np.array(millis, dtype=np.int16))
+            for name, values in zip(_COUNT_COLUMNS, (likes, retweets, quotes, replies, views)):
+                parts[name].append(np.array(values, dtype=np.int64))
+            parts["has_media"].append(np.array(media, dtype=np.bool_))
+
+        if any(p.dtype == object for p in parts["tweet_ids"]):
+            parts["tweet_ids"] = [p.astype(str).astype(object) if p.dtype != object else p for p in parts["tweet_ids"]]
+        dtypes = {"tweet_ids": np.int64, "handle_codes": np.int32, "created_at_ms": np.int16, "has_media": np.bool_}
+        columns = {
+            name: np.concatenate(chunks) if chunks else np.empty(0, dtype=dtypes.get(name, np.int64))
+            for name, chunks in parts.items()
+        }
+        n = len(columns["handle_codes"])
+        for name in _FLAG_COLUMNS[1:]:
+            columns[name] = np.zeros(n, dtype=np.bool_)
+        return cls(handles=list(index), **columns)
+
+    @classmethod
+    def from_tweets(cls, tweets: Sequence[Tweet]) -> "TweetBatch":
+        n = len(tweets)
+        index: Dict[str, int] = {}
+        columns: Dict[str, np.ndarray] = {
+            "tweet_ids": _ids_array([t.tweet_id for t in tweets]),
+            "handle_codes": np.fromiter((index.setdefault(t.handle, len(index)) for t in tweets), dtype=np.int32, count=n),
+            "created_at_epoch": np.fromiter(((tweet_epoch(t) or 0) for t in tweets), dtype=np.int64, count=n),
+            "created_at_ms": np.fromiter(
+                (parse_millis(t.created_at_utc) for t in tweets), dtype=np.int16, count=n
+            ),
+        }
+        for name in _COUNT_COLUMNS:
+            columns[name] = np.fromiter((getattr(t, name) for t in tweets), dtype=np.int64, count=n)
+        for name in _FLAG_COLUMNS:
+            columns[name] = np.fromiter((getattr(t, name) for t in tweets), dtype=np.bool_, count=n)
+        return cls(handles=list(index), **columns)
+
+    def tweet_id(self, i: int) -> str:
+        return str(self.tweet_ids[i])
+
+    def take(self, indices: np.ndarray) -> "TweetBatch":
+        """Subset (or reorder) by index array or boolean mask; handles stay shared."""
+        return replace(
+            self,
+            **{
+                name: getattr(self, name)[indices]
+                for name in (
+                    "tweet_ids", "handle_codes", "created_at_epoch", "created_at_ms", *_COUNT_COLUMNS, *_FLAG_COLUMNS
+                )
+            },
+        )
+
+    def rate_limit(self) -> "TweetBatch":
+        """
+        apply_rate_limit on the arrays: the earliest tweet per (handle, epoch // 60),
+        output in order of each bucket's first appearance. Ties within a second break
+        on the millisecond part (X's created_at precision, where it orders like the
+        ISO string compare in rate_limit._earlier), then to the first seen.
+        """
+        n = len(self)
+        if n == 0:
+            return self
+        positions = np.arange(n)
+        buckets = self.created_at_epoch // 60
+        order = np.lexsort((positions, self.created_at_ms, self.created_at_epoch, buckets, self.handle_codes))
+        sorted_codes = self.handle_codes[order]
+        sorted_buckets = buckets[order]
+        first = np.ones(n, dtype=np.bool_)
+        first[1:] = (sorted_codes[1:] != sorted_codes[:-1]) | (sorted_buckets[1:] != sorted_buckets[:-1])
+        starts = np.flatnonzero(first)
+        winners = order[starts]
+        first_seen = np.minimum.reduceat(order, starts)
+        return self.take(winners[np.argsort(first_seen, kind="stable")])
+
+    def exclude(self, tweet_ids: Collection[str] = (), handles: Collection[str] = ()) -> "TweetBatch":
+        """Drop tweets whose ID is in tweet_ids or whose handle is in handles."""
+        keep = np.ones(len(self), dtype=np.bool_)
+        if handles:
+            blocked = [code for code, handle in enumerate(self.handles) if handle in handles]
+            keep &= ~np.isin(self.handle_codes, blocked)
+        if tweet_ids:
+            if self.tweet_ids.dtype == object:
+                excluded = np.array([str(t) for t in tweet_ids], dtype=object)
+            else:
+                # Non-numeric IDs can't match a numeric batch
+                excluded = np.array([int(t) for t in tweet_ids if str(t).isdigit()], dtype=np.int64)
+            keep &= ~np.isin(self.tweet_ids, excluded)
+        return self if keep.all() else self.take(keep)
+
+    def handle_counts(self) -> Dict[str, int]:
+        """Tweets per handle (handles with none are omitted)."""
+        counts = np.bincount(self.handle_codes, minlength=len(self.handles))
+        return {self.handles[code]: int(c) for code, c in enumerate(counts.tolist()) if c}
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Scoring columns in the scoring.tweets_to_columns layout."""
+        return {name: getattr(self, name) for name in (*_COUNT_COLUMNS, *_FLAG_COLUMNS)}
+
+    def score(self) -> Dict[str, Tuple[str, float]]:
+        """scoring.score_tweets on the arrays: handle -> (best tweet_id, score)."""
+        if len(self) == 0:
+            return {}
+        scores = score_columns(self.columns(), self.handle_codes)
+        best: Dict[str, Tuple[str, float]] = {}
+        # best_per_handle returns one index per handle present, in handle-code order
+        for idx in best_per_handle(self.handle_codes, scores).tolist():
+            best[self.handles[self.handle_codes[idx]]] = (self.tweet_id(idx), float(scores[idx]))
+        return best
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import re
+from datetime import datetime
+from functools import lru_cache
 from typing import Optional
 
 # Solana address regex: Base58 encoded, 32-44 characters
@@ -16,3 +18,23 @@ def extract_solana_address(text: str) -> Optional[str]:
     """
     match = SOL_ADDRESS_REGEX.search(text)
     return match.group(0) if match else None
+
+
+@lru_cache(maxsize=65_536)
+def parse_epoch(iso_str: str) -> Optional[int]:
+    """
+    Unix seconds for an ISO 8601 timestamp ('Z' or offset), or None if unparsable.
+    Cached: the same created_at strings are parsed again by every rate-limit pass.
+    """
+    try:
+        return int(datetime.fromisoformat(iso_str.replace("Z", "+00:00")).timestamp())
+    except (ValueError, AttributeError):
+        return None
+
+
+def parse_millis(iso_str: str) -> int:
+    """Millisecond part (0-999) of an ISO 8601 timestamp, 0 if absent or unparsable."""
+    try:
+        return datetime.fromisoformat(iso_str.replace("Z", "+00:00")).microsecond // 1000
+    except (ValueError, AttributeError):
+        return 0
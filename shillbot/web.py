@@ -0,0 +1,381 @@
+from __future__ import annotations
+
+import functools
+import gzip
+import hashlib
+import mimetypes
+import os
+import stat
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from shillbot.leaderboard import Leaderboard
+
+try:
+    import brotli
+except ImportError:  # Optional: br variants are only served when installed
+    brotli = None
+
+
+# Content types worth compressing
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/javascript",
+    "text/css",
+    "text/csv",
+    "text/html",
+    "text/javascript",
+    "text/plain",
+}
+# Below this, compression saves less than the extra headers cost
+MIN_COMPRESS_BYTES = 512
+# Larger files are not held in memory; they're streamed without ETag/compression
+MAX_CACHED_BYTES = 16 * 1024 * 1024
+# Total held by the cache (all variants); least recently used files are evicted past this
+MAX_CACHE_TOTAL_BYTES = 64 * 1024 * 1024
+# Not precomputed by FileCache.warm: every export-all run adds a snapshot under exports/,
+# so warming them would read every export ever written. Still served (and cached) on request.
+WARM_SKIP_DIRS = ("exports",)
+
+# history/ files can be rewritten (close-once --force, and index.json on every close), so
+# shared caches may store them but must revalidate with the ETag (a 304 when unchanged)
+HISTORY_CACHE_CONTROL = "public, no-cache"
+# Everything else is revalidated on every use (a 304 when unchanged)
+DEFAULT_CACHE_CONTROL = "no-cache"
+
+# Drop connections idle (or sending) this long, so slow clients only tie up their own thread
+REQUEST_TIMEOUT_S = 30
+
+# Live leaderboard routes (only when the server has a Leaderboard, i.e. 'shillbot run --serve')
+LEADERBOARD_PATH = "/api/leaderboard"
+LEADERBOARD_EVENTS_PATH = "/api/leaderboard/events"
+# SSE comment sent when nothing changed for this long, so proxies keep the stream open
+SSE_KEEPALIVE_S = 15.0
+
+# Preferred first
+_ENCODINGS = ("br", "gzip")
+
+
+@dataclass(frozen=True)
+class Representation:
+    body: bytes
+    etag: str  # strong; differs per content coding
+    encoding: Optional[str]  # Content-Encoding, None for identity
+
+
+@dataclass(frozen=True)
+class CachedFile:
+    mtime_ns: int
+    size: int
+    content_type: str
+    variants: Dict[str, Representation]  # "identity" plus any of _ENCODINGS that came out smaller
+
+    def select(self, accepted: Set[str]) -> Representation:
+        for encoding in _ENCODINGS:
+            if encoding in self.variants and (encoding in accepted or "*" in accepted):
+                return self.variants[encoding]
+        return self.variants["identity"]
+
+
+def load_cached_file(path: str, st: os.stat_result) -> CachedFile:
+    """Read path and precompute its compressed variants and strong ETags."""
+    with open(path, "rb") as f:
+        body = f.read()
+    content_type, file_encoding = mimetypes.guess_type(path)
+    if file_encoding is not None:
+        # Already compressed (e.g. history/*.json.gz): served as the archive it is
+        content_type = "application/gzip" if file_encoding == "gzip" else "application/octet-stream"
+    content_type = content_type or "application/octet-stream"
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    variants = {"identity": Representation(body, f'"{digest}"', None)}
+    if content_type in COMPRESSIBLE_TYPES and len(body) >= MIN_COMPRESS_BYTES:
+        compressed = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            compressed["br"] = brotli.compress(body)
+        for encoding, data in compressed.items():
+            if len(data) < len(body):
+                variants[encoding] = Representation(data, f'"{digest}-{encoding}"', encoding)
+    return CachedFile(st.st_mtime_ns, len(body), content_type, variants)
+
+
+def _cached_bytes(entry: CachedFile) -> int:
+    return sum(len(rep.body) for rep in entry.variants.values())
+
+
+@dataclass
+class FileCache:
+    """
+    Files under public/ with their compressed variants, keyed by path and reused
+    until the file's mtime or size changes. Each request costs one stat; the file
+    is re-read and re-compressed only after it's rewritten. Files over max_bytes
+    aren't cached, and the least recently used entries are evicted once the cache
+    holds more than max_total_bytes. Entries for deleted files are dropped. Thread-safe.
+    """
+
+    max_bytes: int = MAX_CACHED_BYTES
+    max_total_bytes: int = MAX_CACHE_TOTAL_BYTES
+
+    # Least recently used first
+    _entries: "OrderedDict[str, CachedFile]" = field(default_factory=OrderedDict, repr=False, compare=False)
+    _total_bytes: int = field(default=0, repr=False, compare=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._total_bytes
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _drop(self, path: str) -> None:
+        # Caller holds _lock
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._total_bytes -= _cached_bytes(entry)
+
+    def _store(self, path: str, entry: CachedFile) -> None:
+        with self._lock:
+            self._drop(path)
+            size = _cached_bytes(entry)
+            if size > self.max_total_bytes:
+                return
+            self._entries[path] = entry
+            self._total_bytes += size
+            while self._total_bytes > self.max_total_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def get(self, path: str) -> Optional[CachedFile]:
+        """The cached file, or None if path isn't a regular file of at most max_bytes."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            with self._lock:
+                self._drop(path)
+            return None
+        if not stat.S_ISREG(st.st_mode) or st.st_size > self.max_bytes:
+            with self._lock:
+                self._drop(path)
+            return None
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None:
+                self._entries.move_to_end(path)
+        if entry is not None and entry.mtime_ns == st.st_mtime_ns and entry.size == st.st_size:
+            return entry
+        try:
+            entry = load_cached_file(path, st)
+        except OSError:
+            return None
+        # A file caught mid-write is served but not kept; its final mtime forces a reload
+        if entry.size == st.st_size:
+            self._store(path, entry)
+        return entry
+
+    def prune(self) -> int:
+        """Drop entries whose file no longer exists; returns the number dropped."""
+        with self._lock:
+            paths = list(self._entries)
+        gone = [path for path in paths if not os.path.isfile(path)]
+        with self._lock:
+            for path in gone:
+                self._drop(path)
+        return len(gone)
+
+    def warm(self, root: str) -> int:
+        """Precompute every file under root except WARM_SKIP_DIRS; returns the number cached."""
+        self.prune()
+        count = 0
+        for dirpath, dirnames, filenames in os.walk(root):
+            if dirpath == root:
+                dirnames[:] = [d for d in dirnames if d not in WARM_SKIP_DIRS]
+            for name in filenames:
+                if self.get(os.path.join(dirpath, name)) is not None:
+                    count += 1
+        return count
+
+
+def accepted_encodings(header: str) -> Set[str]:
+    """Content codings from an Accept-Encoding header, minus any with q=0."""
+    accepted: Set[str] = set()
+    for part in header.split(","):
+        name, _, params = part.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        name = name.strip().lower()
+        if name and q > 0:
+            accepted.add(name)
+    return accepted
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/"x" matches "x"."""
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def cache_control(url_path: str, latest_max_age_s: int) -> str:
+    if url_path.startswith("/history/"):
+        return HISTORY_CACHE_CONTROL
+    if url_path == "/latest.json":
+        return f"public, max-age={latest_max_age_s}"
+    return DEFAULT_CACHE_CONTROL
+
+
+class ReportRequestHandler(SimpleHTTPRequestHandler):
+    """
+    GET/HEAD for public/ from FileCache: precompressed br/gzip variants, strong
+    ETags with If-None-Match -> 304, and per-path Cache-Control. Keep-alive
+    (HTTP/1.1). No directory listings.
+    """
+
+    protocol_version = "HTTP/1.1"
+    timeout = REQUEST_TIMEOUT_S
+    # Headers and body are separate writes; with Nagle on, keep-alive responses stall ~40ms on delayed ACKs
+    disable_nagle_algorithm = True
+    server: "ReportServer"
+
+    def do_GET(self) -> None:
+        self._serve(head_only=False)
+
+    def do_HEAD(self) -> None:
+        self._serve(head_only=True)
+
+    def _serve(self, head_only: bool) -> None:
+        url_path = urlsplit(self.path).path
+        if self.server.leaderboard is not None:
+            if url_path == LEADERBOARD_PATH:
+                self._serve_leaderboard(head_only)
+                return
+            if url_path == LEADERBOARD_EVENTS_PATH and not head_only:
+                self._serve_leaderboard_events()
+                return
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            if not url_path.endswith("/"):
+                self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+                self.send_header("Location", url_path + "/")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            path = os.path.join(path, "index.html")
+            url_path += "index.html"
+
+        cached = self.server.cache.get(path)
+        if cached is None:
+            if not os.path.isfile(path):
+                self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            elif head_only:
+                super().do_HEAD()
+            else:
+                # Too large to cache: plain streaming
+                super().do_GET()
+            return
+
+        rep = cached.select(accepted_encodings(self.headers.get("Accept-Encoding", "")))
+        if_none_match = self.headers.get("If-None-Match")
+        status = HTTPStatus.NOT_MODIFIED if if_none_match and etag_matches(if_none_match, rep.etag) else HTTPStatus.OK
+
+        self.send_response(status)
+        self.send_header("ETag", rep.etag)
+        self.send_header("Cache-Control", cache_control(url_path, self.server.latest_max_age_s))
+        if len(cached.variants) > 1:
+            self.send_header("Vary", "Accept-Encoding")
+        if status == HTTPStatus.NOT_MODIFIED:
+            self.end_headers()
+            return
+        self.send_header("Content-Type", cached.content_type)
+        if rep.encoding:
+            self.send_header("Content-Encoding", rep.encoding)
+        self.send_header("Content-Length", str(len(rep.body)))
+        self.end_headers()
+        if not head_only:
+            self.wfile.write(rep.body)
+
+    def _serve_leaderboard(self, head_only: bool) -> None:
+        snapshot = self.server.leaderboard.snapshot
+        etag = f'"leaderboard-{snapshot.version}"'
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match and etag_matches(if_none_match, etag):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", DEFAULT_CACHE_CONTROL)
+            self.end_headers()
+            return
+        self.send_response(HTTPStatus.OK)
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", DEFAULT_CACHE_CONTROL)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(snapshot.payload)))
+        self.end_headers()
+        if not head_only:
+            self.wfile.write(snapshot.payload)
+
+    def _serve_leaderboard_events(self) -> None:
+        """
+        Server-Sent Events: the current leaderboard on connect (unless Last-Event-ID
+        is already current), then one 'leaderboard' event per published change.
+        Holds this connection's thread until the client goes away.
+        """
+        board = self.server.leaderboard
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("X-Accel-Buffering", "no")  # nginx: don't buffer the stream
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        last_event_id = self.headers.get("Last-Event-ID", "")
+        seen = int(last_event_id) if last_event_id.isdigit() else -1
+        try:
+            while True:
+                snapshot = board.wait_for_change(seen, SSE_KEEPALIVE_S)
+                if snapshot is None:
+                    self.wfile.write(b": keepalive\n\n")
+                else:
+                    self.wfile.write(b"event: leaderboard\nid: %d\ndata: %s\n\n" % (snapshot.version, snapshot.payload))
+                    seen = snapshot.version
+        except OSError:
+            # Client disconnected (or stopped reading for REQUEST_TIMEOUT_S)
+            return
+
+
+class ReportServer(ThreadingHTTPServer):
+    """
+    Thread-per-connection server for public/ (see ReportRequestHandler), plus the
+    live leaderboard JSON and SSE routes when given a Leaderboard.
+    """
+
+    daemon_threads = True
+    # Listen backlog (socketserver default 5): bursts of new connections aren't dropped
+    request_queue_size = 128
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        public_dir: str,
+        latest_max_age_s: int,
+        handler: type = ReportRequestHandler,
+        leaderboard: Optional[Leaderboard] = None,
+    ) -> None:
+        self.public_dir = os.path.abspath(public_dir)
+        self.latest_max_age_s = latest_max_age_s
+        self.leaderboard = leaderboard
+        self.cache = FileCache()
+        super().__init__(address, functools.partial(handler, directory=self.public_dir))
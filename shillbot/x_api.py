@@ -3,32 +3,104 @@ from __future__ import annotations
 import json
 import re
 import time
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+from urllib.parse import urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from shillbot.api_budget import RateLimitBudget, RateLimitDeferred
+
+
+class SearchPage(NamedTuple):
+    """One page of search results."""
+    tweets: List[Dict[str, Any]]
+    next_token: Optional[str]
 
 
 @dataclass(frozen=True)
 class XAPIClient:
     bearer_token: str
     timeout_s: int = 30
+    pool_size: int = 10
+    base_url: str = "https://api.twitter.com/2"
 
     BASE_URL = "https://api.twitter.com/2"
 
+    # Pooled keep-alive session, created once per client and reused across pages/queries
+    _session: requests.Session = field(init=False, repr=False, compare=False)
+    # Per-endpoint request budget (shared/persisted when passed in, in-memory otherwise)
+    budget: Optional[RateLimitBudget] = field(default=None, repr=False, compare=False)
+    # Longest wait for a budget refill before deferring the request instead
+    max_wait_s: float = 30.0
+
+    def __post_init__(self) -> None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({"Authorization": f"Bearer {self.bearer_token}"})
+        object.__setattr__(self, "_session", session)
+        if self.budget is None:
+            object.__setattr__(self, "budget", RateLimitBudget())
+
+    def close(self) -> None:
+        """Close pooled connections and persist the rate-limit budget."""
+        self._session.close()
+        self.budget.flush()
+
+    def __enter__(self) -> "XAPIClient":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    @staticmethod
+    def _endpoint(url: str) -> str:
+        """Budget key for a request URL, e.g. '/2/tweets/search/recent'."""
+        return urlparse(url).path
+
+    def rate_limit_wait_s(self, url: str) -> float:
+        """Seconds until the endpoint's rate-limit budget refills, if it is used up (else 0)."""
+        return self.budget.wait_s(self._endpoint(url))
+
+    def _acquire(self, endpoint: str) -> None:
+        """Consult the budget before a request: proceed, pace (short sleep), or defer."""
+        wait_s = self.budget.acquire(endpoint)
+        if wait_s <= 0:
+            return
+        if wait_s > self.max_wait_s:
+            raise RateLimitDeferred(endpoint, wait_s)
+        print(f"Rate limit budget exhausted for {endpoint}, pacing {wait_s:.0f} seconds...")
+        time.sleep(wait_s)
+        self.budget.acquire(endpoint)
+
     def _get(self, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Make GET request with Bearer token authentication."""
-        headers = {"Authorization": f"Bearer {self.bearer_token}"}
+        """
+        Make GET request with Bearer token authentication (header set once on the session).
+        Raises RateLimitDeferred instead of sleeping when the endpoint budget (or a 429's
+        reset) is further away than max_wait_s.
+        """
+        endpoint = self._endpoint(url)
+        self._acquire(endpoint)
         try:
-            resp = requests.get(url, headers=headers, params=params, timeout=self.timeout_s)
+            resp = self._session.get(url, params=params, timeout=self.timeout_s)
+            self.budget.update_from_headers(endpoint, resp.headers)
             
             # Handle rate limiting (HTTP 429)
             if resp.status_code == 429:
-                retry_after = int(resp.headers.get("Retry-After", 900))  # Default to 15 minutes
-                print(f"Rate limited. Waiting {retry_after} seconds...")
+                retry_after = self.rate_limit_wait_s(url)
+                if retry_after <= 0:
+                    retry_after = int(resp.headers.get("Retry-After", 900))  # Default to 15 minutes
+                    self.budget.mark_exhausted(endpoint, retry_after)
+                if retry_after > self.max_wait_s:
+                    raise RateLimitDeferred(endpoint, retry_after)
+                print(f"Rate limited. Waiting {retry_after:.0f} seconds...")
                 time.sleep(retry_after)
                 # Retry once
-                resp = requests.get(url, headers=headers, params=params, timeout=self.timeout_s)
+                resp = self._session.get(url, params=params, timeout=self.timeout_s)
+                self.budget.update_from_headers(endpoint, resp.headers)
             
             # Step 4: Log RAW X API error body before raising
             if resp.status_code >= 400:
@@ -60,32 +132,44 @@ class XAPIClient:
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f"X API request failed: {e}") from e
 
-    def search_tweets(
+    def iter_search_pages(
         self,
         query: str,
         start_time: Optional[str] = None,
         end_time: Optional[str] = None,
-        max_results: int = 100,
         since_id: Optional[str] = None,
-    ) -> List[Dict[str, Any]]:
+        max_pages: Optional[int] = None,
+        max_tweets: Optional[int] = None,
+        until_id: Optional[str] = None,
+    ) -> Iterator[SearchPage]:
         """
-        Search recent tweets using X API v2.
+        Stream search results one page at a time, following next_token.
         
         Args:
             query: Search query (hashtags, mentions, keywords, etc.)
             start_time: ISO 8601 datetime (YYYY-MM-DDTHH:mm:ssZ) - inclusive
             end_time: ISO 8601 datetime (YYYY-MM-DDTHH:mm:ssZ) - exclusive
-            max_results: Max tweets to return (10-100, default 100)
             since_id: Return tweets newer than this tweet ID
+            until_id: Return tweets older than this tweet ID
+            max_pages: Page budget (None = follow next_token until exhausted)
+            max_tweets: Tweet budget (None = no limit); the last page is trimmed
             
-        Returns:
-            List of tweet objects with user data merged
+        Yields:
+            SearchPage per response, tweets with user data merged. A non-empty
+            next_token on the last yielded page means the budget cut the search short.
+            
+        Raises:
+            RuntimeError if a request fails (pages already yielded remain valid).
         """
-        url = f"{self.BASE_URL}/tweets/search/recent"
+        url = f"{self.base_url}/tweets/search/recent"
+        
+        page_size = 100  # API max is 100
+        if max_tweets is not None:
+            page_size = max(10, min(max_tweets, 100))  # API min is 10
         
         params: Dict[str, Any] = {
             "query": query,
-            "max_results": min(max_results, 100),  # API max is 100
+            "max_results": page_size,
             "tweet.fields": "id,text,created_at,author_id,public_metrics,attachments,referenced_tweets",
             "user.fields": "id,username,name",
             "expansions": "author_id",
@@ -97,45 +181,110 @@ class XAPIClient:
             params["end_time"] = end_time
         if since_id:
             params["since_id"] = since_id
+        if until_id:
+            params["until_id"] = until_id
 
-        all_tweets: List[Dict[str, Any]] = []
         next_token: Optional[str] = None
+        pages = 0
+        remaining = max_tweets
         
-        # Handle pagination (max 100 tweets per request, up to max_results total)
-        while len(all_tweets) < max_results:
+        while True:
             # Create fresh params dict for this iteration
             request_params = params.copy()
             if next_token:
                 request_params["next_token"] = next_token
             
-            try:
-                data = self._get(url, request_params)
-                
-                tweets = data.get("data", [])
-                if not tweets:
-                    break
-                
-                users = {u["id"]: u for u in data.get("includes", {}).get("users", [])}
-                
-                # Merge user data into tweets
-                for tweet in tweets:
-                    author_id = tweet.get("author_id")
-                    if author_id and author_id in users:
-                        tweet["_user"] = users[author_id]
-                    all_tweets.append(tweet)
-                
-                # Check for next page
-                meta = data.get("meta", {})
-                next_token = meta.get("next_token")
-                if not next_token or len(all_tweets) >= max_results:
-                    break
-                    
-            except Exception as e:
-                print(f"WARNING: Error during pagination: {e}")
+            data = self._get(url, request_params)
+            pages += 1
+            
+            tweets = data.get("data", [])
+            users = {u["id"]: u for u in data.get("includes", {}).get("users", [])}
+            
+            # Merge user data into tweets
+            for tweet in tweets:
+                author_id = tweet.get("author_id")
+                if author_id and author_id in users:
+                    tweet["_user"] = users[author_id]
+            
+            if remaining is not None:
+                tweets = tweets[:remaining]
+                remaining -= len(tweets)
+            
+            next_token = data.get("meta", {}).get("next_token") if tweets else None
+            yield SearchPage(tweets=tweets, next_token=next_token)
+            
+            if not next_token:
                 break
+            if max_pages is not None and pages >= max_pages:
+                break
+            if remaining is not None and remaining <= 0:
+                break
+
+    def search_tweets(
+        self,
+        query: str,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        max_results: int = 100,
+        since_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Search recent tweets using X API v2.
+        Collects iter_search_pages() into a list (up to max_results tweets).
+        
+        Args:
+            query: Search query (hashtags, mentions, keywords, etc.)
+            start_time: ISO 8601 datetime (YYYY-MM-DDTHH:mm:ssZ) - inclusive
+            end_time: ISO 8601 datetime (YYYY-MM-DDTHH:mm:ssZ) - exclusive
+            max_results: Max tweets to return (default 100, paginates beyond 100)
+            since_id: Return tweets newer than this tweet ID
+            
+        Returns:
+            List of tweet objects with user data merged
+        """
+        all_tweets: List[Dict[str, Any]] = []
+        try:
+            for page in self.iter_search_pages(
+                query,
+                start_time=start_time,
+                end_time=end_time,
+                since_id=since_id,
+                max_tweets=max_results,
+            ):
+                all_tweets.extend(page.tweets)
+        except Exception as e:
+            print(f"WARNING: Error during pagination: {e}")
         
         return all_tweets[:max_results]
 
+    def lookup_tweets(self, tweet_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Look up tweets by ID (GET /2/tweets, up to 100 IDs per request).
+        Much cheaper than re-running a search when only metrics need refreshing.
+        
+        Returns:
+            List of tweet objects with user data merged (same shape as search_tweets)
+        """
+        url = f"{self.base_url}/tweets"
+        all_tweets: List[Dict[str, Any]] = []
+        
+        for i in range(0, len(tweet_ids), 100):
+            params: Dict[str, Any] = {
+                "ids": ",".join(tweet_ids[i:i + 100]),
+                "tweet.fields": "id,text,created_at,author_id,public_metrics,attachments,referenced_tweets",
+                "user.fields": "id,username,name",
+                "expansions": "author_id",
+            }
+            data = self._get(url, params)
+            users = {u["id"]: u for u in data.get("includes", {}).get("users", [])}
+            for tweet in data.get("data", []):
+                author_id = tweet.get("author_id")
+                if author_id and author_id in users:
+                    tweet["_user"] = users[author_id]
+                all_tweets.append(tweet)
+        
+        return all_tweets
+
     def parse_tweet(self, raw_tweet: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Parse X API v2 tweet response to our standardized format.
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from shillbot.api_budget import RateLimitDeferred
+from shillbot.models import IngestCursor, Tweet
+from shillbot.x_api import SearchPage, XAPIClient
+from shillbot.x_ingest import IngestProgress, XIngestor
+
+
+@dataclass(frozen=True)
+class AsyncXAPIClient:
+    """
+    asyncio wrapper around XAPIClient.
+    Each page request runs in a worker thread on the shared pooled session, gated by
+    a shared concurrency limit. Create one instance per event loop.
+    """
+
+    client: XAPIClient
+    max_concurrency: int = 4
+
+    _semaphore: asyncio.Semaphore = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_semaphore", asyncio.Semaphore(self.max_concurrency))
+
+    async def _wait_for_rate_limit(self, url: str) -> None:
+        """Pause (without blocking other queries' event loop) until the endpoint budget resets."""
+        wait_s = self.client.rate_limit_wait_s(url)
+        if wait_s <= 0:
+            return
+        if wait_s > self.client.max_wait_s:
+            raise RateLimitDeferred(self.client._endpoint(url), wait_s)
+        print(f"Rate limit budget exhausted, waiting {wait_s:.0f} seconds...")
+        await asyncio.sleep(wait_s)
+
+    async def iter_search_pages(self, query: str, **kwargs: Any) -> AsyncIterator[SearchPage]:
+        """Async mirror of XAPIClient.iter_search_pages (same arguments)."""
+        url = f"{self.client.base_url}/tweets/search/recent"
+        pages = self.client.iter_search_pages(query, **kwargs)
+        while True:
+            async with self._semaphore:
+                await self._wait_for_rate_limit(url)
+                page = await asyncio.to_thread(next, pages, None)
+            if page is None:
+                return
+            yield page
+
+    async def search_tweets(
+        self,
+        query: str,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        max_results: int = 100,
+        since_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Async mirror of XAPIClient.search_tweets."""
+        all_tweets: List[Dict[str, Any]] = []
+        try:
+            async for page in self.iter_search_pages(
+                query,
+                start_time=start_time,
+                end_time=end_time,
+                since_id=since_id,
+                max_tweets=max_results,
+            ):
+                all_tweets.extend(page.tweets)
+        except Exception as e:
+            print(f"WARNING: Error during pagination: {e}")
+        return all_tweets[:max_results]
+
+    def parse_tweet(self, raw_tweet: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return self.client.parse_tweet(raw_tweet)
+
+
+@dataclass(frozen=True)
+class IngestCycleResult:
+    tweets: List[Tweet]
+    registrations: List[Tuple[str, str]]
+    cursors: Dict[str, IngestCursor]  # query -> new cursor (changed ones only)
+    errors: Dict[str, str]  # query -> error message
+
+
+def _window_kwargs() -> Tuple[Dict[str, Any], datetime]:
+    """Search arguments for the last 24 hours, and the oldest created_at to accept."""
+    # X API requires end_time to be at least 10 seconds in the past
+    end_utc = datetime.now(timezone.utc).replace(microsecond=0) - timedelta(seconds=10)
+    min_created = end_utc - timedelta(hours=24)
+    search_kwargs = {
+        "start_time": min_created.isoformat().replace("+00:00", "Z"),
+        "end_time": end_utc.isoformat().replace("+00:00", "Z"),
+    }
+    return search_kwargs, min_created
+
+
+async def _pull_query(
+    ingestor: XIngestor,
+    aclient: AsyncXAPIClient,
+    query: str,
+    progress: IngestProgress,
+    min_created: Optional[datetime] = None,
+    **search_kwargs: Any,
+) -> List[Tweet]:
+    """
+    Page through one search (up to the ingestor's page budget). Raises if the first
+    page fails; a later failure, or older pages left at the budget, marks
+    progress.complete = False.
+    """
+    shills: List[dict] = []
+    seen_ids: set[str] = set()
+    page = None
+    try:
+        async for page in aclient.iter_search_pages(query, max_pages=ingestor.max_pages, **search_kwargs):
+            progress.add_page(page.tweets)
+            shills.extend(ingestor.filter_shills(page.tweets, seen_ids))
+    except Exception as e:
+        if progress.pages == 0:
+            raise
+        print(f"WARNING: {query}: pagination stopped after {progress.pages} pages: {e}")
+        progress.complete = False
+    if progress.complete and page is not None and page.next_token:
+        print(f"WARNING: {query}: search stopped at the {ingestor.max_pages} page budget")
+        progress.complete = False
+
+    tweets: List[Tweet] = []
+    for parsed in shills:
+        tweet = ingestor.to_tweet(parsed, min_created=min_created)
+        if tweet is not None:
+            tweets.append(tweet)
+    progress.shills += len(tweets)
+    return tweets
+
+
+async def _collect_query(
+    ingestor: XIngestor,
+    aclient: AsyncXAPIClient,
+    query: str,
+    cursor: IngestCursor,
+) -> Tuple[List[Tweet], IngestCursor]:
+    """
+    Collect shills for one query: tweets newer than the ingest cursor (only its unread
+    gap while until_id is set), or the last 24 hours without one or when the API
+    rejects the cursor (since_id older than the recent-search window).
+    Returns (tweets, new cursor, see IngestProgress.advance).
+    """
+    progress = IngestProgress()
+    tweets: Optional[List[Tweet]] = None
+    if cursor.since_id or cursor.until_id:
+        progress.resumed = cursor.until_id is not None
+        search_kwargs: Dict[str, Any] = {}
+        min_created: Optional[datetime] = None
+        if not cursor.since_id:
+            # Gap left by a window pull: read it inside the window
+            search_kwargs, min_created = _window_kwargs()
+            progress.from_window = True
+        try:
+            search_kwargs.update(cursor.search_kwargs())
+            tweets = await _pull_query(ingestor, aclient, query, progress, min_created=min_created, **search_kwargs)
+        except RateLimitDeferred:
+            raise
+        except Exception as e:
+            # Only reached if the first page failed, so nothing was collected yet
+            print(f"WARNING: {query}: incremental pull failed ({e}), falling back to 24 hour window")
+            progress.resumed = False
+    if tweets is None:
+        search_kwargs, min_created = _window_kwargs()
+        progress.from_window = True
+        tweets = await _pull_query(ingestor, aclient, query, progress, min_created=min_created, **search_kwargs)
+    print(f"{query}: {progress.pages} pages, {len(tweets)} shills")
+    return tweets, progress.advance(cursor)
+
+
+async def _collect_registrations(ingestor: XIngestor, aclient: AsyncXAPIClient) -> List[Tuple[str, str]]:
+    query = f"#{ingestor.register_hashtag} -is:retweet"
+    registrations: List[Tuple[str, str]] = []
+    page = None
+    try:
+        async for page in aclient.iter_search_pages(query, max_pages=ingestor.max_pages):
+            ingestor.parse_registrations(page.tweets, registrations)
+    except Exception as e:
+        # Keep registrations from pages already fetched
+        print(f"WARNING: Failed to scrape registrations: {e}")
+        return registrations
+    if page is not None and page.next_token:
+        print(f"WARNING: Registration search stopped at the {ingestor.max_pages} page budget")
+    return registrations
+
+
+async def ingest_cycle(
+    ingestor: XIngestor,
+    aclient: AsyncXAPIClient,
+    cursors: Dict[str, IngestCursor],
+    registrations: bool = True,
+) -> IngestCycleResult:
+    """
+    Run every shill query (mentions, cashtag, mint) and the registration search
+    concurrently. Total time is roughly that of the slowest query.
+    A failing query is reported in errors and does not cancel the others.
+    """
+    queries = ingestor.shill_queries()
+    jobs = [_collect_query(ingestor, aclient, q, cursors.get(q, IngestCursor())) for q in queries]
+    if registrations:
+        jobs.append(_collect_registrations(ingestor, aclient))
+    results = await asyncio.gather(*jobs, return_exceptions=True)
+
+    tweets: List[Tweet] = []
+    seen_ids: set[str] = set()
+    new_cursors: Dict[str, IngestCursor] = {}
+    errors: Dict[str, str] = {}
+    for query, result in zip(queries, results):
+        if isinstance(result, BaseException):
+            errors[query] = str(result)
+            continue
+        query_tweets, cursor = result
+        for tweet in query_tweets:
+            # The same tweet can match several queries
+            if tweet.tweet_id not in seen_ids:
+                seen_ids.add(tweet.tweet_id)
+                tweets.append(tweet)
+        if cursor != cursors.get(query, IngestCursor()):
+            new_cursors[query] = cursor
+
+    regs: List[Tuple[str, str]] = []
+    if registrations:
+        reg_result = results[-1]
+        if isinstance(reg_result, BaseException):
+            errors["registrations"] = str(reg_result)
+        else:
+            regs = reg_result
+
+    return IngestCycleResult(tweets=tweets, registrations=regs, cursors=new_cursors, errors=errors)
@@ -1,15 +1,64 @@
 from __future__ import annotations
 
-import re
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Optional, Tuple
+from typing import Any, Iterator, List, Optional, Tuple
 
-from shillbot.models import Tweet
+from shillbot.api_budget import RateLimitDeferred
+from shillbot.matching import DEFAULT_TOKEN_MINT, ShillMatcher
+from shillbot.models import IngestCursor, Tweet
 from shillbot.utils import extract_solana_address
 from shillbot.x_api import XAPIClient
 
 
+# Default page budget per search (100 tweets per page)
+DEFAULT_MAX_PAGES = 10
+
+
+@dataclass
+class IngestProgress:
+    """Counters and cursor state filled in by a streaming shill pull as it is consumed."""
+
+    pages: int = 0
+    raw_count: int = 0
+    shills: int = 0  # tweets that passed the shill filter
+    newest_id: Optional[str] = None  # highest raw tweet ID seen (filtered out or not)
+    oldest_id: Optional[str] = None  # lowest raw tweet ID seen
+    complete: bool = True  # False if pagination stopped early
+    from_window: bool = False  # True if the 24h window pull ran (no usable cursor)
+    resumed: bool = False  # True if the pull read the gap left by an earlier partial pull
+
+    def add_page(self, raw_tweets: List[dict]) -> None:
+        """Count a fetched search page and widen the ID range seen."""
+        self.pages += 1
+        self.raw_count += len(raw_tweets)
+        for raw in raw_tweets:
+            try:
+                tweet_id = int(raw.get("id", 0))
+            except (TypeError, ValueError):
+                continue
+            # IDs are snowflakes, compare numerically
+            if tweet_id and (self.newest_id is None or tweet_id > int(self.newest_id)):
+                self.newest_id = str(tweet_id)
+            if tweet_id and (self.oldest_id is None or tweet_id < int(self.oldest_id)):
+                self.oldest_id = str(tweet_id)
+
+    def advance(self, cursor: IngestCursor) -> IngestCursor:
+        """
+        New ingest cursor once the stream is exhausted. Pages arrive newest-first, so a
+        partial pull leaves everything older than oldest_id unread: that gap is read
+        next run (until_id = oldest_id) before the cursor moves to the newest ID, which
+        is kept in pending_id meanwhile. A window pull replaces a rejected cursor.
+        """
+        since_id = None if self.from_window else cursor.since_id
+        pending_id = cursor.pending_id if self.resumed else self.newest_id
+        if not self.complete:
+            if not self.oldest_id:
+                return cursor
+            return IngestCursor(since_id=since_id, until_id=self.oldest_id, pending_id=pending_id)
+        return IngestCursor(since_id=pending_id or since_id)
+
+
 @dataclass(frozen=True)
 class XIngestor:
     client: XAPIClient
@@ -18,115 +67,218 @@ class XIngestor:
     coin_ticker: str
     token_mint: Optional[str]
     register_hashtag: str
+    max_pages: int = DEFAULT_MAX_PAGES
+
+    matcher: ShillMatcher = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(
+            self, "matcher", ShillMatcher(self.coin_handle, self.token_mint, self.register_hashtag)
+        )
 
     def has_registration_hashtag(self, tweet_text: str) -> bool:
         """
         Check if tweet contains the registration hashtag (case-insensitive).
         Returns True if hashtag is present, False otherwise.
         """
-        # Look for the hashtag (case-insensitive)
-        pattern = re.compile(
-            rf"#{re.escape(self.register_hashtag)}\b", re.IGNORECASE
-        )
-        return bool(pattern.search(tweet_text))
+        return self.matcher.has_registration_hashtag(tweet_text)
 
-    def scrape_registrations(self) -> List[Tuple[str, str]]:
+    def scrape_registrations(self, progress: Optional[IngestProgress] = None) -> List[Tuple[str, str]]:
         """
         Search for #shillbotregister hashtag tweets and extract wallet registrations.
         Returns list of (handle, wallet) tuples.
         Wallet can be anywhere in the tweet text.
         If hashtag exists but no valid SOL address found, wallet = 'N/A'.
         Most recent registration per handle wins (handled by DB PRIMARY KEY).
+        Page counts go to progress; complete is False when a failure or the page
+        budget left older registration tweets unread.
         """
+        if progress is None:
+            progress = IngestProgress()
         if not self.client.bearer_token:
             return []
 
+        registrations: List[Tuple[str, str]] = []
         try:
             # Search for hashtag (exclude retweets)
             # Add # dynamically (config value has no #)
             query = f"#{self.register_hashtag} -is:retweet"
-            raw_tweets = self.client.search_tweets(query, max_results=100)
-            
-            registrations: List[Tuple[str, str]] = []
-
-            for raw in raw_tweets:
-                try:
-                    parsed = self.client.parse_tweet(raw)
-                    if not parsed:
-                        continue
-
-                    handle = parsed.get("handle", "unknown")
-                    text = parsed.get("text", "")
-                    tweet_id = parsed.get("tweet_id", "unknown")
-                    
-                    # Check if hashtag is present
-                    if not self.has_registration_hashtag(text):
-                        continue
-                    
-                    # Extract Solana address from anywhere in the tweet
-                    wallet = extract_solana_address(text)
-                    if not wallet:
-                        wallet = "N/A"
-                    
-                    registrations.append((handle, wallet))
-                except Exception as e:
-                    # Never crash on malformed tweets
-                    tweet_id = raw.get("id", "unknown") if isinstance(raw, dict) else "unknown"
-                    print(f"WARNING: Failed to process registration tweet {tweet_id}: {e}")
-                    continue
-
+            page = None
+            for page in self.client.iter_search_pages(query, max_pages=self.max_pages):
+                progress.pages += 1
+                progress.raw_count += len(page.tweets)
+                self.parse_registrations(page.tweets, registrations)
+            if page is not None and page.next_token:
+                print(f"WARNING: Registration search stopped at the {self.max_pages} page budget")
+                progress.complete = False
             return registrations
         except Exception as e:
-            # Log error but don't crash
+            # Log error but don't crash; keep registrations from pages already fetched
             print(f"WARNING: Failed to scrape registrations: {e}")
-            return []
+            progress.complete = False
+            return registrations
 
-    def _is_shill_tweet(self, parsed: dict) -> bool:
+    def parse_registrations(self, raw_tweets: List[dict], registrations: List[Tuple[str, str]]) -> None:
+        """Append (handle, wallet) for each registration tweet in a page."""
+        for raw in raw_tweets:
+            try:
+                parsed = self.client.parse_tweet(raw)
+                if not parsed:
+                    continue
+
+                handle = parsed.get("handle", "unknown")
+                text = parsed.get("text", "")
+                tweet_id = parsed.get("tweet_id", "unknown")
+                
+                # Check if hashtag is present
+                if not self.has_registration_hashtag(text):
+                    continue
+                
+                # Extract Solana address from anywhere in the tweet
+                wallet = extract_solana_address(text)
+                if not wallet:
+                    wallet = "N/A"
+                
+                registrations.append((handle, wallet))
+            except Exception as e:
+                # Never crash on malformed tweets
+                tweet_id = raw.get("id", "unknown") if isinstance(raw, dict) else "unknown"
+                print(f"WARNING: Failed to process registration tweet {tweet_id}: {e}")
+                continue
+
+    def shill_query(self) -> str:
+        """Search query used for shill collection (also the ingest cursor key)."""
+        # Mention instead of cashtag (cashtag not available in API tier)
+        return f"@{self.coin_handle}"  # e.g., "@shootercoinsol"
+
+    def shill_queries(self) -> List[str]:
         """
-        Filter tweets in Python to check if they match shill criteria.
-        Case-insensitive substring matching.
-        
-        Matches if ANY of:
-        - Mentions @shootercoinsol
-        - Contains $shooter (case-insensitive)
-        - Contains $shillbot (case-insensitive)
-        - Contains token mint address (6iWeEmh5G7u8ERXBPn2y3CgKttDoDm7GDCc1368Upump or configured)
-        """
-        if not parsed:
-            return False
-        
-        text_lower = parsed.get("text", "").lower()
-        
-        # Condition 1: Mentions @shootercoinsol
-        if f"@{self.coin_handle.lower()}" in text_lower:
-            return True
-        
-        # Condition 2: Contains $shooter (case-insensitive)
-        if "$shooter" in text_lower:
-            return True
-        
-        # Condition 3: Contains $shillbot (case-insensitive)
-        if "$shillbot" in text_lower:
-            return True
-        
-        # Condition 4: Contains token mint address
-        # Check configured token_mint first, fallback to hardcoded address
-        token_mint_to_check = self.token_mint or "6iWeEmh5G7u8ERXBPn2y3CgKttDoDm7GDCc1368Upump"
-        if token_mint_to_check.lower() in text_lower:
-            return True
-        
-        return False
+        All shill search queries for concurrent ingest: mentions, cashtag, mint address.
+        Each query keeps its own since_id cursor.
+        """
+        token_mint = self.token_mint or DEFAULT_TOKEN_MINT
+        return [self.shill_query(), f"${self.coin_ticker}", token_mint]
 
-    def collect_shill_tweets(self) -> List[Tweet]:
+    def to_tweet(self, parsed: dict, min_created: Optional[datetime] = None) -> Optional[Tweet]:
+        """Convert a parsed tweet dict to a Tweet, or None if malformed / older than min_created."""
+        try:
+            # Parse created_at_utc (X API returns ISO format)
+            created_str = parsed["created_at_utc"]
+            try:
+                created_dt = datetime.fromisoformat(created_str.replace("Z", "+00:00"))
+            except (ValueError, AttributeError):
+                return None
+
+            # Double-check time window (API should filter, but verify)
+            if min_created is not None and created_dt < min_created:
+                return None
+
+            return Tweet(
+                tweet_id=parsed["tweet_id"],
+                handle=parsed["handle"],
+                created_at_utc=created_dt.isoformat(),
+                text=parsed["text"],
+                like_count=parsed["like_count"],
+                retweet_count=parsed["retweet_count"],
+                quote_count=parsed["quote_count"],
+                reply_count=parsed["reply_count"],
+                view_count=parsed["view_count"],
+                has_media=parsed["has_media"],
+                media_type=parsed["media_type"],
+                is_retweet=parsed.get("is_retweet", False),
+                is_quote=parsed.get("is_quote", False),
+                has_original_text=parsed.get("has_original_text", False),
+                match_reasons=parsed.get("match_reasons", ""),
+                created_at_epoch=int(created_dt.timestamp()),
+            )
+        except (KeyError, ValueError):
+            # Skip malformed tweets
+            return None
+
+    def filter_shills(self, raw_tweets: List[dict], seen_ids: set[str]) -> List[dict]:
+        """Parse, filter, and deduplicate raw API tweets (matched criteria kept in "match_reasons")."""
+        out: List[dict] = []
+        for raw in raw_tweets:
+            parsed = self.client.parse_tweet(raw)
+            if parsed and parsed["tweet_id"] not in seen_ids:
+                # Filter in Python after API pull
+                reasons = self.matcher.match_reasons(parsed.get("text", ""))
+                if reasons:
+                    parsed["match_reasons"] = ",".join(reasons)
+                    out.append(parsed)
+                    seen_ids.add(parsed["tweet_id"])
+        return out
+
+    def _stream_query(
+        self,
+        query: str,
+        progress: "IngestProgress",
+        min_created: Optional[datetime] = None,
+        **search_kwargs: Any,
+    ) -> Iterator[Tweet]:
         """
-        Collect shill tweets from last 24 hours using simplified query.
-        
-        Hard-limited to 24 hours to avoid X API window violations.
-        Uses single keyword query ($SHOOTER) with fallback to shorter windows if needed.
+        Fetch -> parse -> filter -> Tweet, one search page at a time (up to max_pages),
+        so only the current page is held in memory. Duplicates are only dropped
+        within a page (pagination doesn't repeat tweets; INSERT OR IGNORE catches the rest).
+        Raises if the first page fails. A failure after that, or running out of the
+        page budget with older pages left, stops the stream and marks
+        progress.complete = False.
+        """
+        pages_before = progress.pages
+        page = None
+        try:
+            for page in self.client.iter_search_pages(query, max_pages=self.max_pages, **search_kwargs):
+                progress.add_page(page.tweets)
+                for parsed in self.filter_shills(page.tweets, set()):
+                    tweet = self.to_tweet(parsed, min_created=min_created)
+                    if tweet is not None:
+                        progress.shills += 1
+                        yield tweet
+        except Exception as e:
+            if progress.pages == pages_before:
+                raise
+            print(f"WARNING: Pagination stopped after {progress.pages - pages_before} pages: {e}")
+            progress.complete = False
+            return
+        if page is not None and page.next_token:
+            # Older pages are still pending: don't let the cursor skip past them
+            print(f"WARNING: Search stopped at the {self.max_pages} page budget, older tweets not fetched")
+            progress.complete = False
+
+    def iter_shill_tweets(self, cursor: IngestCursor, progress: "IngestProgress") -> Iterator[Tweet]:
+        """
+        Streaming shill collection, newest first: only tweets newer than the persisted
+        ingest cursor, or the last 24 hours without one, or when the API rejects the
+        cursor (since_id older than the recent-search window). While the cursor has an
+        unread gap (until_id) only that gap is read.
+        Pull counts and the new cursor are reported through progress once the
+        stream is exhausted (see IngestProgress.advance).
         """
         if not self.client.bearer_token:
-            return []
+            return
+        if cursor.since_id or cursor.until_id:
+            progress.resumed = cursor.until_id is not None
+            try:
+                if cursor.since_id:
+                    print(f"Attempting incremental pull since tweet {cursor.since_id}...")
+                    yield from self._stream_query(self.shill_query(), progress, **cursor.search_kwargs())
+                else:
+                    yield from self._stream_window(progress, **cursor.search_kwargs())
+                print(f"Successfully pulled {progress.raw_count} new raw tweets since cursor")
+                return
+            except RateLimitDeferred:
+                raise
+            except Exception as e:
+                # Only reached if the first page failed, so nothing was yielded yet
+                print(f"WARNING: Incremental pull failed ({e}), falling back to 24 hour window")
+                progress.resumed = False
+        yield from self._stream_window(progress)
 
+    def _stream_window(self, progress: "IngestProgress", **search_kwargs: Any) -> Iterator[Tweet]:
+        """
+        24h window pull (newest first), shrinking to 6h / 1h if the first page fails.
+        search_kwargs (until_id) narrow every window.
+        """
         from datetime import timedelta, timezone
         
         # Step 1: Hard-set time window to last 24 hours (canonical rule)
@@ -140,8 +292,7 @@ class XIngestor:
         start_time = start_time_utc.isoformat().replace("+00:00", "Z")
 
         # Step 2: Simplified query - use mention instead of cashtag (cashtag not available in API tier)
-        # Try mention first, fallback to plain keyword if needed
-        query = f"@{self.coin_handle}"  # e.g., "@shootercoinsol"
+        query = self.shill_query()
 
         # Step 3: Fallback window shrinking (24h -> 6h -> 1h)
         windows_to_try = [
@@ -150,32 +301,23 @@ class XIngestor:
             (1, (now_utc - timedelta(hours=1)).isoformat().replace("+00:00", "Z"), end_time, "1 hour"),
         ]
 
-        all_tweets: List[dict] = []
-        seen_ids: set[str] = set()
-
+        # Replaces a missing or rejected since_id cursor
+        progress.from_window = True
         for hours, try_start, try_end, window_desc in windows_to_try:
             try:
                 print(f"Attempting pull with {window_desc} window...")
-                raw_tweets = self.client.search_tweets(
-                    query=query,
-                    start_time=try_start,
-                    end_time=try_end,
-                    max_results=100,
+                # Accept tweets from the last 24 hours regardless of which window succeeded
+                yield from self._stream_query(
+                    query, progress, min_created=start_time_utc, start_time=try_start, end_time=try_end, **search_kwargs
                 )
 
-                # Parse, filter, and deduplicate
-                for raw in raw_tweets:
-                    parsed = self.client.parse_tweet(raw)
-                    if parsed and parsed["tweet_id"] not in seen_ids:
-                        # Filter in Python after API pull
-                        if self._is_shill_tweet(parsed):
-                            all_tweets.append(parsed)
-                            seen_ids.add(parsed["tweet_id"])
-
                 # If we got results (even if empty), the query worked - break
-                print(f"Successfully pulled {len(raw_tweets)} raw tweets with {window_desc} window")
+                print(f"Successfully pulled {progress.raw_count} raw tweets with {window_desc} window")
                 break
 
+            except RateLimitDeferred:
+                # Smaller windows hit the same exhausted budget
+                raise
             except Exception as e:
                 print(f"WARNING: Failed with {window_desc} window: {e}")
                 if hours == 1:
@@ -184,44 +326,33 @@ class XIngestor:
                 # Continue to next smaller window
                 continue
 
-        # Convert to Tweet objects
-        tweets: List[Tweet] = []
-        since_dt = start_time_utc
-        until_dt = end_time_utc
+    def collect_shill_tweets(self) -> List[Tweet]:
+        """
+        Collect shill tweets from last 24 hours using simplified query.
+        
+        Hard-limited to 24 hours to avoid X API window violations.
+        Uses single keyword query ($SHOOTER) with fallback to shorter windows if needed.
+        """
+        if not self.client.bearer_token:
+            return []
+        return list(self._stream_window(IngestProgress()))
 
-        for parsed in all_tweets:
-            try:
-                # Parse created_at_utc (X API returns ISO format)
-                created_str = parsed["created_at_utc"]
-                try:
-                    created_dt = datetime.fromisoformat(created_str.replace("Z", "+00:00"))
-                except (ValueError, AttributeError):
-                    continue
+    def refresh_metrics(self, tweet_ids: List[str]) -> List[Tweet]:
+        """
+        Re-fetch engagement metrics for already-stored tweets via ID lookup
+        (1 request per 100 tweets, no search quota spent).
+        """
+        if not self.client.bearer_token or not tweet_ids:
+            return []
 
-                # Double-check time window (API should filter, but verify)
-                # Accept tweets from the last 24 hours regardless of which window succeeded
-                if created_dt >= start_time_utc:
-                    tweet = Tweet(
-                        tweet_id=parsed["tweet_id"],
-                        handle=parsed["handle"],
-                        created_at_utc=created_dt.isoformat(),
-                        text=parsed["text"],
-                        like_count=parsed["like_count"],
-                        retweet_count=parsed["retweet_count"],
-                        quote_count=parsed["quote_count"],
-                        reply_count=parsed["reply_count"],
-                        view_count=parsed["view_count"],
-                        has_media=parsed["has_media"],
-                        media_type=parsed["media_type"],
-                        is_retweet=parsed.get("is_retweet", False),
-                        is_quote=parsed.get("is_quote", False),
-                        has_original_text=parsed.get("has_original_text", False),
-                    )
-                    tweets.append(tweet)
-            except (KeyError, ValueError) as e:
-                # Skip malformed tweets
+        tweets: List[Tweet] = []
+        for raw in self.client.lookup_tweets(tweet_ids):
+            parsed = self.client.parse_tweet(raw)
+            if not parsed:
                 continue
-
+            tweet = self.to_tweet(parsed)
+            if tweet is not None:
+                tweets.append(tweet)
         return tweets
 
     def discover_tweet_ids(self, since_ymd: str, until_ymd: str) -> List[str]:
@@ -8,16 +8,15 @@ from __future__ import annotations
 
 import json
 import sys
-from datetime import datetime, timedelta, timezone
-from zoneinfo import ZoneInfo
 
 from shillbot.config import load_settings
 from shillbot.db import DB, connect, init_db
 from shillbot.models import Tweet
 from shillbot.rate_limit import apply_rate_limit
+from shillbot.utils import extract_solana_address
 from shillbot.validation import extract_solana_pubkey, is_valid_solana_pubkey
+from shillbot.x_api import XAPIClient
 from shillbot.x_ingest import XIngestor
-from shillbot.scrapingdog import ScrapingDogClient
 
 
 def test_config():
@@ -26,7 +25,7 @@ def test_config():
     try:
         s = load_settings()
         print(f"✓ Config loaded successfully")
-        print(f"  API Key set: {bool(s.scrapingdog_api_key)}")
+        print(f"  Bearer token set: {bool(s.x_api_bearer_token)}")
         print(f"  Coin handle: {s.coin_handle}")
         print(f"  Coin ticker: {s.coin_ticker}")
         print(f"  Register hashtag: {s.register_hashtag}")
@@ -62,28 +61,30 @@ def test_registration_parsing(s: any):
     """Test 3: Test registration hashtag parsing."""
     print("\n=== Test 3: Registration Parsing ===")
     try:
-        client = ScrapingDogClient(api_key=s.scrapingdog_api_key or "test", timeout_s=30)
+        client = XAPIClient(bearer_token=s.x_api_bearer_token or "test", timeout_s=30)
         ingestor = XIngestor(
             client=client,
             handle=s.handle,
-            dynamic=s.scrapingdog_dynamic,
             coin_handle=s.coin_handle,
             coin_ticker=s.coin_ticker,
             token_mint=s.token_mint if s.token_mint else None,
             register_hashtag=s.register_hashtag,
+            max_pages=s.x_api_max_pages,
         )
         
+        hashtag = f"#{s.register_hashtag}"
         test_cases = [
-            ("#Shillbot-register C4RmBaZJdXBJZsGxnRsjSrpfxAt6hz9BiBEVYpeMcCnD", True),
-            ("#shillbot-register C4RmBaZJdXBJZsGxnRsjSrpfxAt6hz9BiBEVYpeMcCnD", True),  # Case insensitive
-            ("Check out #Shillbot-register C4RmBaZJdXBJZsGxnRsjSrpfxAt6hz9BiBEVYpeMcCnD", True),
-            ("#Shillbot-register invalid", False),
+            (f"{hashtag} C4RmBaZJdXBJZsGxnRsjSrpfxAt6hz9BiBEVYpeMcCnD", True),
+            (f"{hashtag.upper()} C4RmBaZJdXBJZsGxnRsjSrpfxAt6hz9BiBEVYpeMcCnD", True),  # Case insensitive
+            (f"Check out {hashtag} C4RmBaZJdXBJZsGxnRsjSrpfxAt6hz9BiBEVYpeMcCnD", True),
+            (f"{hashtag} invalid", False),
             ("No hashtag here", False),
         ]
         
         passed = 0
         for text, should_find in test_cases:
-            wallet = ingestor.parse_registration_hashtag(text)
+            # Same rule as XIngestor.parse_registrations (which stores 'N/A' without a wallet)
+            wallet = extract_solana_address(text) if ingestor.has_registration_hashtag(text) else None
             found = wallet is not None
             if found == should_find:
                 passed += 1
@@ -189,7 +190,7 @@ def test_database_schema():
 def test_registration_ingest(s: any):
     """Test 6: Test registration ingestion (requires API key)."""
     print("\n=== Test 6: Registration Ingestion (API) ===")
-    if not s.scrapingdog_api_key:
+    if not s.x_api_bearer_token:
         print("⚠ Skipped: No API key set")
         return None
     
@@ -217,48 +218,32 @@ def test_registration_ingest(s: any):
         return False
 
 
-def test_interim_pull(s: any):
-    """Test 7: Test interim shill pull (requires API key)."""
-    print("\n=== Test 7: Interim Shill Pull (API) ===")
-    if not s.scrapingdog_api_key:
+def test_shill_ingest(s: any):
+    """Test 7: Test shill ingest (requires API key)."""
+    print("\n=== Test 7: Shill Ingest (API) ===")
+    if not s.x_api_bearer_token:
         print("⚠ Skipped: No API key set")
         return None
     
     try:
-        # Use last 24 hours - handle timezone gracefully
-        from datetime import timezone as tz_utc
-        try:
-            until_dt = datetime.now(ZoneInfo(s.timezone))
-            since_dt = until_dt - timedelta(hours=24)
-            since_utc = since_dt.astimezone(tz_utc.utc).isoformat()
-            until_utc = until_dt.astimezone(tz_utc.utc).isoformat()
-        except Exception:
-            # Fallback to UTC if timezone fails
-            until_dt = datetime.now(tz_utc.utc)
-            since_dt = until_dt - timedelta(hours=24)
-            since_utc = since_dt.isoformat()
-            until_utc = until_dt.isoformat()
-        
-        
-        print(f"  Pulling tweets from {since_utc[:19]} to {until_utc[:19]}")
-        
-        from shillbot.cli import cmd_ingest
-        cmd_ingest(interim=True, since=since_utc, until=until_utc)
+        # Incremental from the stored cursor; the first run pulls the last 24 hours
+        from shillbot.cli import cmd_ingest_shills
+        cmd_ingest_shills()
         
         # Check results
         db = DB(s.db_path)
         with connect(db) as conn:
-            count = conn.execute("SELECT COUNT(*) as cnt FROM interim_shills").fetchone()[0]
-            print(f"  ✓ Interim shills in DB: {count}")
+            count = conn.execute("SELECT COUNT(*) as cnt FROM shills").fetchone()[0]
+            print(f"  ✓ Shills in DB: {count}")
             if count > 0:
-                rows = conn.execute("SELECT handle, tweet_id, created_at_utc FROM interim_shills ORDER BY created_at_utc DESC LIMIT 5").fetchall()
+                rows = conn.execute("SELECT handle, tweet_id, created_at_utc FROM shills ORDER BY created_at_utc DESC LIMIT 5").fetchall()
                 print("  Recent tweets:")
                 for r in rows:
                     print(f"    {r['handle']}: {r['tweet_id']} at {r['created_at_utc'][:19]}")
         
         return True
     except Exception as e:
-        print(f"✗ Interim pull failed: {e}")
+        print(f"✗ Shill ingest failed: {e}")
         import traceback
         traceback.print_exc()
         return False
@@ -331,8 +316,8 @@ def main():
     # Test 6: Registration ingest (requires API)
     results['registration_ingest'] = test_registration_ingest(s)
     
-    # Test 7: Interim pull (requires API)
-    results['interim_pull'] = test_interim_pull(s)
+    # Test 7: Shill ingest (requires API)
+    results['shill_ingest'] = test_shill_ingest(s)
     
     # Test 8: CSV export
     results['csv_export'] = test_csv_export(s)
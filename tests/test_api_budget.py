@@ -0,0 +1,67 @@
+"""RateLimitBudget: in-memory updates, and when changed endpoints reach api_rate_limits."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from typing import Dict
+
+from shillbot.api_budget import RateLimitBudget
+from shillbot.db import DB, connect, init_db
+
+SEARCH = "/2/tweets/search/recent"
+LOOKUP = "/2/tweets"
+
+
+def headers(remaining: int, reset: int = 2_000_000_000, limit: int = 450) -> Dict[str, str]:
+    return {
+        "x-rate-limit-limit": str(limit),
+        "x-rate-limit-remaining": str(remaining),
+        "x-rate-limit-reset": str(reset),
+    }
+
+
+class RateLimitBudgetTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DB(os.path.join(self.tmp.name, "test.db"))
+        init_db(self.db)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def stored(self) -> Dict[str, int]:
+        with connect(self.db) as conn:
+            rows = conn.execute("SELECT endpoint, remaining FROM api_rate_limits").fetchall()
+        return {r["endpoint"]: r["remaining"] for r in rows}
+
+    def test_responses_stay_in_memory_until_flush(self) -> None:
+        budget = RateLimitBudget(self.db, flush_interval_s=3600)
+        for remaining in (449, 448, 447):
+            budget.update_from_headers(SEARCH, headers(remaining))
+        budget.update_from_headers(LOOKUP, headers(899, limit=900))
+        self.assertEqual(self.stored(), {})
+        self.assertEqual(budget.snapshot()[SEARCH].remaining, 447)
+
+        self.assertEqual(budget.flush(), 2)
+        self.assertEqual(self.stored(), {SEARCH: 447, LOOKUP: 899})
+        self.assertEqual(budget.flush(), 0)  # Nothing changed since
+        self.assertEqual(RateLimitBudget(self.db).snapshot()[SEARCH].remaining, 447)
+
+    def test_exhausted_endpoint_is_written_at_once(self) -> None:
+        budget = RateLimitBudget(self.db, flush_interval_s=3600)
+        budget.update_from_headers(SEARCH, headers(0))
+        self.assertEqual(self.stored(), {SEARCH: 0})
+
+        budget.mark_exhausted(LOOKUP, 900)
+        self.assertEqual(self.stored(), {SEARCH: 0, LOOKUP: 0})
+
+    def test_debounce_interval(self) -> None:
+        budget = RateLimitBudget(self.db, flush_interval_s=0)
+        budget.update_from_headers(SEARCH, headers(449))
+        self.assertEqual(self.stored(), {SEARCH: 449})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+"""Bulk writes and change queues in shillbot.db."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+
+from shillbot.db import (
+    DB,
+    connect,
+    count_window_blacklisted,
+    enable_export_changes,
+    get_ingest_cursor,
+    get_max_shill_rowid,
+    get_unscored_handles,
+    init_db,
+    insert_shills,
+    mark_shills_scored,
+    set_ingest_cursor,
+    upsert_registrations,
+)
+from shillbot.leaderboard import compute_standings
+from shillbot.models import IngestCursor, Tweet
+
+
+class UpsertRegistrationsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DB(os.path.join(self.tmp.name, "test.db"))
+        init_db(self.db)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def queued(self, conn) -> tuple:
+        registration_changes = conn.execute("SELECT COUNT(*) FROM registration_changes").fetchone()[0]
+        export_changes = conn.execute("SELECT COUNT(*) FROM export_changes").fetchone()[0]
+        return registration_changes, export_changes
+
+    def test_unchanged_registration_is_a_no_op(self) -> None:
+        with connect(self.db) as conn:
+            enable_export_changes(conn, [("registrations", ("handle",))])
+            stored = upsert_registrations(conn, [("alice", "W1"), ("bob", "W2")], "2026-01-01T00:00:00Z")
+            self.assertEqual((stored.inserted, stored.updated, stored.ignored), (2, 0, 0))
+            self.assertEqual(self.queued(conn), (2, 2))
+            conn.execute("DELETE FROM registration_changes")
+            conn.execute("DELETE FROM export_changes")
+
+            stored = upsert_registrations(conn, [("alice", "W1"), ("bob", "W3")], "2026-01-02T00:00:00Z")
+            self.assertEqual((stored.inserted, stored.updated, stored.ignored), (0, 1, 2))
+            # Only bob's wallet changed; no handle was added or removed
+            self.assertEqual(self.queued(conn), (0, 1))
+            rows = conn.execute("SELECT handle, wallet, registered_at_utc FROM registrations ORDER BY handle")
+            self.assertEqual(
+                [tuple(r) for r in rows],
+                [("alice", "W1", "2026-01-01T00:00:00Z"), ("bob", "W3", "2026-01-02T00:00:00Z")],
+            )
+
+
+class WindowCandidatesTest(unittest.TestCase):
+    START = 1_767_225_600  # 2026-01-01T00:00:00Z
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DB(os.path.join(self.tmp.name, "test.db"))
+        init_db(self.db)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def tweet(self, tweet_id: str, handle: str, second: int, likes: int) -> Tweet:
+        created = f"2026-01-01T00:{second // 60:02d}:{second % 60:02d}+00:00"
+        return Tweet(tweet_id, handle, created, "gm @shootercoinsol", likes, 0, 0, 0, 0, False, "")
+
+    def test_exclusions_apply_after_rate_limiting(self) -> None:
+        with connect(self.db) as conn:
+            insert_shills(
+                conn,
+                [
+                    self.tweet("1", "alice", 10, likes=1),  # excluded, but still takes alice's minute 0 slot
+                    self.tweet("2", "alice", 20, likes=100),
+                    self.tweet("3", "alice", 70, likes=5),
+                    self.tweet("4", "bob", 10, likes=50),
+                    self.tweet("5", "bob", 30, likes=50),  # Rate limited away: not counted as blacklisted
+                    self.tweet("6", "bob", 90, likes=50),
+                ],
+            )
+            conn.execute("INSERT INTO excluded_tweets VALUES ('1', 'test', '2026-01-01')")
+            conn.execute("INSERT INTO blacklist_handles VALUES ('bob', 'test', '2026-01-01')")
+            standings = compute_standings(conn, self.START, self.START + 3600)
+            self.assertEqual(count_window_blacklisted(conn, self.START, self.START + 3600), 2)
+        self.assertEqual(list(standings), ["alice"])
+        self.assertEqual((standings["alice"].tweet_id, standings["alice"].tweet_count), ("3", 1))
+
+    def test_mark_scored_skips_rows_stored_during_the_pass(self) -> None:
+        with connect(self.db) as conn:
+            insert_shills(conn, [self.tweet("1", "alice", 10, likes=1), self.tweet("2", "bob", 10, likes=1)])
+            max_rowid = get_max_shill_rowid(conn)
+            # Stored by a concurrent ingest after the scoring pass read shills
+            insert_shills(conn, [self.tweet("3", "alice", 70, likes=1), self.tweet("4", "carol", 70, likes=1)])
+            mark_shills_scored(conn, "2026-01-01T01:00:00Z", max_rowid, ["alice"])
+            self.assertEqual(sorted(get_unscored_handles(conn)), ["alice", "bob", "carol"])
+            mark_shills_scored(conn, "2026-01-01T01:00:00Z", max_rowid)
+            self.assertEqual(sorted(get_unscored_handles(conn)), ["alice", "carol"])
+            pending = conn.execute("SELECT tweet_id FROM shills WHERE scored_at_utc IS NULL ORDER BY tweet_id")
+            self.assertEqual([r[0] for r in pending], ["3", "4"])
+
+
+class InitDBTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DB(os.path.join(self.tmp.name, "test.db"))
+        init_db(self.db)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def is_registered(self) -> int:
+        with connect(self.db) as conn:
+            return conn.execute("SELECT is_registered FROM shills WHERE tweet_id = '1'").fetchone()[0]
+
+    def test_full_reconcile_only_when_triggers_are_created(self) -> None:
+        tweet = Tweet("1", "alice", "2026-01-01T00:00:00+00:00", "gm @shootercoinsol", 0, 0, 0, 0, 0, False, "")
+        with connect(self.db) as conn:
+            insert_shills(conn, [tweet])
+            # Written behind the triggers' back (e.g. by a build that predates them)
+            conn.execute("UPDATE shills SET is_registered = 1")
+        init_db(self.db)
+        self.assertEqual(self.is_registered(), 1)
+
+        with connect(self.db) as conn:
+            for name in ("insert", "delete", "update"):
+                conn.execute(f"DROP TRIGGER trg_registrations_{name}")
+        init_db(self.db)
+        self.assertEqual(self.is_registered(), 0)
+
+
+class IngestCursorTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DB(os.path.join(self.tmp.name, "test.db"))
+        init_db(self.db)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_round_trip(self) -> None:
+        cursors = [IngestCursor("10", until_id="25", pending_id="30"), IngestCursor(until_id="25", pending_id="30")]
+        with connect(self.db) as conn:
+            self.assertEqual(get_ingest_cursor(conn, "@shootercoinsol"), IngestCursor())
+            for cursor in cursors:
+                set_ingest_cursor(conn, "@shootercoinsol", cursor, "2026-01-01T00:00:00Z")
+                self.assertEqual(get_ingest_cursor(conn, "@shootercoinsol"), cursor)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+"""export-all --incremental: base + delta chains reconstruct the full export."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from typing import Any, List, Tuple
+
+from shillbot.db import DB, connect, init_db, insert_shills, upsert_registrations
+from shillbot.export import (
+    EXPORT_TABLES,
+    INCREMENTAL_DIR,
+    export_all,
+    export_incremental,
+    load_manifest,
+    pa,
+    read_rows,
+    reconstruct_table,
+)
+from shillbot.models import Tweet
+
+
+def tweet(i: int, handle: str) -> Tweet:
+    return Tweet(
+        str(1000 + i), handle, f"2026-01-01T00:{i:02d}:00+00:00", f"gm @shootercoinsol {i}", i, 0, 0, 0, 0, False, ""
+    )
+
+
+class IncrementalExportTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DB(os.path.join(self.tmp.name, "test.db"))
+        init_db(self.db)
+        self.exports_dir = os.path.join(self.tmp.name, "exports")
+        self.incremental_dir = os.path.join(self.exports_dir, INCREMENTAL_DIR)
+        self.full_runs = 0
+        with connect(self.db) as conn:
+            insert_shills(conn, [tweet(i, f"user{i % 3}") for i in range(10)])
+            upsert_registrations(conn, [("user0", "W0"), ("user1", "W1")], "2026-01-01T00:00:00Z")
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def full_export(self, table: str, fmt: str = "csv") -> Tuple[List[str], List[List[Any]]]:
+        self.full_runs += 1
+        out_dir = os.path.join(self.tmp.name, f"full{self.full_runs}")
+        export_all(self.db, out_dir, fmt=fmt)
+        header, rows = read_rows(os.path.join(out_dir, f"{table}.{fmt}"), fmt)
+        return header, sorted(rows)
+
+    def assert_reconstructs(self, fmt: str = "csv") -> None:
+        for spec in EXPORT_TABLES:
+            with self.subTest(table=spec.table):
+                header, rows = reconstruct_table(self.incremental_dir, spec.table)
+                full_header, full_rows = self.full_export(spec.table, fmt)
+                if full_rows:
+                    self.assertEqual(header, full_header)
+                self.assertEqual(sorted(rows.values()), full_rows)
+
+    def test_base_then_deltas(self) -> None:
+        base = export_incremental(self.db, self.exports_dir)
+        self.assertEqual(base["kind"], "base")
+        self.assertEqual(base["tables"]["shills"]["rows"], 10)
+        self.assert_reconstructs()
+
+        with connect(self.db) as conn:
+            insert_shills(conn, [tweet(10, "user0"), tweet(11, "user3")])
+            conn.execute("UPDATE shills SET score = 1.5 WHERE tweet_id = '1001'")
+            conn.execute("DELETE FROM shills WHERE tweet_id = '1002'")
+            upsert_registrations(conn, [("user1", "W1b"), ("user3", "W3")], "2026-01-02T00:00:00Z")
+            conn.execute("DELETE FROM registrations WHERE handle = 'user0'")
+        delta = export_incremental(self.db, self.exports_dir)
+        self.assertEqual((delta["kind"], delta["parent"]), ("delta", base["id"]))
+        shills, registrations = delta["tables"]["shills"], delta["tables"]["registrations"]
+        self.assertEqual((shills["rows"], shills["deleted"]), (3, 1))
+        self.assertEqual((registrations["rows"], registrations["deleted"]), (2, 1))
+        self.assert_reconstructs()
+
+    def test_no_changes_writes_an_empty_delta(self) -> None:
+        export_incremental(self.db, self.exports_dir)
+        delta = export_incremental(self.db, self.exports_dir)
+        self.assertEqual(delta["kind"], "delta")
+        for table, info in delta["tables"].items():
+            with self.subTest(table=table):
+                self.assertEqual((info["rows"], info["deleted"]), (0, 0))
+        self.assert_reconstructs()
+
+    def test_renamed_key(self) -> None:
+        export_incremental(self.db, self.exports_dir)
+        with connect(self.db) as conn:
+            conn.execute("UPDATE registrations SET handle = 'user1_new' WHERE handle = 'user1'")
+        delta = export_incremental(self.db, self.exports_dir)
+        registrations = delta["tables"]["registrations"]
+        self.assertEqual((registrations["rows"], registrations["deleted"]), (1, 1))
+        self.assert_reconstructs()
+
+    def test_chain_of_deltas(self) -> None:
+        export_incremental(self.db, self.exports_dir)
+        for i in range(12, 15):
+            with connect(self.db) as conn:
+                insert_shills(conn, [tweet(i, "user4")])
+                conn.execute("UPDATE shills SET score = ? WHERE tweet_id = '1000'", (float(i),))
+            export_incremental(self.db, self.exports_dir)
+        self.assertEqual([e["kind"] for e in load_manifest(self.incremental_dir)["exports"]], ["base"] + ["delta"] * 3)
+        self.assert_reconstructs()
+
+    @unittest.skipIf(pa is None, "pyarrow not installed")
+    def test_format_change_starts_a_new_base(self) -> None:
+        export_incremental(self.db, self.exports_dir)
+        entry = export_incremental(self.db, self.exports_dir, fmt="parquet")
+        self.assertEqual((entry["kind"], entry["parent"]), ("base", None))
+        with connect(self.db) as conn:
+            insert_shills(conn, [tweet(20, "user0")])
+        self.assertEqual(export_incremental(self.db, self.exports_dir, fmt="parquet")["kind"], "delta")
+        self.assert_reconstructs("parquet")
+
+
+if __name__ == "__main__":
+    unittest.main()
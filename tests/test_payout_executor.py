@@ -0,0 +1,195 @@
+"""submit_payouts / track_confirmations status transitions, and sendTransaction failover."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from shillbot.db import DB, connect, init_db
+from shillbot.payout_executor import (
+    CONFIRMED,
+    EXPIRED,
+    FAILED,
+    RETRYABLE_STATUSES,
+    SUBMITTED,
+    submit_payouts,
+    track_confirmations,
+)
+from shillbot.solana_payer import BatchTransferResult, PreparedTransaction
+from shillbot.solana_rpc import RPCTransport, SolanaRPCError
+
+
+class FakeRPC:
+    def __init__(self, send_results: Sequence[object]):
+        self.send_results = list(send_results)  # per send: None (accepted) or an exception to raise
+        self.sent: List[bytes] = []
+        self.statuses: Dict[str, Optional[Dict[str, object]]] = {}
+        self.block_height = 0
+        self.slot = 1000
+        self.status_slot: Optional[int] = None  # slot the status node is at (None: same as self.slot)
+        self.landing: Dict[str, Optional[Dict[str, object]]] = {}  # statuses that land after the height read
+
+    def send_transaction(self, tx_bytes: bytes) -> str:
+        self.sent.append(tx_bytes)
+        result = self.send_results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return tx_bytes.decode()
+
+    def get_block_height_and_slot(self) -> Tuple[int, int]:
+        height_and_slot = (self.block_height, self.slot)
+        self.statuses.update(self.landing)
+        return height_and_slot
+
+    def get_signature_statuses(self, signatures: Sequence[str]) -> Tuple[Dict[str, Optional[Dict[str, object]]], int]:
+        slot = self.slot if self.status_slot is None else self.status_slot
+        return {sig: self.statuses.get(sig) for sig in signatures}, slot
+
+
+class FakePayer:
+    """One transaction per transfer, signature 'sig-<wallet>', valid until block 100."""
+
+    def __init__(self, rpc: FakeRPC):
+        self.rpc = rpc
+
+    def validate_transfers(
+        self, transfers: Sequence[Tuple[str, int]]
+    ) -> Tuple[List[Tuple[str, int]], List[BatchTransferResult]]:
+        return list(transfers), []
+
+    def prepare_transactions(self, transfers: Sequence[Tuple[str, int]]) -> List[PreparedTransaction]:
+        return [
+            PreparedTransaction(((wallet, lamports),), f"sig-{wallet}", f"sig-{wallet}".encode(), 100)
+            for wallet, lamports in transfers
+        ]
+
+
+class SubmitPayoutsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DB(os.path.join(self.tmp.name, "test.db"))
+        init_db(self.db)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def statuses(self) -> Dict[str, str]:
+        with connect(self.db) as conn:
+            rows = conn.execute("SELECT wallet, status FROM payout_transactions").fetchall()
+        return {r["wallet"]: r["status"] for r in rows}
+
+    def submit(self, rpc: FakeRPC, transfers: Sequence[Tuple[str, int]]) -> Dict[str, int]:
+        with connect(self.db) as conn:
+            return submit_payouts(conn, "w1", transfers, FakePayer(rpc))
+
+    def test_accepted_and_rejected(self) -> None:
+        rpc = FakeRPC([None, SolanaRPCError("Solana RPC error: insufficient funds for fee")])
+        counts = self.submit(rpc, [("A", 1), ("B", 2)])
+        self.assertEqual(counts, {"transactions": 2, "submitted": 1, "failed": 1})
+        self.assertEqual(self.statuses(), {"A": SUBMITTED, "B": FAILED})
+        self.assertIn(FAILED, RETRYABLE_STATUSES)
+
+    def test_unknown_delivery_stays_submitted(self) -> None:
+        rpc = FakeRPC([RuntimeError("Solana RPC request failed: timeout")])
+        self.submit(rpc, [("A", 1)])
+        self.assertEqual(self.statuses(), {"A": SUBMITTED})
+
+    def test_already_processed_is_not_retryable(self) -> None:
+        for error in (
+            "Solana RPC error: {'code': -32002, 'message': 'Transaction simulation failed: "
+            "This transaction has already been processed', 'data': {'err': 'AlreadyProcessed'}}",
+            "Solana RPC error: {'message': 'Transaction simulation failed: Blockhash not found'}",
+        ):
+            with self.subTest(error=error):
+                with connect(self.db) as conn:
+                    conn.execute("DELETE FROM payout_transactions")
+                self.submit(FakeRPC([SolanaRPCError(error)]), [("A", 1)])
+                self.assertEqual(self.statuses(), {"A": SUBMITTED})
+
+    def test_track_confirmations(self) -> None:
+        rpc = FakeRPC([None, None, None])
+        self.submit(rpc, [("A", 1), ("B", 2), ("C", 3)])
+        rpc.statuses = {
+            "sig-A": {"err": None, "confirmationStatus": "confirmed"},
+            "sig-B": {"err": {"InstructionError": [0, "Custom"]}, "confirmationStatus": "confirmed"},
+            "sig-C": None,
+        }
+        rpc.block_height = 90  # C's blockhash still valid: keep waiting
+        with connect(self.db) as conn:
+            final = track_confirmations(conn, "w1", rpc, poll_interval_s=0, timeout_s=0)
+        self.assertEqual(final, {"sig-A": CONFIRMED, "sig-B": FAILED, "sig-C": SUBMITTED})
+
+        rpc.block_height = 101
+        with connect(self.db) as conn:
+            final = track_confirmations(conn, "w1", rpc, poll_interval_s=0, timeout_s=0)
+        self.assertEqual(final, {"sig-C": EXPIRED})
+        self.assertEqual(self.statuses(), {"A": CONFIRMED, "B": FAILED, "C": EXPIRED})
+
+    def test_landing_between_height_and_status_reads_confirms(self) -> None:
+        rpc = FakeRPC([None])
+        self.submit(rpc, [("A", 1)])
+        # Lands in the last valid block, after the height read that is already past it
+        rpc.block_height = 101
+        rpc.landing = {"sig-A": {"err": None, "confirmationStatus": "confirmed"}}
+        with connect(self.db) as conn:
+            final = track_confirmations(conn, "w1", rpc, poll_interval_s=0, timeout_s=0)
+        self.assertEqual(final, {"sig-A": CONFIRMED})
+        self.assertEqual(self.statuses(), {"A": CONFIRMED})
+
+    def test_lagging_status_node_does_not_expire(self) -> None:
+        rpc = FakeRPC([None])
+        self.submit(rpc, [("A", 1)])
+        rpc.block_height = 101
+        rpc.status_slot = rpc.slot - 5  # Behind the node that reported the height
+        with connect(self.db) as conn:
+            final = track_confirmations(conn, "w1", rpc, poll_interval_s=0, timeout_s=0)
+        self.assertEqual(final, {"sig-A": SUBMITTED})
+        self.assertNotIn(self.statuses()["A"], RETRYABLE_STATUSES)
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, body: object):
+        self.status_code = status_code
+        self.body = body
+
+    def json(self) -> object:
+        return self.body
+
+
+class FakeSession:
+    def __init__(self, responses: Dict[str, FakeResponse]):
+        self.responses = responses
+        self.urls: List[str] = []
+
+    def post(self, url: str, json: object, timeout: float) -> FakeResponse:
+        self.urls.append(url)
+        return self.responses[url]
+
+    def close(self) -> None:
+        pass
+
+
+class TransportFailoverTest(unittest.TestCase):
+    def transport(self) -> Tuple[RPCTransport, FakeSession]:
+        transport = RPCTransport(["https://a", "https://b"])
+        session = FakeSession({"https://a": FakeResponse(503, None), "https://b": FakeResponse(200, {"id": 1})})
+        transport._session = session
+        transport._probed = True
+        return transport, session
+
+    def test_failover(self) -> None:
+        transport, session = self.transport()
+        self.assertEqual(transport.post({"id": 1}, 1.0), {"id": 1})
+        self.assertEqual(session.urls, ["https://a", "https://b"])
+
+    def test_no_failover(self) -> None:
+        transport, session = self.transport()
+        with self.assertRaises(RuntimeError):
+            transport.post({"id": 1}, 1.0, failover=False)
+        self.assertEqual(session.urls, ["https://a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
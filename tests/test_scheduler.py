@@ -0,0 +1,137 @@
+"""Daemon schedules (every / daily_at) and Scheduler.run_job overlap and serialization."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from typing import List
+from zoneinfo import ZoneInfo
+
+from shillbot.scheduler import ScheduledJob, Scheduler, daily_at, every
+
+CHICAGO = ZoneInfo("America/Chicago")
+
+
+def local(*args: int) -> datetime:
+    return datetime(*args, tzinfo=CHICAGO)
+
+
+class EveryTest(unittest.TestCase):
+    def test_fixed_interval_after_previous_fire(self) -> None:
+        next_run = every(600)
+        now = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+        self.assertEqual(next_run(now), now)  # First fire immediately
+        self.assertEqual(next_run(now + timedelta(seconds=5)), now + timedelta(minutes=10))
+        self.assertEqual(next_run(now + timedelta(minutes=10, seconds=1)), now + timedelta(minutes=20))
+
+    def test_late_fire_does_not_catch_up(self) -> None:
+        next_run = every(600)
+        now = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+        next_run(now)
+        late = now + timedelta(minutes=45)  # Host suspended past several intervals
+        self.assertEqual(next_run(late), late)
+        self.assertEqual(next_run(late), late + timedelta(minutes=10))
+
+
+class DailyAtTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.next_run = daily_at(["14:00", "23:00"], "America/Chicago")
+
+    def test_next_close_time(self) -> None:
+        cases = [
+            (local(2026, 1, 10, 9, 0), local(2026, 1, 10, 14, 0)),
+            (local(2026, 1, 10, 14, 0), local(2026, 1, 10, 23, 0)),  # Strictly after now
+            (local(2026, 1, 10, 15, 30), local(2026, 1, 10, 23, 0)),
+            (local(2026, 1, 10, 23, 0, 1), local(2026, 1, 11, 14, 0)),
+            (local(2026, 12, 31, 23, 30), local(2027, 1, 1, 14, 0)),
+        ]
+        for now, expected in cases:
+            with self.subTest(now=now):
+                self.assertEqual(self.next_run(now), expected)
+
+    def test_utc_now(self) -> None:
+        # 2026-01-10 16:00 UTC is 10:00 CST
+        now = datetime(2026, 1, 10, 16, 0, tzinfo=timezone.utc)
+        self.assertEqual(self.next_run(now), datetime(2026, 1, 10, 20, 0, tzinfo=timezone.utc))
+
+    def test_dst_transitions_keep_local_wall_time(self) -> None:
+        # Spring forward (2026-03-08 02:00 CST -> 03:00 CDT): 14:00 CDT is 19:00 UTC
+        fire = self.next_run(local(2026, 3, 7, 23, 30))
+        self.assertEqual(fire.astimezone(timezone.utc), datetime(2026, 3, 8, 19, 0, tzinfo=timezone.utc))
+        # Fall back (2026-11-01 02:00 CDT -> 01:00 CST): 14:00 CST is 20:00 UTC
+        fire = self.next_run(local(2026, 10, 31, 23, 30))
+        self.assertEqual(fire.astimezone(timezone.utc), datetime(2026, 11, 1, 20, 0, tzinfo=timezone.utc))
+        # The close before it was 23:00 CDT, i.e. 04:00 UTC
+        fire = self.next_run(local(2026, 10, 31, 15, 0))
+        self.assertEqual(fire.astimezone(timezone.utc), datetime(2026, 11, 1, 4, 0, tzinfo=timezone.utc))
+
+
+class RunJobTest(unittest.TestCase):
+    def test_overlapping_run_is_skipped(self) -> None:
+        release = threading.Event()
+        started = threading.Event()
+        runs: List[int] = []
+
+        def slow() -> None:
+            runs.append(1)
+            started.set()
+            release.wait(5)
+
+        async def scenario() -> tuple:
+            job = ScheduledJob("ingest", slow, every(60))
+            scheduler = Scheduler([job])
+            first = asyncio.create_task(scheduler.run_job(job))
+            await asyncio.to_thread(started.wait, 5)
+            overlapping = await scheduler.run_job(job)
+            release.set()
+            return overlapping, await first, await scheduler.run_job(job)
+
+        release_later = threading.Timer(5, release.set)  # Never hang the suite
+        release_later.start()
+        try:
+            skipped, first_ran, rerun = asyncio.run(scenario())
+        finally:
+            release_later.cancel()
+        # The overlapping fire is skipped; once the first run ends the job runs again
+        self.assertEqual((skipped, first_ran, rerun), (False, True, True))
+        self.assertEqual(len(runs), 2)
+
+    def test_jobs_run_one_at_a_time(self) -> None:
+        lock = threading.Lock()
+        active = [0]
+        max_active = [0]
+        order: List[str] = []
+
+        def make(name: str):
+            def func() -> None:
+                with lock:
+                    active[0] += 1
+                    max_active[0] = max(max_active[0], active[0])
+                    order.append(name)
+                time.sleep(0.05)
+                with lock:
+                    active[0] -= 1
+            return func
+
+        async def scenario() -> List[bool]:
+            jobs = [ScheduledJob(name, make(name), every(60)) for name in ("ingest", "close", "refresh-metrics")]
+            scheduler = Scheduler(jobs)
+            return await asyncio.gather(*(scheduler.run_job(job) for job in jobs))
+
+        self.assertEqual(asyncio.run(scenario()), [True, True, True])
+        self.assertEqual(max_active[0], 1)
+        self.assertEqual(sorted(order), ["close", "ingest", "refresh-metrics"])
+
+    def test_failing_job_does_not_raise(self) -> None:
+        def boom() -> None:
+            raise RuntimeError("X API error 503")
+
+        job = ScheduledJob("ingest", boom, every(60))
+        self.assertTrue(asyncio.run(Scheduler([job]).run_job(job)))
+
+
+if __name__ == "__main__":
+    unittest.main()
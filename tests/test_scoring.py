@@ -0,0 +1,160 @@
+"""Vectorized scoring (score_columns / best_per_handle / TweetBatch) against a per-tweet reference."""
+
+from __future__ import annotations
+
+import random
+import unittest
+from collections import Counter
+from dataclasses import replace
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from shillbot.models import Tweet
+from shillbot.rate_limit import apply_rate_limit
+from shillbot.scoring import best_per_handle, encode_handles, score_columns, score_tweet, score_tweets, tweets_to_columns
+from shillbot.tweet_batch import TweetBatch
+from shillbot.utils import parse_millis
+
+START = 1_767_225_600  # 2026-01-01T00:00:00Z
+
+
+def make_tweets(rng: random.Random, n: int) -> List[Tweet]:
+    """
+    Few handles, small metric ranges and a 5-minute span: plenty of equal scores,
+    same-second tweets and several tweets per handle per minute. Timestamps are in
+    X's format (milliseconds, 'Z'), with few distinct values so some tie exactly.
+    """
+    tweets: List[Tweet] = []
+    for i in range(n):
+        epoch = START + rng.randrange(300)
+        created = datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+        is_retweet = rng.random() < 0.2
+        tweets.append(
+            Tweet(
+                tweet_id=str(10**18 + i),
+                handle=f"user{rng.randrange(6)}",
+                created_at_utc=f"{created}.{rng.choice([0, 250, 500]):03d}Z",
+                text="gm @shootercoinsol",
+                like_count=rng.randrange(4),
+                retweet_count=rng.randrange(2),
+                quote_count=rng.randrange(2),
+                reply_count=rng.randrange(2),
+                view_count=rng.choice([0, 100, 200]),
+                has_media=rng.random() < 0.3,
+                media_type="",
+                is_retweet=is_retweet,
+                is_quote=not is_retweet and rng.random() < 0.2,
+                has_original_text=rng.random() < 0.5,
+                created_at_epoch=epoch,
+            )
+        )
+    rng.shuffle(tweets)
+    return tweets
+
+
+def reference_score_tweets(tweets: List[Tweet]) -> Dict[str, Tuple[str, float]]:
+    """Per-tweet loop: best score per handle, ties keep the earliest tweet in input order."""
+    counts = Counter(t.handle for t in tweets)
+    best: Dict[str, Tuple[str, float]] = {}
+    for t in tweets:
+        score = score_tweet(t, counts[t.handle])
+        if t.handle not in best or score > best[t.handle][1]:
+            best[t.handle] = (t.tweet_id, score)
+    return best
+
+
+def reference_rate_limit(tweets: List[Tweet]) -> List[Tweet]:
+    """
+    Earliest tweet per (handle, minute) by (epoch, created_at string), ties to the first
+    seen, in order of each bucket's first tweet.
+    """
+    def when(t: Tweet) -> Tuple[int, str]:
+        return t.created_at_epoch, t.created_at_utc
+
+    kept: Dict[Tuple[str, int], Tweet] = {}
+    for t in tweets:
+        key = (t.handle, t.created_at_epoch // 60)
+        if key not in kept or when(t) < when(kept[key]):
+            kept[key] = t
+    return list(kept.values())
+
+
+class VectorizedScoringTest(unittest.TestCase):
+    SEEDS = range(20)
+
+    def assert_same_best(self, actual: Dict[str, Tuple[str, float]], expected: Dict[str, Tuple[str, float]]) -> None:
+        self.assertEqual({h: tid for h, (tid, _) in actual.items()}, {h: tid for h, (tid, _) in expected.items()})
+        for handle, (_, score) in expected.items():
+            self.assertAlmostEqual(actual[handle][1], score, places=9)
+
+    def test_score_columns_matches_score_tweet(self) -> None:
+        for seed in self.SEEDS:
+            tweets = make_tweets(random.Random(seed), 200)
+            counts = Counter(t.handle for t in tweets)
+            _, codes = encode_handles(t.handle for t in tweets)
+            scores = score_columns(tweets_to_columns(tweets), codes)
+            expected = np.array([score_tweet(t, counts[t.handle]) for t in tweets])
+            np.testing.assert_allclose(scores, expected, rtol=1e-12)
+
+    def test_best_per_handle_breaks_ties_by_input_order(self) -> None:
+        codes = np.array([0, 1, 0, 1, 0])
+        scores = np.array([2.0, 5.0, 3.0, 5.0, 3.0])
+        self.assertEqual(best_per_handle(codes, scores).tolist(), [2, 1])
+
+    def test_score_tweets(self) -> None:
+        for seed in self.SEEDS:
+            with self.subTest(seed=seed):
+                tweets = make_tweets(random.Random(seed), 200)
+                self.assert_same_best(score_tweets(tweets), reference_score_tweets(tweets))
+
+    def test_tweet_batch_score(self) -> None:
+        for seed in self.SEEDS:
+            with self.subTest(seed=seed):
+                tweets = make_tweets(random.Random(seed), 200)
+                self.assert_same_best(TweetBatch.from_tweets(tweets).score(), reference_score_tweets(tweets))
+
+    def test_rate_limited_ranking(self) -> None:
+        for seed in self.SEEDS:
+            with self.subTest(seed=seed):
+                tweets = make_tweets(random.Random(seed), 200)
+                limited = reference_rate_limit(tweets)
+                self.assertEqual([t.tweet_id for t in apply_rate_limit(tweets)], [t.tweet_id for t in limited])
+
+                batch = TweetBatch.from_tweets(tweets).rate_limit()
+                self.assertEqual([batch.tweet_id(i) for i in range(len(batch))], [t.tweet_id for t in limited])
+                self.assert_same_best(batch.score(), reference_score_tweets(limited))
+
+    def test_rate_limit_breaks_same_second_ties_on_milliseconds(self) -> None:
+        # Same handle, same second: the later-listed tweet is earlier by milliseconds
+        tweets = [
+            Tweet("1", "alice", "2026-01-01T00:00:10.900Z", "gm", 0, 0, 0, 0, 0, False, "",
+                  created_at_epoch=START + 10),
+            Tweet("2", "alice", "2026-01-01T00:00:10.100Z", "gm", 0, 0, 0, 0, 0, False, "",
+                  created_at_epoch=START + 10),
+            Tweet("3", "alice", "2026-01-01T00:00:10.100Z", "gm", 0, 0, 0, 0, 0, False, "",
+                  created_at_epoch=START + 10),
+        ]
+        self.assertEqual([t.tweet_id for t in apply_rate_limit(tweets)], ["2"])
+        batch = TweetBatch.from_tweets(tweets).rate_limit()
+        self.assertEqual([batch.tweet_id(i) for i in range(len(batch))], ["2"])
+
+    def test_from_rows_matches_from_tweets(self) -> None:
+        # The shills table has no retweet/quote flags: rows load with them False
+        tweets = [
+            replace(t, is_retweet=False, is_quote=False, has_original_text=False)
+            for t in make_tweets(random.Random(7), 200)
+        ]
+        rows = [
+            (t.tweet_id, t.handle, t.created_at_epoch, parse_millis(t.created_at_utc),
+             t.like_count, t.retweet_count, t.quote_count,
+             t.reply_count, t.view_count, int(t.has_media))
+            for t in tweets
+        ]
+        batch = TweetBatch.from_rows(rows).rate_limit()
+        self.assert_same_best(batch.score(), reference_score_tweets(reference_rate_limit(tweets)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+"""NativeSolanaPayer: legacy message serialization, signing and packing."""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+import tempfile
+import unittest
+from typing import List, Tuple
+
+from shillbot.solana_payer import (
+    PACKET_DATA_SIZE,
+    NativeSolanaPayer,
+    SigningKey,
+    _compact_u16,
+    base58,
+    transfer_tx_size,
+)
+
+
+def b58(raw: bytes) -> str:
+    return base58.b58encode(raw).decode("ascii")
+
+
+def wallets(n: int) -> List[str]:
+    return [b58(struct.pack(">I", i + 1) + bytes(28)) for i in range(n)]
+
+
+class FakeRPC:
+    def __init__(self) -> None:
+        self.blockhash_calls = 0
+
+    def get_latest_blockhash(self) -> Tuple[str, int]:
+        self.blockhash_calls += 1
+        return b58(bytes([7]) * 32), 100
+
+
+class CompactU16Test(unittest.TestCase):
+    def test_encoding(self) -> None:
+        cases = {0: "00", 1: "01", 127: "7f", 128: "8001", 255: "ff01", 16383: "ff7f", 16384: "808001"}
+        for n, expected in cases.items():
+            with self.subTest(n=n):
+                self.assertEqual(_compact_u16(n).hex(), expected)
+
+
+@unittest.skipIf(SigningKey is None or base58 is None, "PyNaCl / base58 not installed")
+class NativeSolanaPayerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.signing_key = SigningKey(bytes(range(32)))
+        self.payer_key = bytes(self.signing_key.verify_key)
+        path = os.path.join(self.tmp.name, "keypair.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(list(bytes(self.signing_key) + self.payer_key), f)
+        self.rpc = FakeRPC()
+        self.payer = NativeSolanaPayer(path, self.rpc)  # type: ignore[arg-type]
+        self.blockhash = bytes([7]) * 32
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_legacy_message_layout(self) -> None:
+        a, b = bytes([1]) * 32, bytes([5]) * 32
+        tx = self.payer.build_transaction([(b58(a), 1000), (b58(b), 5), (b58(a), 7)], b58(self.blockhash))
+
+        def transfer_ix(recipient_index: int, lamports: int) -> bytes:
+            # program id index, 2 accounts (payer, recipient), 12 bytes of data
+            return bytes([3, 2, 0, recipient_index, 12]) + struct.pack("<IQ", 2, lamports)
+
+        message = (
+            bytes([1, 0, 1])  # 1 signer, 0 read-only signed, 1 read-only unsigned
+            + bytes([4]) + self.payer_key + a + b + bytes(32)  # the system program is all zeros
+            + self.blockhash
+            + bytes([3]) + transfer_ix(1, 1000) + transfer_ix(2, 5) + transfer_ix(1, 7)
+        )
+        self.assertEqual(tx[0], 1)
+        self.assertEqual(tx[65:], message)
+        self.signing_key.verify_key.verify(message, tx[1:65])
+
+    def test_tx_size_matches_serialization(self) -> None:
+        for n in (1, 2, 10, 21):
+            with self.subTest(n=n):
+                tx = self.payer.build_transaction([(w, 1) for w in wallets(n)], b58(self.blockhash))
+                self.assertEqual(len(tx), transfer_tx_size(n))
+
+    def test_pack_transfers(self) -> None:
+        self.assertLessEqual(transfer_tx_size(21), PACKET_DATA_SIZE)
+        self.assertGreater(transfer_tx_size(22), PACKET_DATA_SIZE)
+        transfers = [(w, 1) for w in wallets(45)]
+        batches = self.payer.pack_transfers(transfers)
+        self.assertEqual([len(b) for b in batches], [21, 21, 3])
+        self.assertEqual([t for b in batches for t in b], transfers)
+        self.assertEqual(self.payer.pack_transfers([]), [])
+
+    def test_oversized_transaction_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            self.payer.build_transaction([(w, 1) for w in wallets(22)], b58(self.blockhash))
+
+    def test_validate_transfers(self) -> None:
+        good = wallets(1)[0]
+        valid, rejected = self.payer.validate_transfers([(good, 5), ("not-a-wallet", 5), (good, 0)])
+        self.assertEqual(valid, [(good, 5)])
+        self.assertEqual([r.transfers for r in rejected], [(("not-a-wallet", 5),), ((good, 0),)])
+        self.assertTrue(all(r.status == "FAILED" and r.error for r in rejected))
+
+    def test_prepare_transactions(self) -> None:
+        prepared = self.payer.prepare_transactions([(w, 1) for w in wallets(30)])
+        self.assertEqual(self.rpc.blockhash_calls, 1)
+        self.assertEqual([len(p.transfers) for p in prepared], [21, 9])
+        for p in prepared:
+            self.assertEqual(p.signature, b58(p.tx_bytes[1:65]))
+            self.assertEqual(p.tx_bytes[65 + 3 + 1 + 32 * (len(p.transfers) + 2):][:32], self.blockhash)
+            self.assertEqual(p.last_valid_block_height, 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+"""FileCache: total-size bound, LRU eviction, deleted files and warm()."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+
+from shillbot.web import FileCache
+
+
+class FileCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def write(self, rel_path: str, size: int) -> str:
+        path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(os.urandom(size))  # Incompressible, and .bin isn't compressed: one variant
+        return path
+
+    def test_evicts_least_recently_used(self) -> None:
+        cache = FileCache(max_total_bytes=2500)
+        a, b, c = (self.write(f"{name}.bin", 1000) for name in "abc")
+        cache.get(a)
+        cache.get(b)
+        cache.get(a)  # b is now least recently used
+        cache.get(c)
+        self.assertEqual(len(cache), 2)
+        self.assertLessEqual(cache.total_bytes, 2500)
+        self.assertEqual(set(cache._entries), {a, c})
+
+    def test_deleted_file_is_dropped(self) -> None:
+        cache = FileCache()
+        a, b = self.write("a.bin", 1000), self.write("b.bin", 1000)
+        cache.get(a)
+        cache.get(b)
+        os.remove(a)
+        os.remove(b)
+        self.assertIsNone(cache.get(a))
+        self.assertEqual(cache.prune(), 1)
+        self.assertEqual((len(cache), cache.total_bytes), (0, 0))
+
+    def test_warm_skips_exports(self) -> None:
+        self.write("latest.bin", 100)
+        self.write("history/w1.bin", 100)
+        self.write("exports/20260101T000000Z/shills.bin", 100)
+        cache = FileCache()
+        self.assertEqual(cache.warm(self.root), 2)
+        self.assertFalse(any("exports" in path for path in cache._entries))
+
+
+if __name__ == "__main__":
+    unittest.main()
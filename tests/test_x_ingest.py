@@ -0,0 +1,233 @@
+"""Streaming and concurrent shill pulls: page budget, partial pulls and the ingest cursor."""
+
+from __future__ import annotations
+
+import asyncio
+import unittest
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from shillbot.models import IngestCursor
+from shillbot.x_api import SearchPage, XAPIClient
+from shillbot.x_async import AsyncXAPIClient, ingest_cycle
+from shillbot.x_ingest import IngestProgress, XIngestor
+
+WALLET = "C4RmBaZJdXBJZsGxnRsjSrpfxAt6hz9BiBEVYpeMcCnD"
+
+
+def raw_tweet(tweet_id: int, text: str = "gm @shootercoinsol", handle: str = "user1") -> Dict[str, Any]:
+    created = datetime.now(timezone.utc) - timedelta(minutes=5)
+    return {
+        "id": str(tweet_id),
+        "text": text,
+        "created_at": created.isoformat().replace("+00:00", "Z"),
+        "_user": {"username": handle},
+    }
+
+
+def make_pages(*ids_per_page: List[int], text: str = "gm @shootercoinsol") -> List[SearchPage]:
+    """Newest-first pages; every page but the last carries a next_token."""
+    last = len(ids_per_page) - 1
+    return [
+        SearchPage([raw_tweet(i, text, f"user{i}") for i in ids], None if n == last else f"token-{n}")
+        for n, ids in enumerate(ids_per_page)
+    ]
+
+
+class FakeClient:
+    """Serves canned search pages; fail_at raises instead of serving that page index."""
+
+    bearer_token = "test"
+    base_url = XAPIClient.BASE_URL
+    max_wait_s = 30.0
+    parse_tweet = XAPIClient.parse_tweet
+
+    def __init__(
+        self,
+        pages: List[SearchPage],
+        fail_at: Optional[int] = None,
+        reject_since_id: bool = False,
+        only_query: Optional[str] = None,
+    ):
+        self.pages = pages
+        self.fail_at = fail_at
+        self.reject_since_id = reject_since_id
+        self.only_query = only_query  # other queries get no results
+        self.calls: List[Dict[str, Any]] = []
+
+    def rate_limit_wait_s(self, url: str) -> float:
+        return 0.0
+
+    def iter_search_pages(self, query: str, max_pages: Optional[int] = None, **kwargs: Any) -> Iterator[SearchPage]:
+        self.calls.append(kwargs)
+        if self.reject_since_id and kwargs.get("since_id"):
+            raise RuntimeError("X API error 400: 'since_id' must be within the last 7 days")
+        if self.only_query is not None and query != self.only_query:
+            return
+        for n, page in enumerate(self.pages[:max_pages]):
+            if n == self.fail_at:
+                raise RuntimeError("X API error 503")
+            yield page
+
+
+def make_ingestor(client: FakeClient, max_pages: int = 10) -> XIngestor:
+    return XIngestor(
+        client=client,  # type: ignore[arg-type]
+        handle="shillbot",
+        coin_handle="shootercoinsol",
+        coin_ticker="SHOOTER",
+        token_mint=None,
+        register_hashtag="shillbotregister",
+        max_pages=max_pages,
+    )
+
+
+class TimelineClient(FakeClient):
+    """Serves a growing set of tweet IDs newest-first, page_size per page, honoring since_id / until_id."""
+
+    def __init__(self, ids: List[int], page_size: int = 2):
+        super().__init__([])
+        self.ids = ids
+        self.page_size = page_size
+
+    def iter_search_pages(self, query: str, max_pages: Optional[int] = None, **kwargs: Any) -> Iterator[SearchPage]:
+        self.calls.append(kwargs)
+        if self.only_query is not None and query != self.only_query:
+            return
+        since_id, until_id = int(kwargs.get("since_id") or 0), int(kwargs.get("until_id") or 1 << 62)
+        ids = sorted((i for i in self.ids if since_id < i < until_id), reverse=True)
+        chunks = [ids[n:n + self.page_size] for n in range(0, len(ids), self.page_size)] or [[]]
+        for n, chunk in enumerate(chunks[:max_pages]):
+            yield SearchPage([raw_tweet(i, handle=f"user{i}") for i in chunk], None if n == len(chunks) - 1 else f"token-{n}")
+
+
+class ShillPullCursorTest(unittest.TestCase):
+    def pull(self, client: FakeClient, cursor: IngestCursor, max_pages: int = 10) -> tuple:
+        progress = IngestProgress()
+        tweets = list(make_ingestor(client, max_pages).iter_shill_tweets(cursor, progress))
+        return [t.tweet_id for t in tweets], progress
+
+    def test_complete_pull_advances_cursor(self) -> None:
+        ids, progress = self.pull(FakeClient(make_pages([30, 29], [28])), IngestCursor("10"))
+        self.assertEqual(ids, ["30", "29", "28"])
+        self.assertTrue(progress.complete)
+        self.assertEqual(progress.advance(IngestCursor("10")), IngestCursor("30"))
+
+    def test_page_budget_leaves_gap(self) -> None:
+        ids, progress = self.pull(FakeClient(make_pages([30], [29], [28])), IngestCursor("10"), max_pages=2)
+        self.assertEqual(ids, ["30", "29"])
+        self.assertFalse(progress.complete)
+        # Tweets between 10 and 29 are read next run, then the cursor moves to 30
+        self.assertEqual(progress.advance(IngestCursor("10")), IngestCursor("10", until_id="29", pending_id="30"))
+
+    def test_page_budget_gap_is_eventually_closed(self) -> None:
+        # 20 tweets behind the cursor, 6 read per run, 4 new ones arriving during the first runs
+        client = TimelineClient(list(range(11, 31)), page_size=2)
+        cursor, stored = IngestCursor("10"), set()
+        for run in range(8):
+            if 1 <= run <= 3:
+                client.ids.extend(range(27 + 4 * run, 31 + 4 * run))
+            ids, progress = self.pull(client, cursor, max_pages=3)
+            stored.update(ids)
+            cursor = progress.advance(cursor)
+            if run == 0:
+                self.assertEqual(cursor, IngestCursor("10", until_id="25", pending_id="30"))
+        self.assertIn("until_id", client.calls[1])
+        self.assertEqual(stored, {str(i) for i in client.ids})
+        self.assertEqual(cursor, IngestCursor("42"))
+
+    def test_page_budget_on_window_pull_leaves_gap(self) -> None:
+        ids, progress = self.pull(FakeClient(make_pages([30], [29])), IngestCursor(), max_pages=1)
+        self.assertEqual(ids, ["30"])
+        self.assertTrue(progress.from_window)
+        self.assertEqual(progress.advance(IngestCursor()), IngestCursor(until_id="30", pending_id="30"))
+
+    def test_window_gap_resumes_inside_window(self) -> None:
+        client = FakeClient(make_pages([29]))
+        ids, progress = self.pull(client, IngestCursor(until_id="30", pending_id="30"))
+        self.assertEqual(ids, ["29"])
+        self.assertEqual(client.calls[-1]["until_id"], "30")
+        self.assertIn("start_time", client.calls[-1])
+        self.assertEqual(progress.advance(IngestCursor(until_id="30", pending_id="30")), IngestCursor("30"))
+
+    def test_failure_after_first_page_leaves_gap(self) -> None:
+        ids, progress = self.pull(FakeClient(make_pages([30], [29]), fail_at=1), IngestCursor("10"))
+        self.assertEqual(ids, ["30"])
+        self.assertFalse(progress.complete)
+        self.assertEqual(progress.advance(IngestCursor("10")), IngestCursor("10", until_id="30", pending_id="30"))
+
+    def test_filtered_tweets_still_move_cursor(self) -> None:
+        pages = [SearchPage([raw_tweet(31, "unrelated"), raw_tweet(30)], None)]
+        ids, progress = self.pull(FakeClient(pages), IngestCursor("10"))
+        self.assertEqual(ids, ["30"])
+        self.assertEqual(progress.advance(IngestCursor("10")), IngestCursor("31"))
+
+    def test_rejected_cursor_falls_back_to_window(self) -> None:
+        client = FakeClient(make_pages([30]), reject_since_id=True)
+        cursor = IngestCursor("10", until_id="20", pending_id="25")
+        ids, progress = self.pull(client, cursor)
+        self.assertEqual(ids, ["30"])
+        self.assertTrue(progress.from_window)
+        self.assertIn("start_time", client.calls[-1])
+        self.assertNotIn("until_id", client.calls[-1])
+        self.assertEqual(progress.advance(cursor), IngestCursor("30"))
+
+
+class RegistrationScrapeTest(unittest.TestCase):
+    def test_page_budget_marks_partial(self) -> None:
+        pages = make_pages([3], [2], [1], text=f"#shillbotregister {WALLET}")
+        progress = IngestProgress()
+        regs = make_ingestor(FakeClient(pages), max_pages=2).scrape_registrations(progress)
+        self.assertEqual(regs, [("user3", WALLET), ("user2", WALLET)])
+        self.assertEqual(progress.pages, 2)
+        self.assertFalse(progress.complete)
+
+    def test_failure_marks_partial(self) -> None:
+        pages = make_pages([3], [2], text="#shillbotregister no wallet yet")
+        progress = IngestProgress()
+        regs = make_ingestor(FakeClient(pages, fail_at=1)).scrape_registrations(progress)
+        self.assertEqual(regs, [("user3", "N/A")])
+        self.assertFalse(progress.complete)
+
+    def test_complete(self) -> None:
+        progress = IngestProgress()
+        make_ingestor(FakeClient(make_pages([3], [2], text="#shillbotregister"))).scrape_registrations(progress)
+        self.assertTrue(progress.complete)
+
+
+class IngestCycleTest(unittest.TestCase):
+    def cycle(self, client: FakeClient, cursor: IngestCursor, max_pages: int = 10) -> tuple:
+        ingestor = make_ingestor(client, max_pages)
+        query = ingestor.shill_query()
+        # Only the mention query gets pages; the cashtag / mint queries come back empty
+        client.only_query = query
+        result = asyncio.run(
+            ingest_cycle(ingestor, AsyncXAPIClient(client), {query: cursor}, registrations=False)  # type: ignore[arg-type]
+        )
+        return [t.tweet_id for t in result.tweets], result.cursors.get(query), result.errors
+
+    def test_complete_pull_advances_cursor(self) -> None:
+        ids, cursor, errors = self.cycle(FakeClient(make_pages([30], [29])), IngestCursor("10"))
+        self.assertEqual((ids, cursor, errors), (["30", "29"], IngestCursor("30"), {}))
+
+    def test_page_budget_gap_is_eventually_closed(self) -> None:
+        client = TimelineClient(list(range(11, 31)), page_size=2)
+        cursor, stored = IngestCursor("10"), set()
+        for run in range(4):
+            ids, new_cursor, _ = self.cycle(client, cursor, max_pages=3)
+            stored.update(ids)
+            cursor = new_cursor or cursor
+            if run == 0:
+                self.assertEqual(cursor, IngestCursor("10", until_id="25", pending_id="30"))
+        self.assertEqual(stored, {str(i) for i in range(11, 31)})
+        self.assertEqual(cursor, IngestCursor("30"))
+
+    def test_stale_cursor_falls_back_to_window(self) -> None:
+        client = FakeClient(make_pages([30]), reject_since_id=True)
+        ids, cursor, errors = self.cycle(client, IngestCursor("10", until_id="20", pending_id="25"))
+        self.assertEqual((ids, cursor, errors), (["30"], IngestCursor("30"), {}))
+        self.assertTrue(any("start_time" in call for call in client.calls))
+
+
+if __name__ == "__main__":
+    unittest.main()